@@ -5,6 +5,24 @@ import random
 # refactor them to use GUI elements instead of 'print' and 'input'.
 import json
 import os
+import sys
+import argparse
+import time
+import math
+import heapq
+import itertools
+import functools
+import operator
+import mmap
+import multiprocessing
+import queue
+import threading
+import asyncio
+import socket
+import struct
+from collections import Counter, namedtuple, deque
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
 
 def load_hangman_words(filename="hangman_words.json"):
     """Loads a list of words from a JSON file using the script's absolute path."""
@@ -71,6 +89,208 @@ def normalize_answer(answer):
     
     return normalized
 
+# --- Tick Scheduler ---
+class ScheduledCall:
+    """A callback registered with the TickScheduler (one-shot or repeating)."""
+    def __init__(self, deadline, interval, callback, args):
+        self.deadline = deadline
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+class TickScheduler:
+    """Runs every timed callback of the app from a single Tk 'after' loop.
+    
+    Deadlines are absolute time.monotonic() values, so repeating timers never drift
+    by the callback latency. All calls that are due when a frame fires run together,
+    and at most one 'after' is pending no matter how many timers are active.
+    """
+    def __init__(self, root, frame_ms=16):
+        self.root = root
+        self.frame = frame_ms / 1000.0
+        self.queue = []  # Heap of (deadline, sequence, ScheduledCall)
+        self.sequence = itertools.count()
+        self.after_id = None
+        self.armed_for = None
+        self.last_tick = -float('inf')
+    
+    def call_later(self, delay, callback, *args):
+        """Runs callback(*args) once, 'delay' seconds from now."""
+        call = ScheduledCall(time.monotonic() + delay, 0, callback, args)
+        self.push(call)
+        return call
+    
+    def call_every(self, interval, callback, *args, start=None):
+        """Runs callback(*args) every 'interval' seconds until it returns False or is cancelled."""
+        if start is None:
+            start = time.monotonic()
+        call = ScheduledCall(start + interval, interval, callback, args)
+        self.push(call)
+        return call
+    
+    def cancel(self, call):
+        """Cancels a pending call. Cancelled entries are dropped lazily from the heap."""
+        if call is not None:
+            call.cancelled = True
+    
+    def push(self, call):
+        """Adds a call to the heap and re-arms the frame timer if it is now the earliest."""
+        heapq.heappush(self.queue, (call.deadline, next(self.sequence), call))
+        self.arm()
+    
+    def arm(self):
+        """Makes sure exactly one 'after' is pending for the earliest live deadline."""
+        while self.queue and self.queue[0][2].cancelled:
+            heapq.heappop(self.queue)
+        
+        if not self.queue:
+            if self.after_id is not None:
+                self.root.after_cancel(self.after_id)
+                self.after_id = None
+            return
+        
+        deadline = self.queue[0][0]
+        if self.after_id is not None:
+            if self.armed_for <= deadline:
+                return
+            self.root.after_cancel(self.after_id)
+        
+        # Never tick more than once per frame; calls due in between are coalesced
+        fire_at = max(deadline, self.last_tick + self.frame)
+        delay_ms = max(0, math.ceil((fire_at - time.monotonic()) * 1000))
+        self.armed_for = fire_at
+        self.after_id = self.root.after(delay_ms, self.tick)
+    
+    def tick(self):
+        """Runs every call that is due and reschedules repeating ones."""
+        self.after_id = None
+        now = time.monotonic()
+        self.last_tick = now
+        
+        due = []
+        while self.queue and self.queue[0][0] <= now:
+            due.append(heapq.heappop(self.queue)[2])
+        
+        try:
+            for call in due:
+                if call.cancelled:
+                    continue
+                try:
+                    keep_going = call.callback(*call.args)
+                except Exception:
+                    # Report it the way Tk reports a failing callback, and keep the other calls (and
+                    # this one, if it repeats) alive
+                    self.root.report_callback_exception(*sys.exc_info())
+                    keep_going = True
+                if call.interval and keep_going is not False and not call.cancelled:
+                    # Skip the frames we fell behind on instead of replaying them
+                    missed = int((now - call.deadline) // call.interval) + 1
+                    call.deadline += missed * call.interval
+                    heapq.heappush(self.queue, (call.deadline, next(self.sequence), call))
+        finally:
+            self.arm()
+
+# --- AI Executor ---
+class AIJob:
+    """A computation submitted to the AIExecutor on behalf of a screen."""
+    def __init__(self, owner, callback):
+        self.owner = owner
+        self.callback = callback
+        self.stop = threading.Event()  # Set on cancel; long searches check it and give up early
+        self.future = None
+    
+    @property
+    def cancelled(self):
+        return self.stop.is_set()
+    
+    def cancel(self):
+        self.stop.set()
+        if self.future is not None:
+            self.future.cancel()
+
+class AIExecutor:
+    """Runs computer-player searches off the Tk thread.
+    
+    Jobs run one at a time on a worker thread, so an engine object is never used by two
+    searches at once. Finished jobs are put on a queue that the scheduler drains on the
+    Tk thread, and only there is a job's callback called. A cancelled job's result is
+    dropped, so a move computed for an abandoned game is never applied.
+    """
+    def __init__(self, scheduler, poll_interval=0.02):
+        self.scheduler = scheduler
+        self.poll_interval = poll_interval
+        self.pool = None
+        self.results = queue.Queue()
+        self.pending = set()
+        self.poll_call = None
+    
+    def submit(self, owner, callback, function, *args, cancellable=False):
+        """Runs function(*args) on the worker and then callback(result) on the Tk thread.
+        
+        With cancellable=True the job's stop Event is passed as 'stop=' so the function
+        can end early when the job is cancelled. Returns the AIJob.
+        """
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+        job = AIJob(owner, callback)
+        kwargs = {"stop": job.stop} if cancellable else {}
+        self.pending.add(job)
+        job.future = self.pool.submit(self.run, job, function, args, kwargs)
+        if self.poll_call is None:
+            self.poll_call = self.scheduler.call_every(self.poll_interval, self.poll)
+        return job
+    
+    def run(self, job, function, args, kwargs):
+        """Worker thread: computes the result and queues it for the Tk thread."""
+        if job.cancelled:
+            self.results.put((job, None, None))
+            return
+        try:
+            self.results.put((job, function(*args, **kwargs), None))
+        except Exception as e:
+            self.results.put((job, None, e))
+    
+    def poll(self):
+        """Tk thread: delivers finished jobs. Stops polling once nothing is pending."""
+        while True:
+            try:
+                job, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard(job)
+            if job.cancelled:
+                continue
+            if error is not None:
+                print(f"Computer player error: {error!r}")
+                continue
+            job.callback(result)
+        
+        # Jobs cancelled before they started never reach the queue
+        self.pending = {job for job in self.pending if not job.future.cancelled()}
+        if not self.pending:
+            self.poll_call = None
+            return False
+        return True
+    
+    def cancel(self, owner):
+        """Cancels every pending job of a screen (on reset or navigation)."""
+        for job in self.pending:
+            if job.owner is owner:
+                job.cancel()
+    
+    def busy(self, owner):
+        """Whether a screen has a job that will still deliver a result."""
+        return any(job.owner is owner and not job.cancelled for job in self.pending)
+    
+    def shutdown(self):
+        """Cancels every job and waits for the worker thread to finish the one it is running."""
+        for job in self.pending:
+            job.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
 # --- Global Class to Manage the Application ---
 class GameApp(tk.Tk):
     """The main application window."""
@@ -79,6 +299,11 @@ class GameApp(tk.Tk):
         self.title("Python Text-based Games Collection")
         self.geometry("600x500")
 
+        # One scheduler drives every timer and animation in the app
+        self.scheduler = TickScheduler(self)
+        # Computer players think on a worker thread and report back through the scheduler
+        self.ai = AIExecutor(self.scheduler)
+
         # Container Frame: All other frames (pages) will be stacked on top of this.
         container = tk.Frame(self, bg="#90EE90") 
         container.pack(side="top", fill="both", expand=True)
@@ -88,7 +313,7 @@ class GameApp(tk.Tk):
         self.frames = {}
         
         # Add all pages/frames to the dictionary
-        for F in (MainMenu, MoreGamesMenu, MastermindGUI, WordScrambleGUI, BattleshipGUI, SlotMachineGUI, TextAdventureGUI, NumberGuessingGUI, WordGuessingGUI, RockPaperScissorsGUI, HigherOrLowerGUI, DiceRollingGUI, QuizSelectionGUI, QuizGameGUI, TicTacToeSelectionGUI, TicTacToeGUI, GameWIP):
+        for F in (MainMenu, MoreGamesMenu, MastermindGUI, WordScrambleGUI, BattleshipGUI, SlotMachineGUI, TextAdventureGUI, NumberGuessingGUI, WordGuessingGUI, RockPaperScissorsGUI, HigherOrLowerGUI, DiceRollingGUI, QuizSelectionGUI, QuizGameGUI, TicTacToeSelectionGUI, TicTacToeGUI, UltimateTicTacToeGUI, GameWIP):
             page_name = F.__name__
             frame = F(parent=container, controller=self)
             self.frames[page_name] = frame
@@ -97,11 +322,20 @@ class GameApp(tk.Tk):
             frame.grid(row=0, column=0, sticky="nsew")
 
         self.show_frame("MainMenu")
+        self.protocol("WM_DELETE_WINDOW", self.close)
 
     def show_frame(self, page_name):
         """Raises the desired frame to the front."""
         frame = self.frames[page_name]
         frame.tkraise()
+    
+    def close(self):
+        """Window closed: leaves the network game and stops the computer players' thread and
+        processes before the window goes, so none are left running."""
+        self.frames["BattleshipGUI"].close_network()
+        self.ai.shutdown()
+        self.frames["UltimateTicTacToeGUI"].mcts.shutdown()  # No search can start it again now
+        self.destroy()
 
 # --- Main Menu Screen ---
 class MainMenu(tk.Frame):
@@ -162,6 +396,397 @@ class MoreGamesMenu(tk.Frame):
 
         tk.Button(self, text="Back to Menu", width=30, command=lambda: controller.show_frame("MainMenu")).pack(pady=20)
 
+# --- Bulls and Cows Engine ---
+CODE_SYMBOLS = "0123456789ABCDEF"
+
+class BullsCowsEngine:
+    """Vectorized Bulls and Cows scoring and Knuth-style minimax over a configurable code space.
+    
+    The code space is every code of 'length' symbols drawn from the first 'alphabet_size'
+    entries of CODE_SYMBOLS, with or without repeated symbols, in lexicographic order.
+    Codes are never stored individually: the space is kept as one byte plane per position
+    (planes[i][c] is the symbol at position i of code number c) and codes are converted
+    to and from their index arithmetically. Scoring a guess against every code is then a
+    few bytes.translate() calls summed as big integers, where each byte is an independent
+    counter that never carries into its neighbour.
+    
+    Candidate sets use the same layout: an int holding one 0/1 byte per code.
+    """
+    max_codes = 6000000  # Largest code space we are willing to hold in memory
+    matrix_limit = 6000  # Spaces up to this size get an exact, precomputed score matrix
+    sample_limit = 2000  # Candidates used to estimate partitions in larger spaces
+    pool_limit = 300  # Guesses considered per hint in larger spaces
+    
+    def __init__(self, length=4, alphabet_size=10, repeats=False, cache_dir=None):
+        if not 3 <= length <= 8:
+            raise ValueError("Code length must be between 3 and 8.")
+        if not 2 <= alphabet_size <= len(CODE_SYMBOLS):
+            raise ValueError(f"Alphabet size must be between 2 and {len(CODE_SYMBOLS)}.")
+        if not repeats and alphabet_size < length:
+            raise ValueError("Without repeats the alphabet must be at least as long as the code.")
+        
+        self.length = length
+        self.alphabet_size = alphabet_size
+        self.repeats = repeats
+        self.symbols = CODE_SYMBOLS[:alphabet_size]
+        self.size = self.count_codes(alphabet_size, length)
+        if self.size > self.max_codes:
+            raise ValueError(f"That code space has {self.size:,} codes; the limit is {self.max_codes:,}.")
+        
+        self.cache_path = None
+        if cache_dir:
+            kind = "r" if repeats else "u"
+            self.cache_path = os.path.join(cache_dir, f"bulls_cows_L{length}_A{alphabet_size}_{kind}.bin")
+        self.matrix = None
+        
+        self.win_score = self.encode_score(length, 0)
+        # match_tables[x] maps byte x to 1 and every other byte to 0
+        self.match_tables = [bytes(1 if b == x else 0 for b in range(256))
+                             for x in range(max(alphabet_size, self.win_score + 1))]
+        # cap_tables[k] maps byte x to min(x, k)
+        self.cap_tables = [bytes(min(b, k) for b in range(256)) for k in range(length + 1)]
+        
+        if repeats:
+            self.planes = self.build_product_planes(alphabet_size, length)
+        else:
+            self.planes = self.build_permutation_planes(alphabet_size, length)
+    
+    def count_codes(self, alphabet_size, length):
+        """Number of codes of 'length' symbols from an alphabet of 'alphabet_size'."""
+        if self.repeats:
+            return alphabet_size ** length
+        return math.perm(alphabet_size, length)
+    
+    def build_product_planes(self, alphabet_size, length):
+        """Planes for codes with repeats: position i cycles through the alphabet in runs."""
+        planes = []
+        for i in range(length):
+            run = alphabet_size ** (length - 1 - i)
+            cycle = b''.join(bytes([s]) * run for s in range(alphabet_size))
+            planes.append(cycle * alphabet_size ** i)
+        return planes
+    
+    def build_permutation_planes(self, alphabet_size, length):
+        """Planes for codes without repeats, built from the planes of the shorter sub-problem.
+        
+        Codes starting with symbol s are the codes over the remaining symbols, so each
+        block is the sub-problem's planes relabelled to skip s.
+        """
+        if length == 1:
+            return [bytes(range(alphabet_size))]
+        
+        sub_planes = self.build_permutation_planes(alphabet_size - 1, length - 1)
+        block = math.perm(alphabet_size - 1, length - 1)
+        relabel = [bytes(b if b < s else min(b + 1, 255) for b in range(256)) for s in range(alphabet_size)]
+        
+        planes = [b''.join(bytes([s]) * block for s in range(alphabet_size))]
+        for plane in sub_planes:
+            planes.append(b''.join(plane.translate(relabel[s]) for s in range(alphabet_size)))
+        return planes
+    
+    # --- Codes ---
+    def parse_code(self, text):
+        """Converts user input into a tuple of symbol indices, or returns an error message."""
+        text = text.strip().upper()
+        if len(text) != self.length or any(ch not in self.symbols for ch in text):
+            return f"Please enter exactly {self.length} symbols from {self.symbols}!"
+        if not self.repeats and len(set(text)) != self.length:
+            return "All symbols must be unique!"
+        return tuple(self.symbols.index(ch) for ch in text)
+    
+    def format_code(self, code):
+        """Converts a tuple of symbol indices into its display string."""
+        return ''.join(self.symbols[s] for s in code)
+    
+    def rank(self, code):
+        """Returns the index of a code in the (lexicographic) code space."""
+        if self.repeats:
+            index = 0
+            for s in code:
+                index = index * self.alphabet_size + s
+            return index
+        
+        index = 0
+        used = 0
+        for i, s in enumerate(code):
+            smaller_unused = s - bin(used & ((1 << s) - 1)).count('1')
+            index += smaller_unused * math.perm(self.alphabet_size - 1 - i, self.length - 1 - i)
+            used |= 1 << s
+        return index
+    
+    def unrank(self, index):
+        """Returns the code (tuple of symbol indices) with the given index."""
+        if self.repeats:
+            code = []
+            for _ in range(self.length):
+                index, s = divmod(index, self.alphabet_size)
+                code.append(s)
+            return tuple(reversed(code))
+        
+        unused = list(range(self.alphabet_size))
+        code = []
+        for i in range(self.length):
+            block = math.perm(self.alphabet_size - 1 - i, self.length - 1 - i)
+            position, index = divmod(index, block)
+            code.append(unused.pop(position))
+        return tuple(code)
+    
+    def random_code(self):
+        """Picks a uniformly random code from the space."""
+        return self.unrank(random.randrange(self.size))
+    
+    # --- Scoring ---
+    def encode_score(self, bulls, cows):
+        """Packs a (bulls, cows) pair into one byte."""
+        return bulls * (self.length + 1) + cows
+    
+    def decode_score(self, score):
+        """Unpacks a score byte into (bulls, cows)."""
+        return divmod(score, self.length + 1)
+    
+    def score(self, secret, guess):
+        """Scores a single guess against a single secret, returning (bulls, cows)."""
+        bulls = sum(a == b for a, b in zip(secret, guess))
+        common = sum(min(secret.count(s), guess.count(s)) for s in set(guess))
+        return bulls, common - bulls
+    
+    def score_planes(self, planes, guess):
+        """Returns the score byte of 'guess' against every code described by 'planes'."""
+        count = len(planes[0])
+        bulls = 0
+        for plane, s in zip(planes, guess):
+            bulls += int.from_bytes(plane.translate(self.match_tables[s]), 'big')
+        
+        common = 0
+        if not self.repeats:
+            in_guess = bytearray(256)
+            for s in guess:
+                in_guess[s] = 1
+            in_guess = bytes(in_guess)
+            for plane in planes:
+                common += int.from_bytes(plane.translate(in_guess), 'big')
+        else:
+            # Shared symbols: sum over the guess's symbols of min(count in code, count in guess)
+            for s in set(guess):
+                occurrences = 0
+                for plane in planes:
+                    occurrences += int.from_bytes(plane.translate(self.match_tables[s]), 'big')
+                capped = occurrences.to_bytes(count, 'big').translate(self.cap_tables[guess.count(s)])
+                common += int.from_bytes(capped, 'big')
+        
+        # bulls * (length + 1) + cows == bulls * length + common
+        return (bulls * self.length + common).to_bytes(count, 'big')
+    
+    def score_row(self, guess):
+        """Returns the score byte of 'guess' against every code in the space."""
+        return self.score_planes(self.planes, guess)
+    
+    def load_matrix(self):
+        """Builds (or memory-maps from the cache file) the full score matrix of a small space."""
+        if self.matrix is not None:
+            return self.matrix
+        
+        size = self.size
+        if self.cache_path and os.path.exists(self.cache_path) and os.path.getsize(self.cache_path) == size * size:
+            try:
+                with open(self.cache_path, 'rb') as f:
+                    self.matrix = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                return self.matrix
+            except (OSError, ValueError) as e:
+                print(f"Could not map the Bulls and Cows score cache: {e}")
+        
+        matrix = bytearray(size * size)
+        for i in range(size):
+            matrix[i * size:(i + 1) * size] = self.score_row(self.unrank(i))
+        self.matrix = matrix
+        
+        if self.cache_path:
+            try:
+                with open(self.cache_path, 'wb') as f:
+                    f.write(matrix)
+            except OSError as e:
+                print(f"Could not write the Bulls and Cows score cache: {e}")
+        return self.matrix
+    
+    # --- Candidate sets ---
+    def all_candidates(self):
+        """Returns the candidate set containing every code."""
+        return int.from_bytes(b'\x01' * self.size, 'big')
+    
+    def count_candidates(self, candidates):
+        """Number of codes in a candidate set."""
+        return candidates.bit_count()
+    
+    def candidate_indices(self, candidates):
+        """Lists the code indices in a candidate set, in order."""
+        return list(itertools.compress(range(self.size), candidates.to_bytes(self.size, 'big')))
+    
+    def narrow(self, candidates, guess, bulls, cows):
+        """Keeps only the candidates that would have produced this clue for 'guess'."""
+        row = self.score_row(guess)
+        matching = row.translate(self.match_tables[self.encode_score(bulls, cows)])
+        return candidates & int.from_bytes(matching, 'big')
+    
+    def narrow_clues(self, candidates, clues):
+        """Applies narrow() for each (guess, bulls, cows) clue in turn."""
+        for guess, bulls, cows in clues:
+            candidates = self.narrow(candidates, guess, bulls, cows)
+        return candidates
+    
+    # --- Solver ---
+    def opening_guesses(self):
+        """One representative of every opening guess up to relabelling symbols and positions.
+        
+        Each one is a non-decreasing code whose symbols step up by at most one, e.g. 0012.
+        """
+        codes = [(0,)]
+        for _ in range(self.length - 1):
+            codes = [code + (code[-1] + step,) for code in codes for step in (0, 1)]
+        return [code for code in codes
+                if code[-1] < self.alphabet_size and (self.repeats or len(set(code)) == self.length)]
+    
+    def best_guess(self, candidates):
+        """Returns the code minimizing the worst-case number of remaining candidates.
+        
+        Small spaces are searched exactly over every guess using the score matrix. Larger
+        spaces evaluate a sample of guesses against a sample of the candidates. Ties are
+        broken in favour of guesses that could themselves be the secret.
+        """
+        indices = self.candidate_indices(candidates)
+        if not indices:
+            return None
+        if len(indices) == 1:
+            return self.unrank(indices[0])
+        
+        scores = range(self.win_score + 1)
+        if len(indices) == self.size:
+            pool = [self.rank(code) for code in self.opening_guesses()]
+        elif self.size <= self.matrix_limit:
+            pool = range(self.size)
+        else:
+            # Sampled guesses are all candidates, so there is no tie-break to apply
+            pool = random.sample(indices, min(len(indices), self.pool_limit))
+        
+        best_key = None
+        best_index = None
+        if self.size <= self.matrix_limit:
+            matrix = self.load_matrix()
+            size = self.size
+            pick = operator.itemgetter(*indices)
+            candidate_set = set(indices)
+            for g in pool:
+                row = bytes(pick(matrix[g * size:(g + 1) * size]))
+                key = (max(row.count(score) for score in scores), g not in candidate_set)
+                if best_key is None or key < best_key:
+                    best_key = key
+                    best_index = g
+            return self.unrank(best_index)
+        
+        sample = indices if len(indices) <= self.sample_limit else random.sample(indices, self.sample_limit)
+        pick = operator.itemgetter(*sample)
+        sample_planes = [bytes(pick(plane)) for plane in self.planes]
+        for g in pool:
+            row = self.score_planes(sample_planes, self.unrank(g))
+            worst = max(row.count(score) for score in scores)
+            if best_key is None or worst < best_key:
+                best_key = worst
+                best_index = g
+        return self.unrank(best_index)
+
+class BullsCowsCodebreaker:
+    """The computer's side of a round where the player keeps the secret and gives the clues.
+    
+    While the player thinks about a guess, its score row is computed one chunk of codes at
+    a time and tagged with candidacy (0x80 + score for candidates, the bare score for the
+    rest), and the candidates are counted per clue. When the clue arrives, the number of
+    consistent codes is a lookup and an empty candidate set is detected immediately. The
+    narrowed set (a single translate of the tagged row) is only built before the next guess,
+    by pick_guess on the AI worker, along with every other pass over the whole code space.
+    """
+    chunk_size = 1 << 15  # Codes scored per analysis step (one step per frame)
+    
+    def __init__(self, engine):
+        self.engine = engine
+        self.candidates = engine.all_candidates()
+        self.guess = None
+        self.analysis = None
+        self.flags = None  # One byte per code for the guess's analysis: 0x80 for candidates
+        self.tagged_row = None
+        self.partition = None  # partition[score] = number of candidates giving that clue
+        self.accepted_score = None  # Clue accepted but not yet applied to the candidates
+    
+    def remaining(self):
+        """Number of codes still consistent with every clue."""
+        if self.accepted_score is not None:
+            return self.partition[self.accepted_score]
+        return self.engine.count_candidates(self.candidates)
+    
+    def apply_clue(self):
+        """Narrows the candidates to the codes consistent with the last accepted clue."""
+        if self.accepted_score is None:
+            return
+        keep = bytes(1 if b == 0x80 + self.accepted_score else 0 for b in range(256))
+        self.candidates = int.from_bytes(self.tagged_row.translate(keep), 'big')
+        self.accepted_score = None
+    
+    def pick_guess(self):
+        """AI worker: applies the accepted clue, picks the next guess with engine.best_guess and
+        readies the candidacy flags of its analysis. Returns the guess, or None if no code is left."""
+        self.apply_clue()
+        guess = self.engine.best_guess(self.candidates)
+        # Each candidate's byte becomes 0x80, which never collides with a score byte
+        self.flags = (self.candidates * 0x80).to_bytes(self.engine.size, 'big') if guess is not None else None
+        return guess
+    
+    def start_guess(self, guess):
+        """Makes 'guess' (from pick_guess) the current one and starts analysing it."""
+        self.guess = guess
+        self.tagged_row = None
+        self.partition = None
+        self.analysis = self.analyze_guess() if guess is not None else None
+    
+    def analyze_guess(self):
+        """Generator that scores the current guess against the code space, one chunk per step."""
+        engine = self.engine
+        size = engine.size
+        flags = self.flags
+        partition = [0] * (engine.win_score + 1)
+        parts = []
+        for start in range(0, size, self.chunk_size):
+            planes = [plane[start:start + self.chunk_size] for plane in engine.planes]
+            row = engine.score_planes(planes, self.guess)
+            tagged = int.from_bytes(row, 'big') + int.from_bytes(flags[start:start + self.chunk_size], 'big')
+            part = tagged.to_bytes(len(row), 'big')
+            for score in range(len(partition)):
+                partition[score] += part.count(0x80 + score)
+            parts.append(part)
+            yield
+        self.tagged_row = b''.join(parts)
+        self.partition = partition
+    
+    def step(self):
+        """Runs one chunk of the pending analysis. Returns False once it is complete."""
+        if self.analysis is None:
+            return False
+        if next(self.analysis, StopIteration) is StopIteration:
+            self.analysis = None
+            return False
+        return True
+    
+    def give_clue(self, bulls, cows):
+        """Applies the player's clue and returns how many codes are still consistent. Call it
+        once the analysis is complete (step() returned False).
+        
+        An inconsistent clue (zero codes left) does not touch the candidates, so the previous
+        consistent state is kept for display.
+        """
+        score = self.engine.encode_score(bulls, cows)
+        if score >= len(self.partition) or self.partition[score] == 0:
+            return 0
+        
+        self.accepted_score = score
+        return self.partition[score]
+
 # --- Mastermind (Bulls and Cows) GUI Frame ---
 class MastermindGUI(tk.Frame):
     def __init__(self, parent, controller):
@@ -170,13 +795,48 @@ class MastermindGUI(tk.Frame):
         
         # Game State Variables
         self.secret_number = ""
+        self.secret_code = ()
         self.attempts = 0
         self.max_attempts = 10
         
+        # Engine and solver state: the set of codes still consistent with every clue
+        self.cache_dir = os.path.dirname(os.path.abspath(__file__))
+        self.engine = BullsCowsEngine(cache_dir=self.cache_dir)
+        self.candidates = 0
+        self.auto_call = None
+        self.solver_job = None  # The hint or auto-solve search in flight
+        self.narrow_job = None  # Narrowing the candidates by the clues below, on the AI worker
+        self.unapplied = []  # (guess, bulls, cows) clues given since that job started
+        self.hint_wanted = False  # Hint asked for while the candidates were being narrowed
+        
+        # Codebreaker mode: the player keeps the secret and the computer guesses
+        self.mode = "PLAYER"
+        self.codebreaker = None
+        self.analysis_call = None
+        self.pending_clue = None  # (bulls, cows) given before the guess's analysis finished
+        
         # --- Widgets Setup ---
         tk.Label(self, text="=== Mastermind (Bulls and Cows) ===", font=('Arial', 16, 'bold'), bg="#90EE90").pack(pady=10)
         
-        tk.Label(self, text="Guess the 4-digit number with unique digits!", font=('Arial', 12), bg="#90EE90").pack(pady=5)
+        self.rules_label = tk.Label(self, text="", font=('Arial', 12), bg="#90EE90")
+        self.rules_label.pack(pady=5)
+        
+        # Frame for the code space settings
+        settings_frame = tk.Frame(self, bg="#90EE90")
+        settings_frame.pack(pady=2)
+        
+        tk.Label(settings_frame, text="Length:", bg="#90EE90").pack(side=tk.LEFT, padx=2)
+        self.length_var = tk.IntVar(value=4)
+        tk.Spinbox(settings_frame, from_=3, to=8, width=3, textvariable=self.length_var).pack(side=tk.LEFT, padx=2)
+        
+        tk.Label(settings_frame, text="Symbols:", bg="#90EE90").pack(side=tk.LEFT, padx=2)
+        self.alphabet_var = tk.IntVar(value=10)
+        tk.Spinbox(settings_frame, from_=2, to=len(CODE_SYMBOLS), width=3, textvariable=self.alphabet_var).pack(side=tk.LEFT, padx=2)
+        
+        self.repeats_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(settings_frame, text="Repeats", variable=self.repeats_var, bg="#90EE90").pack(side=tk.LEFT, padx=2)
+        
+        tk.Button(settings_frame, text="Apply", command=self.apply_settings).pack(side=tk.LEFT, padx=5)
         
         # A Text widget to act as the Game Log
         self.log_text = tk.Text(self, height=8, width=60, state=tk.DISABLED)
@@ -186,11 +846,16 @@ class MastermindGUI(tk.Frame):
         self.status_label = tk.Label(self, text="", bg="#90EE90")
         self.status_label.pack(pady=10)
         
+        # Holds whichever input row the current mode uses
+        self.play_frame = tk.Frame(self, bg="#90EE90")
+        self.play_frame.pack(pady=10)
+        
         # Frame for Input and Button
-        input_frame = tk.Frame(self, bg="#90EE90")
-        input_frame.pack(pady=10)
+        self.input_frame = tk.Frame(self.play_frame, bg="#90EE90")
+        input_frame = self.input_frame
         
-        tk.Label(input_frame, text="Your Guess (4 digits):", bg="#90EE90").pack(side=tk.LEFT, padx=5)
+        self.guess_label = tk.Label(input_frame, text="", bg="#90EE90")
+        self.guess_label.pack(side=tk.LEFT, padx=5)
         
         # Entry widget for the player's guess
         self.guess_entry = tk.Entry(input_frame, width=15)
@@ -200,8 +865,27 @@ class MastermindGUI(tk.Frame):
         self.guess_button = tk.Button(input_frame, text="Guess!", command=self.check_guess)
         self.guess_button.pack(side=tk.LEFT, padx=5)
         
+        # Button to ask the solver for a suggestion
+        self.hint_button = tk.Button(input_frame, text="Hint", command=self.show_hint)
+        self.hint_button.pack(side=tk.LEFT, padx=5)
+        
+        # Frame for the player's clues in codebreaker mode
+        self.clue_frame = tk.Frame(self.play_frame, bg="#90EE90")
+        
+        tk.Label(self.clue_frame, text="Bulls:", bg="#90EE90").pack(side=tk.LEFT, padx=5)
+        self.bulls_entry = tk.Entry(self.clue_frame, width=4)
+        self.bulls_entry.pack(side=tk.LEFT, padx=5)
+        tk.Label(self.clue_frame, text="Cows:", bg="#90EE90").pack(side=tk.LEFT, padx=5)
+        self.cows_entry = tk.Entry(self.clue_frame, width=4)
+        self.cows_entry.pack(side=tk.LEFT, padx=5)
+        self.clue_button = tk.Button(self.clue_frame, text="Answer", command=self.submit_clue)
+        self.clue_button.pack(side=tk.LEFT, padx=5)
+        
         # Control Buttons
         tk.Button(self, text="New Game", command=self.start_game).pack(side=tk.LEFT, padx=10, pady=10)
+        self.auto_button = tk.Button(self, text="Auto-Solve", command=self.start_auto_solve)
+        self.auto_button.pack(side=tk.LEFT, padx=10, pady=10)
+        tk.Button(self, text="Computer Guesses", command=self.start_codebreaker).pack(side=tk.LEFT, padx=10, pady=10)
         tk.Button(self, text="Back to More Games", command=lambda: [self.start_game(), controller.show_frame("MoreGamesMenu")]).pack(side=tk.RIGHT, padx=10, pady=10)
         
         # Start the first game
@@ -214,64 +898,287 @@ class MastermindGUI(tk.Frame):
         self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
     
+    def describe_code(self):
+        """Describes the current code space, e.g. '4-digit number with unique digits'."""
+        engine = self.engine
+        kind = "digit number" if engine.alphabet_size <= 10 else "symbol code"
+        rule = "repeats allowed" if engine.repeats else "unique symbols"
+        return f"{engine.length}-{kind} ({engine.symbols}, {rule})"
+    
+    def apply_settings(self):
+        """Rebuilds the engine for the chosen code length, alphabet and repeat rule."""
+        try:
+            engine = BullsCowsEngine(self.length_var.get(), self.alphabet_var.get(),
+                                     self.repeats_var.get(), cache_dir=self.cache_dir)
+        except (ValueError, tk.TclError) as e:
+            self.log(f"⚠️ {e}")
+            return
+        self.engine = engine
+        self.start_game()
+    
     def generate_secret_number(self):
-        """Generates a 4-digit number with unique digits."""
-        digits = random.sample(range(10), 4)
-        return ''.join(map(str, digits))
+        """Generates a random code from the current code space."""
+        self.secret_code = self.engine.random_code()
+        return self.engine.format_code(self.secret_code)
+    
+    def clear_log(self):
+        """Empties the game log."""
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.delete('1.0', tk.END)
+        self.log_text.config(state=tk.DISABLED)
     
     def start_game(self):
         """Initializes the game state."""
+        self.stop_auto_solve()
+        self.stop_codebreaker()
+        self.stop_narrowing()
+        self.mode = "PLAYER"
+        self.clue_frame.pack_forget()
+        self.input_frame.pack()
         self.secret_number = self.generate_secret_number()
         self.attempts = 0
+        self.candidates = self.engine.all_candidates()
         
         # Clear the log and reset status
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete('1.0', tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        self.clear_log()
+        
+        self.rules_label.config(text=f"Guess the {self.describe_code()}!")
+        self.guess_label.config(text=f"Your Guess ({self.engine.length} symbols):")
         
-        self.log("New game started! Guess the 4-digit number.")
-        self.log("Bulls = correct digit in correct position")
-        self.log("Cows = correct digit in wrong position")
+        self.log(f"New game started! Guess the {self.describe_code()}.")
+        self.log("Bulls = correct symbol in correct position")
+        self.log("Cows = correct symbol in wrong position")
         
-        self.status_label.config(text=f"Attempts left: {self.max_attempts}")
+        self.update_status()
         self.guess_button.config(state=tk.NORMAL)
+        self.hint_button.config(state=tk.NORMAL)
+        self.auto_button.config(state=tk.NORMAL)
         self.guess_entry.config(state=tk.NORMAL)
         self.guess_entry.delete(0, tk.END)
     
+    def update_status(self):
+        """Shows the attempts left and how many codes still fit the clues."""
+        self.status_label.config(text=f"Attempts left: {self.max_attempts - self.attempts} | "
+                                      f"Possible codes: {self.engine.count_candidates(self.candidates):,}")
+    
     def check_guess(self):
         """Handles the logic when the 'Guess!' button is pressed."""
         guess_str = self.guess_entry.get()
         self.guess_entry.delete(0, tk.END)
         
         # Validation
-        if len(guess_str) != 4 or not guess_str.isdigit():
-            self.log("⚠️ Please enter exactly 4 digits!")
-            return
-        
-        if len(set(guess_str)) != 4:
-            self.log("⚠️ All digits must be unique!")
+        guess = self.engine.parse_code(guess_str)
+        if isinstance(guess, str):
+            self.log(f"⚠️ {guess}")
             return
         
         self.attempts += 1
         
         # Calculate bulls and cows
-        Bulls = sum(guess_str[i] == self.secret_number[i] for i in range(4))
-        Cows = sum(guess_str[i] in self.secret_number for i in range(4)) - Bulls
+        Bulls, Cows = self.engine.score(self.secret_code, guess)
         
-        self.log(f"Guess #{self.attempts}: {guess_str} | Bulls: {Bulls}, Cows: {Cows}")
+        self.log(f"Guess #{self.attempts}: {self.engine.format_code(guess)} | Bulls: {Bulls}, Cows: {Cows}")
         
-        if Bulls == 4:
+        # Narrow down the codes that are still consistent with every clue, on the AI worker
+        self.unapplied.append((guess, Bulls, Cows))
+        if self.narrow_job is None:
+            self.start_narrowing()
+        self.update_status()
+        
+        if Bulls == self.engine.length:
             self.log(f"🎉 Correct! You guessed it in {self.attempts} attempts!")
             self.end_game()
         elif self.attempts >= self.max_attempts:
-            self.log(f"❌ Game Over! The number was {self.secret_number}")
+            self.log(f"❌ Game Over! The code was {self.secret_number}")
             self.end_game()
+    
+    def start_narrowing(self):
+        """Applies the clues given so far to the candidates on the AI worker."""
+        clues, self.unapplied = self.unapplied, []
+        self.narrow_job = self.controller.ai.submit(self, self.narrowing_done, self.engine.narrow_clues,
+                                                    self.candidates, clues)
+    
+    def narrowing_done(self, candidates):
+        """Takes the narrowed candidates, then applies the clues given meanwhile or gives the
+        hint asked for meanwhile."""
+        self.candidates = candidates
+        self.narrow_job = None
+        self.update_status()
+        if self.unapplied:
+            self.start_narrowing()
+        elif self.hint_wanted:
+            self.hint_wanted = False
+            self.show_hint()
+    
+    def stop_narrowing(self):
+        """Drops the clues still being applied (the round is over)."""
+        if self.narrow_job is not None:
+            self.narrow_job.cancel()
+        self.narrow_job = None
+        self.unapplied = []
+        self.hint_wanted = False
+    
+    def show_hint(self):
+        """Asks the solver for the guess that minimizes the worst-case number of remaining codes.
+        The search runs on the AI worker, once the last clues are applied, and show_hint_ready
+        shows its answer."""
+        if self.narrow_job is not None:
+            self.hint_wanted = True
+        elif self.solver_job is None:
+            self.solver_job = self.controller.ai.submit(self, self.show_hint_ready, self.engine.best_guess, self.candidates)
+    
+    def show_hint_ready(self, hint):
+        """Puts the solver's suggestion in the guess entry. Returns it, or None if no code is left."""
+        self.solver_job = None
+        if hint is None:
+            return None
+        hint = self.engine.format_code(hint)
+        self.guess_entry.delete(0, tk.END)
+        self.guess_entry.insert(0, hint)
+        self.log(f"💡 Hint: try {hint} ({self.engine.count_candidates(self.candidates):,} possible codes left)")
+        return hint
+    
+    def start_auto_solve(self):
+        """Lets the solver play the rest of the round, one guess per step."""
+        if self.auto_call is not None or self.mode != "PLAYER":
+            return
+        self.auto_button.config(state=tk.DISABLED)
+        self.auto_call = self.controller.scheduler.call_every(0.8, self.auto_solve_step)
+    
+    def auto_solve_step(self):
+        """Asks the solver for the next guess, unless it is still working on the last one or
+        the last clues aren't applied yet."""
+        if self.solver_job is None and self.narrow_job is None:
+            self.solver_job = self.controller.ai.submit(self, self.auto_guess_ready, self.engine.best_guess, self.candidates)
+    
+    def auto_guess_ready(self, guess):
+        """Plays the solver's suggestion as the next guess."""
+        if self.show_hint_ready(guess) is None:
+            self.stop_auto_solve()
+            return
+        self.check_guess()
+    
+    def stop_auto_solve(self):
+        """Cancels a running auto-solve and any solver search in flight."""
+        if self.solver_job is not None:
+            self.solver_job.cancel()
+            self.solver_job = None
+        self.controller.scheduler.cancel(self.auto_call)
+        self.auto_call = None
+    
+    def start_codebreaker(self):
+        """Starts a round where the player thinks of a code and the computer guesses it."""
+        self.stop_auto_solve()
+        self.stop_codebreaker()
+        self.stop_narrowing()
+        self.mode = "CODEBREAKER"
+        self.attempts = 0
+        self.codebreaker = BullsCowsCodebreaker(self.engine)
+        
+        self.input_frame.pack_forget()
+        self.clue_frame.pack()
+        self.clear_log()
+        
+        self.rules_label.config(text=f"Think of a {self.describe_code()}!")
+        self.log(f"Think of a {self.describe_code()} and keep it secret.")
+        self.log("Answer each of my guesses with its bulls and cows.")
+        self.clue_button.config(state=tk.NORMAL)
+        self.computer_guess()
+    
+    def update_codebreaker_status(self):
+        """Shows the computer's guess count and how many codes still fit the clues."""
+        self.status_label.config(text=f"Computer guesses: {self.attempts}/{self.max_attempts} | "
+                                      f"Possible codes: {self.codebreaker.remaining():,}")
+    
+    def computer_guess(self):
+        """Starts picking the computer's next guess on the AI worker."""
+        self.clue_button.config(state=tk.DISABLED)
+        self.controller.ai.submit(self, self.computer_guess_ready, self.codebreaker.pick_guess)
+    
+    def computer_guess_ready(self, guess):
+        """Shows the computer's guess and analyses it in the background, a few chunks per frame."""
+        self.codebreaker.start_guess(guess)
+        self.attempts += 1
+        self.log(f"🤖 My guess #{self.attempts}: {self.engine.format_code(guess)}")
+        self.update_codebreaker_status()
+        self.bulls_entry.delete(0, tk.END)
+        self.cows_entry.delete(0, tk.END)
+        self.clue_button.config(state=tk.NORMAL)
+        self.pending_clue = None
+        self.analysis_call = self.controller.scheduler.call_every(0.001, self.analysis_step)
+    
+    def analysis_step(self, budget=0.008):
+        """Runs analysis chunks for up to 'budget' seconds of a frame. Once the analysis is
+        complete, answers a clue that was waiting for it."""
+        end = time.perf_counter() + budget
+        while self.codebreaker.step():
+            if time.perf_counter() >= end:
+                return True
+        self.analysis_call = None
+        if self.pending_clue is not None:
+            self.answer_clue(*self.pending_clue)
+        return False
+    
+    def submit_clue(self):
+        """Handles the player's bulls and cows for the computer's guess."""
+        try:
+            bulls = int(self.bulls_entry.get())
+            cows = int(self.cows_entry.get())
+        except ValueError:
+            self.log("⚠️ Enter whole numbers for bulls and cows!")
+            return
+        
+        length = self.engine.length
+        if bulls < 0 or cows < 0 or bulls + cows > length:
+            self.log(f"⚠️ Bulls and cows must add up to at most {length}!")
+            return
+        
+        guess = self.engine.format_code(self.codebreaker.guess)
+        self.log(f"   {guess} | Bulls: {bulls}, Cows: {cows}")
+        self.clue_button.config(state=tk.DISABLED)
+        if self.analysis_call is not None:
+            self.pending_clue = (bulls, cows)  # analysis_step answers it when the analysis is done
+            return
+        self.answer_clue(bulls, cows)
+    
+    def answer_clue(self, bulls, cows):
+        """Applies the player's clue to the analysed guess and moves on."""
+        self.pending_clue = None
+        length = self.engine.length
+        guess = self.engine.format_code(self.codebreaker.guess)
+        remaining = self.codebreaker.give_clue(bulls, cows)
+        if remaining == 0:
+            self.log(f"❗ No code fits all your answers. The clue that broke consistency was "
+                     f"{guess} → Bulls: {bulls}, Cows: {cows}.")
+            self.end_codebreaker()
+        elif bulls == length:
+            self.log(f"🤖 Got it! Your code was {guess}, found in {self.attempts} guesses.")
+            self.end_codebreaker()
+        elif self.attempts >= self.max_attempts:
+            self.update_codebreaker_status()
+            self.log(f"🎉 You stumped me! {remaining:,} codes still fit your answers.")
+            self.end_codebreaker()
         else:
-            self.status_label.config(text=f"Attempts left: {self.max_attempts - self.attempts}")
+            self.computer_guess()
+    
+    def stop_codebreaker(self):
+        """Cancels any background search or analysis of the computer's guess."""
+        self.controller.ai.cancel(self)
+        self.controller.scheduler.cancel(self.analysis_call)
+        self.analysis_call = None
+        self.pending_clue = None
+    
+    def end_codebreaker(self):
+        """Disables clue input at the end of a codebreaker round."""
+        self.stop_codebreaker()
+        self.clue_button.config(state=tk.DISABLED)
     
     def end_game(self):
         """Disables input at the end of a round."""
+        self.stop_auto_solve()
         self.guess_button.config(state=tk.DISABLED)
+        self.hint_button.config(state=tk.DISABLED)
+        self.auto_button.config(state=tk.DISABLED)
         self.guess_entry.config(state=tk.DISABLED)
 
 # --- Word Scramble (Anagrams) GUI Frame ---
@@ -284,7 +1191,8 @@ class WordScrambleGUI(tk.Frame):
         self.original_word = ""
         self.scrambled_word = ""
         self.time_left = 0
-        self.timer_id = None
+        self.deadline = 0
+        self.timer_call = None
         
         # --- Widgets Setup ---
         tk.Label(self, text="=== Word Scramble (Anagrams) ===", font=('Arial', 16, 'bold'), bg="#90EE90").pack(pady=10)
@@ -365,26 +1273,28 @@ class WordScrambleGUI(tk.Frame):
         self.answer_entry.config(state=tk.NORMAL)
         self.answer_entry.delete(0, tk.END)
         
-        # Start the timer
-        self.update_timer()
+        # Start the timer (the countdown is measured against a fixed deadline)
+        start = time.monotonic()
+        self.deadline = start + self.time_left
+        self.timer_label.config(text=f"Time: {self.time_left}s")
+        self.timer_call = self.controller.scheduler.call_every(1.0, self.update_timer, start=start)
     
     def update_timer(self):
-        """Updates the timer display and decrements time."""
+        """Updates the timer display from the time remaining until the deadline."""
+        self.time_left = max(0, math.ceil(self.deadline - time.monotonic()))
         self.timer_label.config(text=f"Time: {self.time_left}s")
         
         if self.time_left <= 0:
             self.log("⏰ Time's up! Game Over!")
             self.log(f"The word was: {self.original_word}")
             self.end_game()
-        else:
-            self.time_left -= 1
-            self.timer_id = self.after(1000, self.update_timer)  # Update every 1 second
+            return False
     
     def stop_timer(self):
         """Stops the timer."""
-        if self.timer_id is not None:
-            self.after_cancel(self.timer_id)
-            self.timer_id = None
+        if self.timer_call is not None:
+            self.controller.scheduler.cancel(self.timer_call)
+            self.timer_call = None
     
     def check_answer(self):
         """Handles the logic when the 'Submit' button is pressed."""
@@ -408,38 +1318,1561 @@ class WordScrambleGUI(tk.Frame):
         self.submit_button.config(state=tk.DISABLED)
         self.answer_entry.config(state=tk.DISABLED)
 
+# --- Battleship Engine ---
+class ShipPlacements:
+    """Every position of a straight ship of 'size' cells, as a sequence of bit masks
+    (cell = row * cols + col).
+    
+    Horizontal placements come first, then vertical ones (a 1-cell ship only has one of each
+    cell). A mask is one shift of the ship's row or column pattern, built when it is indexed,
+    so even the ~20,000 placements of a ship on a 100x100 board take no memory.
+    """
+    def __init__(self, rows, cols, size):
+        self.rows = rows
+        self.cols = cols
+        self.size = size
+        self.across = cols - size + 1 if size <= cols else 0  # Horizontal starts per row
+        self.horizontal = rows * self.across
+        self.vertical = (rows - size + 1) * cols if 1 < size <= rows else 0
+        self.line = (1 << size) - 1
+        self.column = sum(1 << (i * cols) for i in range(size))
+    
+    def __len__(self):
+        return self.horizontal + self.vertical
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if 0 <= index < self.horizontal:
+            row, col = divmod(index, self.across)
+            return self.line << (row * self.cols + col)
+        index -= self.horizontal
+        if 0 <= index < self.vertical:
+            return self.column << index  # Vertical starts are exactly the cells of the top rows
+        raise IndexError("placement index out of range")
+
+    def index(self, mask):
+        """The index of a placement mask (the inverse of indexing)."""
+        start = (mask & -mask).bit_length() - 1
+        row, col = divmod(start, self.cols)
+        if self.horizontal and mask == self.line << start and col < self.across:
+            return row * self.across + col
+        if self.vertical and mask == self.column << start:
+            return self.horizontal + start
+        raise ValueError("not a placement of this ship")
+
+    def mirror(self, index, flip_rows, flip_cols):
+        """The index of a placement reflected top to bottom and/or left to right."""
+        if index < self.horizontal:
+            row, col = divmod(index, self.across)
+            row = self.rows - 1 - row if flip_rows else row
+            col = self.across - 1 - col if flip_cols else col
+            return row * self.across + col
+        row, col = divmod(index - self.horizontal, self.cols)
+        row = self.rows - self.size - row if flip_rows else row
+        col = self.cols - 1 - col if flip_cols else col
+        return self.horizontal + row * self.cols + col
+
+_placement_cache = {}
+
+def ship_placements(rows, cols, size):
+    """The ShipPlacements of a board shape and ship size, shared between callers."""
+    key = (rows, cols, size)
+    placements = _placement_cache.get(key)
+    if placements is None:
+        placements = _placement_cache[key] = ShipPlacements(rows, cols, size)
+    return placements
+
+def ship_mask(rows, cols, row, col, size, direction):
+    """Mask of a ship starting at (row, col) going 'H' (right) or 'V' (down), or 0 if it doesn't fit."""
+    if direction == 'H':
+        if col + size > cols:
+            return 0
+        return ((1 << size) - 1) << (row * cols + col)
+    if row + size > rows:
+        return 0
+    return sum(1 << ((row + i) * cols + col) for i in range(size))
+
+def surroundings(rows, cols, mask):
+    """The cells of 'mask' and every cell touching one of them, diagonals included."""
+    full, first_col, last_col = board_edges(rows, cols)
+    row = mask | (mask >> 1) & ~last_col | (mask << 1) & ~first_col & full
+    return row | row >> cols | (row << cols) & full
+
+def parse_fleet(text):
+    """Reads a fleet like "5 4 3 3 2" or "3, 2x2, 1x3" (size or size x count) into a list of sizes."""
+    sizes = []
+    for part in text.replace(",", " ").split():
+        size, times, count = part.lower().partition("x")
+        if not size.isdigit() or (times and not count.isdigit()):
+            raise ValueError(f"Can't read ship '{part}': use a size like 3, or 3x2 for two of them")
+        sizes.extend([int(size)] * (int(count) if times else 1))
+    if not sizes or min(sizes) < 1:
+        raise ValueError("The fleet needs at least one ship, and ships need at least one cell")
+    return sizes
+
+def format_fleet(sizes):
+    """The inverse of parse_fleet, grouping equal sizes: [3, 2, 2, 1] -> "3, 2x2, 1"."""
+    parts = []
+    for size, group in itertools.groupby(sizes):
+        count = len(list(group))
+        parts.append(f"{size}x{count}" if count > 1 else str(size))
+    return ", ".join(parts)
+
+def fleet_failure(sizes, rows, cols, no_touch, placed):
+    """Why place_fleet returned 'placed' (False or None) for a fleet, as a sentence: only an
+    exhaustive search says the fleet doesn't fit."""
+    fleet = f"a fleet of {format_fleet(sizes)} on a {rows}x{cols} board"
+    rule = " without ships touching" if no_touch else ""
+    if placed is False:
+        return f"Couldn't fit {fleet}{rule}."
+    return f"Couldn't find a placement for {fleet}{rule} in time."
+
+SHIP_NAMES = {5: "Carrier", 4: "Battleship", 3: "Cruiser", 2: "Destroyer", 1: "Submarine"}
+
+class Ship:
+    """One placed ship: its cells as a mask and how many of them haven't been hit yet."""
+    __slots__ = ("id", "size", "mask", "remaining")
+    
+    def __init__(self, ship_id, mask):
+        self.id = ship_id
+        self.mask = mask
+        self.size = self.remaining = mask.bit_count()
+    
+    @property
+    def name(self):
+        return SHIP_NAMES.get(self.size, f"{self.size}-cell ship")
+    
+    @property
+    def sunk(self):
+        return self.remaining == 0
+
+class BattleshipBoard:
+    """One player's waters as integer bitboards: the ship cells, and the hits and misses
+    the opponent has scored on them. Bit row * cols + col stands for one cell, so
+    placement checks, shots and "all sunk" are single bit operations on any grid size.
+    
+    The ships keep their identity in a registry: ship_ids[cell] is the index + 1 of the
+    ship in 'fleet' covering the cell (0 for water), and each Ship counts its unhit cells,
+    so a hit finds its ship and tells whether it sank in O(1).
+    
+    Every cell whose state changes is added to 'dirty' until a view takes it with
+    take_dirty(), so a view only redraws what a shot or a placement touched.
+    
+    With 'no_touch', ships may not touch each other, not even at the corners: 'blocked'
+    then holds the placed ships with the cells around them.
+    """
+    max_size = 100
+    
+    def __init__(self, rows=10, cols=10, no_touch=False):
+        if not (1 <= rows <= self.max_size and 1 <= cols <= self.max_size):
+            raise ValueError(f"Boards must be 1 to {self.max_size} cells on each side")
+        self.rows = rows
+        self.cols = cols
+        self.no_touch = no_touch
+        self.size = rows * cols
+        self.full = (1 << self.size) - 1
+        self.hits = 0
+        self.misses = 0
+        self.dirty = set()
+        self.ships = 0
+        self.clear_ships()
+    
+    def cell(self, row, col):
+        return row * self.cols + col
+    
+    def clear_ships(self):
+        if self.ships:
+            self.dirty.update(bit_cells(self.ships))
+        self.ships = 0
+        self.blocked = 0  # Cells no further ship may cover
+        self.fleet = []
+        self.ship_ids = [0] * self.size
+        self.sunk = 0  # Cells of the sunk ships
+        self.afloat = 0
+    
+    def can_place(self, mask):
+        """Whether a ship mask fits without overlapping (or, with no_touch, touching) another ship."""
+        return mask != 0 and not self.blocked & mask
+    
+    def blocking(self, mask):
+        """The cells a ship covering 'mask' takes away from the ships placed after it."""
+        return surroundings(self.rows, self.cols, mask) if self.no_touch else mask
+    
+    def place(self, mask):
+        """Adds a ship covering 'mask' to the fleet and returns it."""
+        ship = Ship(len(self.fleet) + 1, mask)
+        for cell in bit_cells(mask):
+            self.ship_ids[cell] = ship.id
+            self.dirty.add(cell)
+        self.fleet.append(ship)
+        self.ships |= mask
+        self.blocked |= self.blocking(mask)
+        self.afloat += 1
+        return ship
+    
+    def ship_at(self, cell):
+        """The Ship covering a cell, or None for water."""
+        ship_id = self.ship_ids[cell]
+        return self.fleet[ship_id - 1] if ship_id else None
+    
+    def take_dirty(self):
+        """Returns the cells changed since the last call and starts a new set."""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+    
+    def remaining_fleet(self):
+        """Sizes of the ships not sunk yet, the fleet the opponent is still hunting."""
+        return [ship.size for ship in self.fleet if not ship.sunk]
+    
+    @property
+    def shots(self):
+        """Every cell fired at so far."""
+        return self.hits | self.misses
+    
+    def fire(self, cell):
+        """Fires at a cell. Returns 'H' (hit), 'S' (hit and sunk), 'M' (miss) or None if it
+        was already fired at. After 'S', ship_at(cell) is the ship that went down."""
+        bit = 1 << cell
+        if (self.hits | self.misses) & bit:
+            return None
+        self.dirty.add(cell)
+        if self.ships & bit:
+            self.hits |= bit
+            ship = self.fleet[self.ship_ids[cell] - 1]
+            ship.remaining -= 1
+            if ship.remaining:
+                return 'H'
+            self.sunk |= ship.mask
+            self.dirty.update(bit_cells(ship.mask))  # The whole wreck is drawn as sunk
+            self.afloat -= 1
+            return 'S'
+        self.misses |= bit
+        return 'M'
+    
+    def state(self, cell):
+        """'H', 'M' or ' ' for a cell, as the player firing at it sees it."""
+        bit = 1 << cell
+        if self.hits & bit:
+            return 'H'
+        if self.misses & bit:
+            return 'M'
+        return ' '
+    
+    def has_ship(self, cell):
+        return bool(self.ships >> cell & 1)
+    
+    def all_sunk(self):
+        return bool(self.fleet) and self.afloat == 0
+
+def shuffled(items, rng=random):
+    """Yields the items of a sequence in uniformly random order, drawing one at a time: a
+    Fisher-Yates shuffle that records only the swaps it has made, so stopping after a few
+    draws costs a few steps even for a sequence of thousands of placements."""
+    swaps = {}
+    count = len(items)
+    for i in range(count):
+        j = rng.randrange(i, count)
+        yield items[swaps.get(j, j)]
+        swaps[j] = swaps.get(i, i)
+
+def fitting_starts(rows, cols, size, free):
+    """(horizontal, vertical) masks of the starts of the placements of 'size' that lie on 'free' cells."""
+    horizontal, vertical = ship_starts(rows, cols, size)
+    horizontal &= free
+    vertical &= free
+    for i in range(1, size):
+        horizontal &= free >> i
+        vertical &= free >> (i * cols)
+    return horizontal, vertical
+
+def search_fleet(board, order, rng, max_checks):
+    """One randomized backtracking search for place_fleet. Returns (masks, checks) with the
+    masks of a fitting fleet, False instead of masks when no arrangement exists, or None when
+    'max_checks' placements were checked first.
+    
+    Ships of equal size are interchangeable, so each takes a placement later in its size's
+    random order than the one before it: every set of positions is tried once, not once per
+    ordering. A position is cut off as soon as the ships left can't cover enough of the free
+    cells. Once they must cover nearly all the cells they can reach, fewer spare cells than the
+    smallest ship, the search works through those cells in order instead of placing the next
+    ship, like a tiling: the first one holds the start of a ship, or is left as water while
+    cells can be spared.
+    """
+    rows, cols = board.rows, board.cols
+    full = board_edges(rows, cols)[0]
+    counts = Counter(order)
+    draws = {size: shuffled(ship_placements(rows, cols, size), rng) for size in counts}
+    drawn = {size: [] for size in counts}  # The placements of each size drawn so far, in order
+    last = dict.fromkeys(counts, -1)  # Position in drawn[size] of the last ship placed by size
+    
+    def ordered(size, position):
+        while True:
+            if position == len(drawn[size]):
+                mask = next(draws[size], None)
+                if mask is None:
+                    return
+                drawn[size].append(mask)
+            yield drawn[size][position], size, position
+            position += 1
+    
+    def candidates(blocked, needed):
+        """The (mask, size, position) choices for the next step: position is None when the step
+        fills a cell, and size 0 when it leaves the cell as water."""
+        free = full & ~blocked
+        if free.bit_count() - needed >= roomy:  # Plenty of room left: not worth counting
+            size = order[len(chosen)]  # Until the search fills cells, ships go in 'order'
+            return ordered(size, last[size] + 1)
+        fits = {}
+        reach = 0
+        for size, count in counts.items():
+            if count:
+                horizontal, vertical = fits[size] = fitting_starts(rows, cols, size, free)
+                if not horizontal | vertical:
+                    return ()
+                for i in range(size):
+                    reach |= horizontal << i | vertical << (i * cols)
+        reachable = reach.bit_count()
+        if reachable < needed:
+            return ()
+        if reachable - needed >= min(fits):
+            size = max(fits)
+            return ordered(size, last[size] + 1)
+        # No cell before the first reachable one can hold a ship, so a ship covering it starts there
+        cell = (reach & -reach).bit_length() - 1
+        choices = [(1 << cell, 0, None)] if reachable > needed else []
+        for size, (horizontal, vertical) in fits.items():
+            placements = ship_placements(rows, cols, size)
+            if horizontal >> cell & 1:
+                choices.append((placements.line << cell, size, None))
+            if vertical >> cell & 1:
+                choices.append((placements.column << cell, size, None))
+        rng.shuffle(choices)
+        return choices
+    
+    needed = roomy = sum(order)
+    blocked = [board.blocked]  # blocked[i]: cells unavailable to the i-th ship
+    chosen = []  # (mask, size, last[size] before it) of the step at each depth
+    frames = [iter(candidates(board.blocked, needed))]
+    checks = 0
+    while frames:
+        depth = len(frames) - 1
+        if len(chosen) > depth:  # Back from a dead end: take this depth's ship off again
+            mask, size, previous = chosen.pop()
+            if size:
+                counts[size] += 1
+                needed += size
+                last[size] = previous
+        for mask, size, position in frames[depth]:
+            checks += 1
+            if checks > max_checks:
+                return None, checks
+            if not mask & blocked[depth]:
+                break
+        else:
+            frames.pop()
+            blocked.pop()
+            continue
+        if not size:
+            chosen.append((mask, 0, None))
+            blocked.append(blocked[depth] | mask)
+            frames.append(iter(candidates(blocked[-1], needed)))
+            continue
+        chosen.append((mask, size, last[size]))
+        counts[size] -= 1
+        needed -= size
+        if position is not None:
+            last[size] = position
+        if not needed:
+            return [mask for mask, size, _ in chosen if size], checks
+        blocked.append(blocked[depth] | board.blocking(mask))
+        frames.append(iter(candidates(blocked[-1], needed)))
+    return False, checks
+
+def place_fleet(board, sizes, rng=random, max_checks=200000):
+    """Places ships of the given sizes at random on the board, around any ships already there.
+    
+    Each ship takes the first of its placements, drawn in random order, that fits: a uniform
+    pick among the legal positions, with no retry loop. When none fits, the previous ship moves
+    on to its next position (backtracking); see search_fleet for how dead ends are cut short.
+    A search that runs long restarts with fresh random orders and twice the checks, so one
+    unlucky early ship can't use up the budget. Larger ships go first as they are the hardest
+    to fit.
+    
+    Returns True once the fleet is placed, largest ship first. Otherwise the board is unchanged
+    and the result is False if no arrangement exists (every one was ruled out), or None if
+    'max_checks' placements were checked without finding one.
+    """
+    order = sorted(sizes, reverse=True)
+    if sum(order) > board.size - board.ships.bit_count():
+        return False
+    checks = 0
+    run = 1000
+    while checks < max_checks:
+        masks, used = search_fleet(board, order, rng, min(run, max_checks - checks))
+        if masks is False:
+            return False
+        if masks is not None:
+            for mask in sorted(masks, key=int.bit_count, reverse=True):
+                board.place(mask)
+            return True
+        checks += used
+        run *= 2
+    return None
+
+BATTLESHIP_DIFFICULTIES = ("Easy", "Normal", "Hard")
+
+BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+def bit_cells(mask):
+    """Cell numbers of the set bits of a board mask, lowest first."""
+    cells = []
+    for index, value in enumerate(mask.to_bytes((mask.bit_length() + 7) // 8, 'little')):
+        if value:
+            base = index * 8
+            cells.extend([base + bit for bit in BYTE_BITS[value]])
+    return cells
+
+def random_cell(mask, rng=random):
+    """A uniformly random set bit of a non-empty mask, found by counting bits a byte at a time
+    instead of listing every cell."""
+    skip = rng.randrange(mask.bit_count())
+    for index, value in enumerate(mask.to_bytes((mask.bit_length() + 7) // 8, 'little')):
+        count = len(BYTE_BITS[value])
+        if skip < count:
+            return index * 8 + BYTE_BITS[value][skip]
+        skip -= count
+
+_edge_cache = {}
+
+def board_edges(rows, cols):
+    """(full, first column, last column) masks of a board shape."""
+    key = (rows, cols)
+    edges = _edge_cache.get(key)
+    if edges is None:
+        first = sum(1 << (row * cols) for row in range(rows))
+        edges = _edge_cache[key] = ((1 << (rows * cols)) - 1, first, first << (cols - 1))
+    return edges
+
+_start_cache = {}
+
+def ship_starts(rows, cols, size):
+    """(horizontal, vertical) masks of the cells where a ship of 'size' can start and still fit."""
+    key = (rows, cols, size)
+    starts = _start_cache.get(key)
+    if starts is None:
+        horizontal = vertical = 0
+        if size <= cols:
+            horizontal = sum(((1 << (cols - size + 1)) - 1) << (row * cols) for row in range(rows))
+        if 1 < size <= rows:  # A 1-cell ship is only counted once, as horizontal
+            vertical = (1 << ((rows - size + 1) * cols)) - 1
+        starts = _start_cache[key] = (horizontal, vertical)
+    return starts
+
+_parity_cache = {}
+
+def parity_cells(rows, cols, spacing):
+    """Mask of the diagonal lattice (row + col) % spacing == 0: every ship of 'spacing' or more cells
+    crosses it, so hunting there finds the smallest ship left in the fewest shots."""
+    key = (rows, cols, spacing)
+    mask = _parity_cache.get(key)
+    if mask is None:
+        mask = _parity_cache[key] = sum(1 << (row * cols + col) for row in range(rows)
+                                        for col in range(cols) if (row + col) % spacing == 0)
+    return mask
+
+def add_to_counts(planes, mask, place=0):
+    """Adds 2**place to the count of every cell in 'mask'. The counts are bit-sliced: bit c of
+    planes[j] is bit j of cell c's count, so one addition is a ripple carry over a few big-int
+    planes."""
+    while mask:
+        if place >= len(planes):
+            planes.extend([0] * (place - len(planes)))
+            planes.append(mask)
+            return
+        carry = planes[place] & mask
+        planes[place] ^= mask
+        mask = carry
+        place += 1
+
+def densest_cells(planes, candidates):
+    """Mask of the candidate cells with the highest count (0 if every candidate's count is 0)."""
+    if not candidates & functools.reduce(operator.or_, planes, 0):
+        return 0
+    for plane in reversed(planes):
+        if candidates & plane:
+            candidates &= plane
+    return candidates
+
+def placement_density(rows, cols, hits, misses, fleet, sunk=0, target=True):
+    """Counts, for every cell, the placements of the fleet's ships consistent with the shots.
+    
+    A placement may not cross a miss or a cell of a sunk ship. With 'target' set and hits not yet
+    part of a sunk ship on the board, only placements through those hits count, once per hit they
+    cover. Every ship position is handled at once: the valid start cells of one size and direction
+    are a mask, found by ANDing the free cells shifted once per ship cell. Returns bit-sliced
+    counter planes (see add_to_counts). Ships of the same size are counted once and added with
+    their multiplicity, one addition per bit of it.
+    """
+    full = board_edges(rows, cols)[0]
+    free = full & ~(misses | sunk)
+    open_hits = hits & ~sunk if target else 0
+    planes = []
+    for size, count in Counter(fleet).items():
+        places = [place for place in range(count.bit_length()) if count >> place & 1]
+        for starts, step in zip(ship_starts(rows, cols, size), (1, cols)):
+            valid = starts
+            for i in range(size):
+                valid &= free >> (i * step)
+            if not open_hits:
+                for j in range(size):
+                    for place in places:
+                        add_to_counts(planes, valid << (j * step), place)
+                continue
+            for k in range(size):
+                through = valid & (open_hits >> (k * step))  # Placements with an open hit at cell k
+                if through:
+                    for j in range(size):
+                        for place in places:
+                            add_to_counts(planes, through << (j * step), place)
+    return planes
+
+def battleship_target(difficulty, rows, cols, hits, misses, fleet, sunk=0, rng=random, no_touch=False):
+    """Picks the computer's next shot as a cell number, or None when every cell has been fired at.
+    
+    'hits', 'misses' and 'sunk' are masks of what the shooter has seen, 'fleet' the sizes of the
+    ships still afloat. Easy fires at random. Normal hunts on the parity lattice of the smallest
+    ship left, then works outward from hits that don't belong to a sunk ship, following a line of
+    hits when it has one. Hard fires at the cell the most consistent placements cover. Under the
+    no-touch rule, Normal and Hard also know the water around a sunk ship is empty.
+    """
+    full, first_col, last_col = board_edges(rows, cols)
+    unshot = full & ~(hits | misses)
+    if not unshot:
+        return None
+    if no_touch and difficulty != "Easy" and sunk:
+        sunk = surroundings(rows, cols, sunk)
+        unshot = unshot & ~sunk or unshot
+    choices = 0
+    if difficulty == "Hard" and fleet:
+        choices = densest_cells(placement_density(rows, cols, hits, misses, fleet, sunk), unshot)
+        if not choices:  # No placement explains the open hits; fall back to hunting
+            choices = densest_cells(placement_density(rows, cols, hits, misses, fleet, sunk, False), unshot)
+    elif difficulty == "Normal":
+        open_hits = hits & ~sunk
+        if open_hits:
+            left = (open_hits >> 1) & ~last_col
+            right = (open_hits << 1) & ~first_col & full
+            up = open_hits >> cols
+            down = (open_hits << cols) & full
+            across = open_hits & (left | right)  # Hits with a hit beside them
+            along = open_hits & (up | down)  # Hits with a hit above or below them
+            line_ends = ((across >> 1) & ~last_col | (across << 1) & ~first_col
+                         | along >> cols | (along << cols) & full)
+            choices = line_ends & unshot or (left | right | up | down) & unshot
+        if not choices and fleet:
+            choices = parity_cells(rows, cols, min(fleet)) & unshot
+    return random_cell(choices or unshot, rng)
+
+# --- Battleship Tournament ---
+BATTLESHIP_PLACERS = {"Random": place_fleet}  # Name -> function(board, sizes, rng) returning False if the fleet didn't fit
+
+def parse_battleship_player(text):
+    """Reads a tournament player "Placer/Targeting" (e.g. "Random/Hard") into a (placer, targeting) pair."""
+    placer, _, targeting = text.strip().partition("/")
+    if placer not in BATTLESHIP_PLACERS or targeting not in BATTLESHIP_DIFFICULTIES:
+        raise ValueError(f"Unknown player '{text}': use Placer/Targeting with a placer from "
+                         f"{', '.join(BATTLESHIP_PLACERS)} and targeting from {', '.join(BATTLESHIP_DIFFICULTIES)}")
+    return placer, targeting
+
+def battleship_shots(targeting, board, rng=random):
+    """Fires at a board at one of the targeting levels, seeing only what a player would, until
+    every ship is sunk. Returns the number of shots it took."""
+    shots = 0
+    while not board.all_sunk():
+        board.fire(battleship_target(targeting, board.rows, board.cols, board.hits, board.misses,
+                                     board.remaining_fleet(), board.sunk, rng, board.no_touch))
+        shots += 1
+    return shots
+
+def battleship_match(rows, cols, sizes, no_touch, first, second, games, seed):
+    """Plays 'games' games between two (placer, targeting) players. Runs in a worker process.
+    
+    Neither side's shots affect the other's board, so a game is decided by how many shots each
+    side needs to sink the other: fewer wins, and on a tie the side that moved first (alternating
+    from game to game) gets there first. Returns (wins of 'first', and the count, sum and sum of
+    squares of each side's shots to win or sink).
+    """
+    rng = random.Random(seed)
+    wins = 0
+    stats = [[0, 0, 0], [0, 0, 0]]
+    for game in range(games):
+        needed = []
+        for shooter, placer in ((first, second), (second, first)):
+            board = BattleshipBoard(rows, cols, no_touch)
+            placed = BATTLESHIP_PLACERS[placer[0]](board, sizes, rng)
+            if not placed:
+                raise ValueError(f"{placer[0]} placement: {fleet_failure(sizes, rows, cols, no_touch, placed)}")
+            needed.append(battleship_shots(shooter[1], board, rng))
+        if needed[0] < needed[1] or (needed[0] == needed[1] and game % 2 == 0):
+            wins += 1
+        for side, shots in zip(stats, needed):
+            side[0] += 1
+            side[1] += shots
+            side[2] += shots * shots
+    return wins, stats
+
+def wilson_interval(wins, games, z=1.96):
+    """95% Wilson score interval of a win rate, as (low, high)."""
+    if not games:
+        return 0.0, 1.0
+    rate = wins / games
+    centre = rate + z * z / (2 * games)
+    margin = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games))
+    scale = 1 + z * z / games
+    return (centre - margin) / scale, (centre + margin) / scale
+
+def process_map(function, tasks, workers):
+    """Yields function(*task) for each task in order, from a pool of 'workers' processes (or
+    in this process when workers is 1). Closing the generator early cancels the rest.
+    
+    Workers are spawned, not forked, on every platform: forking a process that has other
+    threads running (Tk's, the AI worker) can leave a lock held forever in the child."""
+    if workers == 1:
+        yield from (function(*task) for task in tasks)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        yield from pool.map(function, *zip(*tasks))
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+def battleship_tournament(players, games, rows=10, cols=10, sizes=(3, 2, 2, 1, 1, 1), no_touch=False,
+                          workers=None, seed=None, chunk=100):
+    """Plays every pair of (placer, targeting) players against each other 'games' times, spread
+    over a process pool in chunks of 'chunk' games. Each chunk has its own seed drawn from 'seed',
+    so a seeded tournament gives the same results on any number of workers. Returns a report
+    dict for format_battleship_tournament.
+    """
+    sizes = list(sizes)
+    placed = place_fleet(BattleshipBoard(rows, cols, no_touch), sizes)
+    if not placed:
+        raise ValueError(fleet_failure(sizes, rows, cols, no_touch, placed))
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    pairs = list(itertools.combinations(range(len(players)), 2))
+    tasks = []
+    for a, b in pairs:
+        for start in range(0, games, chunk):
+            tasks.append((a, b, (rows, cols, sizes, no_touch, players[a], players[b],
+                                 min(chunk, games - start), rng.randrange(1 << 62))))
+    
+    wins = {pair: 0 for pair in pairs}
+    shots = [[0, 0, 0] for _ in players]
+    if any(placer == "Adversarial" for placer, _ in players):
+        # Train (or read) the layouts once here rather than in every worker
+        layout_book(rows, cols, sizes, no_touch).load(seed=seed, workers=workers)
+    start = time.perf_counter()
+    results = process_map(battleship_match, [args for _, _, args in tasks], workers)
+    for (a, b, _), (won, stats) in zip(tasks, results):
+        wins[(a, b)] += won
+        for player, side in zip((a, b), stats):
+            shots[player] = [total + value for total, value in zip(shots[player], side)]
+    return {"players": players, "games": games, "rows": rows, "cols": cols, "sizes": sizes,
+            "no_touch": no_touch, "workers": workers, "wins": wins, "shots": shots,
+            "seconds": time.perf_counter() - start}
+
+def format_battleship_tournament(report):
+    """Turns the tournament report into readable text: shots per player, the win-rate matrix
+    (row player against column player, with 95% intervals) and the throughput."""
+    names = [f"{placer}/{targeting}" for placer, targeting in report["players"]]
+    width = max(12, *map(len, names)) + 2
+    rule = ", no touching" if report["no_touch"] else ""
+    lines = [f"Battleship tournament: {report['rows']}x{report['cols']} board, fleet {format_fleet(report['sizes'])}{rule}, "
+             f"{report['games']:,} games per pairing, {report['workers']} worker(s)", "",
+             "Shots to sink the opponent's fleet (mean ± sd):"]
+    for name, (count, total, squares) in zip(names, report["shots"]):
+        mean = total / count if count else 0.0
+        spread = math.sqrt(max(squares / count - mean * mean, 0.0)) if count else 0.0
+        lines.append(f"  {name:<{width}}{mean:6.2f} ± {spread:.2f}")
+    
+    lines += ["", "Win rate, row against column (95% interval):", " " * (width + 2) + "".join(f"{name:<22}" for name in names)]
+    for i, name in enumerate(names):
+        cells = []
+        for j in range(len(names)):
+            if i == j:
+                cells.append(f"{'-':<22}")
+                continue
+            won = report["wins"][(i, j)] if i < j else report["games"] - report["wins"][(j, i)]
+            low, high = wilson_interval(won, report["games"])
+            text = f"{won / report['games']:.1%} ({low:.1%}-{high:.1%})"
+            cells.append(f"{text:<22}")
+        lines.append(f"  {name:<{width}}" + "".join(cells))
+    
+    total = report["games"] * len(report["wins"])
+    lines += ["", f"{total:,} games in {report['seconds']:.2f}s ({total / max(report['seconds'], 1e-9):,.0f} games/s)"]
+    return "\n".join(lines)
+
+# --- Battleship Layout Book ---
+def battleship_layout_candidates(rows, cols, sizes, no_touch, count, seed):
+    """Draws 'count' random layouts of a fleet. Runs in a worker process.
+    
+    Returns (score, ship masks) pairs, largest ship first. The score sums, over the layout's
+    cells, how many placements of the fleet cover each cell on an unshot board: a layout in the
+    quiet parts of the board scores low, and is one a density-led hunt reaches late.
+    """
+    rng = random.Random(seed)
+    planes = placement_density(rows, cols, 0, 0, sizes, target=False)
+    layouts = []
+    for _ in range(count):
+        board = BattleshipBoard(rows, cols, no_touch)
+        if not place_fleet(board, sizes, rng):
+            break
+        score = sum((plane & board.ships).bit_count() << place for place, plane in enumerate(planes))
+        layouts.append((score, [ship.mask for ship in board.fleet]))
+    return layouts
+
+def battleship_layout_shots(rows, cols, no_touch, layouts, targetings, trials, seed):
+    """Mean shots each layout (a list of ship masks) took to sink, over 'trials' games against
+    each of the targeting levels. Runs in a worker process."""
+    rng = random.Random(seed)
+    means = []
+    for masks in layouts:
+        total = 0
+        for targeting in targetings:
+            for _ in range(trials):
+                board = BattleshipBoard(rows, cols, no_touch)
+                for mask in masks:
+                    board.place(mask)
+                total += battleship_shots(targeting, board, rng)
+        means.append(total / (len(targetings) * trials))
+    return means
+
+class BattleshipLayoutBook:
+    """Fleet layouts that common targeting strategies take long to sink, trained offline for
+    one board shape, fleet and touching rule.
+    
+    Training draws random layouts in seeded batches and ranks them by their score from
+    battleship_layout_candidates. The most promising are played out against the Normal and
+    Hard targeting, and the 'keep' layouts that took the most shots to sink are written to
+    the file. Each batch has its own seed drawn from the training seed, so the same seed gives
+    the same book on any number of workers.
+    
+    The file starts with a JSON line of the training settings (seed, candidates, simulated,
+    trials), and is only reused for a request it covers: the same seed, if one is asked for,
+    and at least as much training. Only a training that ran to the end is written. Then comes
+    one 16-bit little-endian placement index (see ShipPlacements) per ship, largest ship first,
+    for each layout: 3 KB for the classic fleet. Sampling picks a random layout and a random
+    mirror image of it, a few index lookups whatever the board size.
+    """
+    keep = 256
+    targetings = ("Normal", "Hard")
+    candidate_batch = 100
+    simulation_batch = 4
+    candidates = 20000  # The full training
+    simulated = 1024
+    trials = 4
+    
+    def __init__(self, cache_dir, rows, cols, sizes, no_touch=False):
+        self.rows = rows
+        self.cols = cols
+        self.sizes = sorted(sizes, reverse=True)
+        self.no_touch = no_touch
+        self.placements = [ship_placements(rows, cols, size) for size in self.sizes]
+        fleet = format_fleet(self.sizes).replace(", ", "-")
+        self.file_name = f"battleship_layouts_{rows}x{cols}_{fleet}{'_nt' if no_touch else ''}.bin"
+        self.path = os.path.join(cache_dir, self.file_name) if cache_dir else None
+        self.data = None
+        self.trained = None  # The training settings of 'data'
+        self.complete = False  # Whether that training ran to the end
+    
+    def __len__(self):
+        return len(self.data) // (2 * len(self.sizes)) if self.data else 0
+    
+    def encode(self, masks):
+        """Packs a layout's ship masks (largest ship first) into its file entry."""
+        indices = [placements.index(mask) for placements, mask in zip(self.placements, masks)]
+        return b"".join(index.to_bytes(2, 'little') for index in indices)
+    
+    def training(self, seed=None, candidates=None, simulated=None, trials=None):
+        """The training settings of a build, with the full training's for those not given."""
+        return {"seed": seed, "candidates": self.candidates if candidates is None else candidates,
+                "simulated": self.simulated if simulated is None else simulated,
+                "trials": self.trials if trials is None else trials}
+    
+    def build(self, seed=None, candidates=None, simulated=None, trials=None, workers=1, stop=None, deadline=None):
+        """Trains the book: scores 'candidates' random layouts and plays 'simulated' of the best
+        'trials' times against each targeting level. Stops early, keeping the best layouts found
+        so far, once 'stop' is set or time.perf_counter() passes 'deadline'. Returns the book bytes
+        and the training settings for the file, or None for them if the training was cut short.
+        """
+        training = self.training(seed, candidates, simulated, trials)
+        candidates, simulated, trials = training["candidates"], training["simulated"], training["trials"]
+        rng = random.Random(seed)
+        settings = (self.rows, self.cols, self.sizes, self.no_touch)
+        tasks = [settings + (min(self.candidate_batch, candidates - start), rng.randrange(1 << 62))
+                 for start in range(0, candidates, self.candidate_batch)]
+        
+        def stopped():
+            return (stop is not None and stop.is_set()) or (deadline is not None and time.perf_counter() > deadline)
+        
+        scored = {}
+        complete = True
+        batches = process_map(battleship_layout_candidates, tasks, workers)
+        for done, batch in enumerate(batches, 1):
+            for score, masks in batch:
+                scored.setdefault(self.encode(masks), (score, masks))
+            if stopped():
+                batches.close()
+                complete = done == len(tasks)
+                break
+        ranked = sorted(scored.items(), key=lambda item: item[1][0])  # Lowest score first
+        
+        trained = ranked[:simulated]
+        tasks = [(self.rows, self.cols, self.no_touch, [masks for _, (_, masks) in trained[start:start + self.simulation_batch]],
+                  self.targetings, trials, rng.randrange(1 << 62))
+                 for start in range(0, len(trained), self.simulation_batch)]
+        shots = []
+        if complete:
+            batches = process_map(battleship_layout_shots, tasks, workers)
+            for done, means in enumerate(batches, 1):
+                shots.extend(means)
+                if stopped():
+                    batches.close()
+                    complete = done == len(tasks)
+                    break
+        
+        # Most shots to sink first; layouts not played out follow in score order
+        best = sorted(range(len(shots)), key=lambda i: -shots[i]) + list(range(len(shots), len(ranked)))
+        return b"".join(ranked[i][0] for i in best[:self.keep]), training if complete else None
+    
+    def covers(self, trained, settings):
+        """Whether a book trained with 'trained' settings will do for a request with these build
+        settings: the same seed if one is asked for, and at least as much training."""
+        wanted = self.training(*(settings.get(name) for name in ("seed", "candidates", "simulated", "trials")))
+        return (isinstance(trained, dict)
+                and (wanted["seed"] is None or trained.get("seed") == wanted["seed"])
+                and all(trained.get(name, 0) >= wanted[name] for name in ("candidates", "simulated", "trials")))
+    
+    def read(self, partial=False, **settings):
+        """The book for a request with these build settings: the one in memory or the book file,
+        if it covers them. With partial=True a book trained for them but cut short by the deadline
+        will also do. Returns the bytes, or None if there is no such book."""
+        if self.data is not None and (self.complete or partial) and self.covers(self.trained, settings):
+            return self.data
+        if not (self.path and os.path.exists(self.path)):
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                trained = json.loads(f.readline())
+                data = f.read()
+        except OSError as e:
+            print(f"Could not read the Battleship layouts: {e}")
+            return None
+        except ValueError:
+            return None  # No settings line: a book from before they were recorded
+        if len(data) % (2 * len(self.sizes)) or not self.covers(trained, settings):
+            return None
+        self.data, self.trained, self.complete = data, trained, True
+        return data
+    
+    def save(self, data, training):
+        """Writes the book file: the training settings line, then the layouts."""
+        with open(self.path, 'wb') as f:
+            f.write(json.dumps(training).encode() + b"\n")
+            f.write(data)
+    
+    def load(self, stop=None, partial=False, **settings):
+        """Reads the book (see read), training it first if there is none for these settings
+        (passing 'settings' on to build). A training cut short by 'stop' is thrown away, and one
+        cut short by the deadline is kept in memory but not written. Returns the bytes."""
+        data = self.read(partial, **settings)
+        if data is not None:
+            return data
+        
+        data, training = self.build(stop=stop, **settings)
+        if stop is not None and stop.is_set():
+            return data
+        if self.path and data and training is not None:
+            try:
+                self.save(data, training)
+            except OSError as e:
+                print(f"Could not write the Battleship layouts: {e}")
+        self.complete = training is not None
+        self.trained = training or self.training(*(settings.get(name) for name in ("seed", "candidates", "simulated", "trials")))
+        self.data = data
+        return data
+    
+    def sample(self, rng=random):
+        """Ship masks of a random layout from the book, randomly mirrored, or None if it's empty."""
+        if not len(self):
+            return None
+        entry = 2 * len(self.sizes)
+        offset = rng.randrange(len(self)) * entry
+        flip_rows, flip_cols = rng.random() < 0.5, rng.random() < 0.5
+        return [placements[placements.mirror(int.from_bytes(self.data[offset + 2 * i:offset + 2 * i + 2], 'little'),
+                                             flip_rows, flip_cols)]
+                for i, placements in enumerate(self.placements)]
+
+_layout_books = {}
+
+def layout_book(rows, cols, sizes, no_touch=False):
+    """The BattleshipLayoutBook of a board shape, fleet and rule, shared between callers (not loaded yet)."""
+    key = (rows, cols, tuple(sorted(sizes, reverse=True)), no_touch)
+    book = _layout_books.get(key)
+    if book is None:
+        book = _layout_books[key] = BattleshipLayoutBook(os.path.dirname(os.path.abspath(__file__)), *key)
+    return book
+
+def adversarial_placement(board, sizes, rng=random, **settings):
+    """Places the fleet as a layout from the trained book (training it first, with the book's
+    load 'settings', if there is none for them yet). Falls back to place_fleet on a board that
+    already has ships or with an empty book."""
+    if board.ships:
+        return place_fleet(board, sizes, rng)
+    book = layout_book(board.rows, board.cols, sizes, board.no_touch)
+    book.load(**settings)
+    masks = book.sample(rng)
+    if masks is None:
+        return place_fleet(board, sizes, rng)
+    for mask in masks:
+        board.place(mask)
+    return True
+
+BATTLESHIP_PLACERS["Adversarial"] = adversarial_placement
+
+# --- Battleship Network Play ---
+# Message kinds. A message is its kind byte followed by a fixed little-endian payload
+# (HELLO adds one byte per ship), so a shot is 3 bytes on the wire and its result 4.
+NET_HELLO, NET_READY, NET_SHOT, NET_RESULT, NET_SUNK, NET_BYE = range(1, 7)
+NET_VERSION = 1
+NET_PAYLOADS = {
+    NET_HELLO: struct.Struct("<BBBBH"),  # Version, rows, cols, flags (1 = no touching), ship count
+    NET_READY: struct.Struct("<"),
+    NET_SHOT: struct.Struct("<H"),  # Cell
+    NET_RESULT: struct.Struct("<HB"),  # Cell, 1 for a hit
+    NET_SUNK: struct.Struct("<HHB"),  # Cell, the wreck's first cell, its size + 128 if vertical
+    NET_BYE: struct.Struct("<"),
+}
+
+class BattleshipProtocolError(Exception):
+    """The other side sent a message the protocol or the rules don't allow."""
+
+def encode_net_message(kind, *fields):
+    """The bytes of a message; HELLO takes (version, rows, cols, flags, sizes)."""
+    if kind == NET_HELLO:
+        *header, sizes = fields
+        return bytes((kind,)) + NET_PAYLOADS[kind].pack(*header, len(sizes)) + bytes(sizes)
+    return bytes((kind,)) + NET_PAYLOADS[kind].pack(*fields)
+
+async def read_net_message(reader):
+    """Reads one message from an asyncio stream as (kind, fields), HELLO's sizes as a list."""
+    kind = (await reader.readexactly(1))[0]
+    payload = NET_PAYLOADS.get(kind)
+    if payload is None:
+        raise BattleshipProtocolError(f"Unknown message kind {kind}")
+    fields = payload.unpack(await reader.readexactly(payload.size))
+    if kind == NET_HELLO:
+        fields = fields[:-1] + (list(await reader.readexactly(fields[-1])),)
+    return kind, fields
+
+class RemoteBattleshipBoard(BattleshipBoard):
+    """The opponent's waters in a networked game as this side knows them: the reported result
+    of every shot, and the ships those shots sank. The rest of the fleet stays on the other
+    machine; only its sizes are known."""
+    def __init__(self, rows, cols, no_touch, sizes):
+        super().__init__(rows, cols, no_touch)
+        self.sizes = list(sizes)
+    
+    def record(self, cell, result, wreck=0):
+        """Marks a shot's reported result: 'H', 'M', or 'S' with the mask of the sunk ship."""
+        bit = 1 << cell
+        self.dirty.add(cell)
+        if result == 'M':
+            self.misses |= bit
+            return
+        self.hits |= bit
+        if result == 'S':
+            ship = self.place(wreck)
+            ship.remaining = 0
+            self.afloat -= 1
+            self.sunk |= wreck
+            self.dirty.update(bit_cells(wreck))
+    
+    def remaining_fleet(self):
+        left = Counter(self.sizes)
+        left.subtract(ship.size for ship in self.fleet)
+        return sorted(left.elements(), reverse=True)
+    
+    def all_sunk(self):
+        return len(self.fleet) == len(self.sizes)
+
+class BattleshipNetGame:
+    """One side of a networked game: the rules of the exchange, with the transport left to
+    the caller.
+    
+    The host chooses the board and fleet and sends them in HELLO, and each side sends READY
+    once its fleet is placed. The host fires first and every shot passes the turn. A SHOT is
+    answered with RESULT, or SUNK with the wreck (every cell of which the shooter has hit), so
+    ship positions never leave the machine they were placed on. Anything else raises
+    BattleshipProtocolError.
+    
+    'send' takes a message's bytes. 'notify' is called with "settings" (a guest got the
+    settings), "start", "result" and "shot" (cell, 'H'/'M'/'S' of our shot and of theirs) and "bye".
+    """
+    def __init__(self, hosting, send, notify):
+        self.hosting = hosting
+        self.send = send
+        self.notify = notify
+        self.own = self.remote = None
+        self.sizes = []
+        self.placed = self.opponent_ready = False
+        self.my_turn = hosting
+        self.awaiting = None  # The cell of our shot waiting for its result
+        self.over = False
+    
+    @property
+    def started(self):
+        return self.placed and self.opponent_ready
+    
+    def configure(self, rows, cols, no_touch, sizes):
+        """Sets up both boards for the game's settings; the host also sends them."""
+        self.own = BattleshipBoard(rows, cols, no_touch)
+        self.remote = RemoteBattleshipBoard(rows, cols, no_touch, sizes)
+        self.sizes = list(sizes)
+        if self.hosting:
+            self.send(encode_net_message(NET_HELLO, NET_VERSION, rows, cols, int(no_touch), self.sizes))
+    
+    def ready(self):
+        """Tells the opponent our fleet is placed."""
+        self.placed = True
+        self.send(encode_net_message(NET_READY))
+        if self.started:
+            self.notify("start")
+    
+    def fire(self, cell):
+        """Sends our shot at a cell. Returns False if it isn't our turn or the cell was fired at already."""
+        if not self.started or self.over or not self.my_turn or self.awaiting is not None or self.remote.shots >> cell & 1:
+            return False
+        self.awaiting = cell
+        self.send(encode_net_message(NET_SHOT, cell))
+        return True
+    
+    def quit(self):
+        """Tells the opponent we are leaving."""
+        self.over = True
+        self.send(encode_net_message(NET_BYE))
+    
+    def receive(self, kind, fields):
+        """Applies a message from the opponent."""
+        if kind == NET_HELLO:
+            version, rows, cols, flags, sizes = fields
+            if self.hosting or self.own is not None:
+                raise BattleshipProtocolError("Unexpected game settings")
+            if version != NET_VERSION:
+                raise BattleshipProtocolError(f"The other player uses protocol version {version}, not {NET_VERSION}")
+            if not sizes or min(sizes) < 1:
+                raise BattleshipProtocolError("The fleet has no ships")
+            try:
+                self.configure(rows, cols, bool(flags & 1), sizes)
+            except ValueError as e:
+                raise BattleshipProtocolError(str(e)) from None
+            self.notify("settings")
+        elif kind == NET_READY:
+            if self.own is None or self.opponent_ready:
+                raise BattleshipProtocolError("Unexpected ready message")
+            self.opponent_ready = True
+            if self.started:
+                self.notify("start")
+        elif kind == NET_SHOT:
+            cell, = fields
+            if not self.started or self.over or self.my_turn or cell >= self.own.size:
+                raise BattleshipProtocolError("Shot out of turn or off the board")
+            result = self.own.fire(cell)
+            if result is None:
+                raise BattleshipProtocolError("Shot at a cell fired at before")
+            if result == 'S':
+                wreck = self.own.ship_at(cell).mask
+                start = (wreck & -wreck).bit_length() - 1
+                size = wreck.bit_count()
+                vertical = wreck != ((1 << size) - 1) << start
+                self.send(encode_net_message(NET_SUNK, cell, start, size | vertical << 7))
+            else:
+                self.send(encode_net_message(NET_RESULT, cell, result == 'H'))
+            self.my_turn = True
+            self.over = self.own.all_sunk()
+            self.notify("shot", cell, result)
+        elif kind in (NET_RESULT, NET_SUNK):
+            cell = fields[0]
+            if cell != self.awaiting:
+                raise BattleshipProtocolError("Result for a shot that wasn't fired")
+            board = self.remote
+            wreck = 0
+            if kind == NET_SUNK:
+                start, shape = fields[1:]
+                size = shape & 0x7f
+                if start < board.size:
+                    wreck = ship_mask(board.rows, board.cols, *divmod(start, board.cols), size, 'V' if shape >> 7 else 'H')
+                if (not wreck >> cell & 1 or wreck & ~(board.hits | 1 << cell) or wreck & board.sunk
+                        or size not in board.remaining_fleet()):
+                    raise BattleshipProtocolError("Sunk ship doesn't match the shots")
+                result = 'S'
+            else:
+                result = 'H' if fields[1] else 'M'
+            self.awaiting = None
+            board.record(cell, result, wreck)
+            self.my_turn = False
+            self.over = board.all_sunk()
+            self.notify("result", cell, result)
+        elif kind == NET_BYE:
+            self.over = True
+            self.notify("bye")
+
+class BattleshipLink:
+    """A TCP connection to the other player on an asyncio event loop that the Tk scheduler
+    steps every few milliseconds. A step handles whatever the sockets have ready and returns
+    at once, so the network never blocks the UI.
+    
+    The loop's tasks never call into the UI: they hand every callback to the scheduler,
+    so messages are handled on the next tick like a click, and a dialog the handler opens
+    can't run Tk's timers (and with them this loop) inside the loop.
+    
+    'on_message' gets each message as (kind, fields); 'on_close' gets the exception that
+    ended the connection (None when the other side hung up) unless close() ended it here.
+    """
+    def __init__(self, scheduler, on_message, on_close, interval=0.01):
+        self.scheduler = scheduler
+        self.on_message = on_message
+        self.on_close = on_close
+        self.loop = asyncio.new_event_loop()
+        self.server = None
+        self.writer = None
+        self.tasks = set()
+        self.closed = False
+        scheduler.call_every(interval, self.step)
+    
+    def step(self):
+        """Runs the callbacks the event loop has ready, without waiting for anything."""
+        if self.closed:
+            return False
+        if self.loop.is_running():
+            return True
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        return not self.closed
+    
+    def spawn(self, coroutine):
+        task = self.loop.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+    
+    def host(self, port, on_connect):
+        """Listens on every interface for the other player, then calls on_connect(). Raises OSError
+        if the port can't be opened."""
+        async def accept(reader, writer):
+            if self.writer is not None or self.closed:
+                writer.close()
+                return
+            self.server.close()
+            self.connected(reader, writer)
+            self.hand_off(on_connect)
+        self.server = self.loop.run_until_complete(asyncio.start_server(accept, port=port))
+    
+    def join(self, host, port, on_connect):
+        """Connects to a hosting player, then calls on_connect()."""
+        async def connect():
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+            except OSError as e:
+                self.hand_off(self.lost, e)
+                return
+            self.connected(reader, writer)
+            self.hand_off(on_connect)
+        self.spawn(connect())
+    
+    def connected(self, reader, writer):
+        self.writer = writer
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Messages are tiny; don't hold them back
+        self.spawn(self.read_messages(reader))
+    
+    async def read_messages(self, reader):
+        try:
+            while not self.closed:
+                self.hand_off(self.on_message, *await read_net_message(reader))
+        except asyncio.IncompleteReadError:
+            self.hand_off(self.lost, None)
+        except (OSError, BattleshipProtocolError) as e:
+            self.hand_off(self.lost, e)
+    
+    def hand_off(self, callback, *args):
+        """Runs callback(*args) on the next tick, after the messages before it, unless the link is closed by then."""
+        self.scheduler.call_later(0, self.run_open, callback, args)
+    
+    def run_open(self, callback, args):
+        if self.closed:
+            return
+        try:
+            callback(*args)
+        except BattleshipProtocolError as e:
+            self.lost(e)
+    
+    def send(self, data):
+        if self.writer is not None and not self.closed:
+            self.writer.write(data)
+    
+    def lost(self, error):
+        if not self.closed:
+            self.close()
+            self.on_close(error)
+    
+    def close(self):
+        """Closes the connection and the listening socket, sending what is still buffered."""
+        if self.closed:
+            return
+        self.closed = True
+        if self.writer is not None:
+            self.writer.close()
+        if self.server is not None:
+            self.server.close()
+        for task in self.tasks:
+            task.cancel()
+        self.scheduler.call_later(0, self.shutdown)  # The loop may be running this very call
+    
+    def shutdown(self):
+        """Lets the closes and cancellations finish, then discards the event loop."""
+        async def finish():
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+            if self.writer is not None:
+                try:
+                    await asyncio.wait_for(self.writer.wait_closed(), 0.2)
+                except (OSError, asyncio.TimeoutError):
+                    pass
+        if self.loop.is_closed():
+            return
+        if self.loop.is_running():
+            self.scheduler.call_later(0, self.shutdown)  # Closed from inside a step; try again after it
+            return
+        self.loop.run_until_complete(finish())
+        self.loop.close()
+
+def parse_net_address(text, default_host="127.0.0.1"):
+    """Reads "host:port" or just "port" into (host, port)."""
+    host, _, port = text.strip().rpartition(":")
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"Can't read the address '{text}': use host:port, like 127.0.0.1:5050")
+    return host or default_host, int(port)
+
+async def play_battleship_online(host, port, hosting, targeting="Hard", rows=10, cols=10, sizes=(3, 2, 2, 1, 1, 1),
+                                 no_touch=False, seed=None):
+    """Plays one networked game without a window, placing the fleet at random and picking shots
+    at a targeting level: an opponent for the GUI's network mode, or for another of itself in
+    a second process. The host's settings are the game's. Returns (won, shots fired)."""
+    rng = random.Random(seed)
+    if hosting:
+        accepted = asyncio.get_running_loop().create_future()
+        
+        def accept(reader, writer):
+            if accepted.done():
+                writer.close()
+            else:
+                accepted.set_result((reader, writer))
+        server = await asyncio.start_server(accept, host or None, port)
+        reader, writer = await accepted
+        server.close()
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    
+    def place():
+        placed = place_fleet(game.own, game.sizes, rng)
+        if not placed:
+            raise BattleshipProtocolError(fleet_failure(game.sizes, game.own.rows, game.own.cols, game.own.no_touch, placed))
+        game.ready()
+    
+    def notify(event, *args):
+        if event == "settings":
+            place()
+        elif event in ("start", "shot") and game.my_turn and not game.over:
+            board = game.remote
+            game.fire(battleship_target(targeting, board.rows, board.cols, board.hits, board.misses,
+                                        board.remaining_fleet(), board.sunk, rng, board.no_touch))
+    
+    game = BattleshipNetGame(hosting, writer.write, notify)
+    try:
+        if hosting:
+            game.configure(rows, cols, no_touch, sizes)
+            place()
+        while not game.over:
+            game.receive(*await read_net_message(reader))
+        await writer.drain()
+    finally:
+        writer.close()
+    return game.remote.all_sunk(), game.remote.shots.bit_count()
+
+# --- Battleship Board View ---
+def column_name(col):
+    """Spreadsheet-style column letters: A..Z, then AA, AB, ..."""
+    name = ""
+    col += 1
+    while col:
+        col, rest = divmod(col - 1, 26)
+        name = chr(ord('A') + rest) + name
+    return name
+
+def column_index(name):
+    """The column of spreadsheet-style letters (the inverse of column_name), or -1."""
+    if not (name.isascii() and name.isalpha()):
+        return -1
+    col = 0
+    for letter in name.upper():
+        col = col * 26 + ord(letter) - ord('A') + 1
+    return col - 1
+
+class BattleshipBoardView(tk.Frame):
+    """One Battleship board drawn on a single Canvas.
+    
+    Only the cells inside the visible viewport have canvas items: a pool of rectangle and text
+    pairs is laid over whichever cells are in view after every scroll, zoom or resize, and the
+    pool (with the sticky row and column headers) is kept across phases and games. Clicks map
+    to cells by arithmetic. The wheel scrolls (Shift+wheel sideways) and Ctrl+wheel zooms.
+    """
+    min_cell_px = 10
+    max_cell_px = 48
+    max_view_px = 330  # Largest canvas requested before the board scrolls
+    
+    def __init__(self, parent, on_click=None, cell_px=22):
+        tk.Frame.__init__(self, parent, bg="white", relief=tk.SUNKEN, bd=2)
+        self.on_click = on_click
+        self.cell_px = cell_px
+        self.board = None
+        self.look = None
+        self.view = None  # (first row, end row, first col, end col, cell size) laid out last
+        self.slots = []  # (rectangle, text) canvas item pairs
+        self.slot_looks = []  # (bg, text) each slot was last configured with
+        self.shown = 0  # Slots in use; the rest are hidden
+        self.headers = {"col": [], "row": []}
+        
+        self.title_label = tk.Label(self, font=('Arial', 10, 'bold'), bg="white")
+        self.title_label.pack()
+        self.grid_frame = tk.Frame(self, bg="white")
+        self.grid_frame.pack(padx=5, pady=5, fill=tk.BOTH, expand=True)
+        self.grid_frame.rowconfigure(0, weight=1)
+        self.grid_frame.columnconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self.grid_frame, bg="white", highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.y_scroll = tk.Scrollbar(self.grid_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.y_scroll.grid(row=0, column=1, sticky="ns")
+        self.x_scroll = tk.Scrollbar(self.grid_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.x_scroll.grid(row=1, column=0, sticky="ew")
+        self.canvas.config(xscrollcommand=lambda first, last: self.on_scroll(self.x_scroll, first, last),
+                           yscrollcommand=lambda first, last: self.on_scroll(self.y_scroll, first, last))
+        self.header_bands = (self.canvas.create_rectangle(0, 0, 0, 0, width=0, tags="band"),
+                             self.canvas.create_rectangle(0, 0, 0, 0, width=0, tags="band"))
+        
+        self.canvas.bind("<Configure>", lambda e: self.layout())
+        self.canvas.bind("<Button-1>", self.on_press)
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", lambda e: self.on_wheel(e, horizontal=True))
+        self.canvas.bind("<Control-MouseWheel>", lambda e: self.zoom(1 if e.delta > 0 else -1))
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+        self.canvas.bind("<Shift-Button-4>", lambda e: self.canvas.xview_scroll(-1, "units"))
+        self.canvas.bind("<Shift-Button-5>", lambda e: self.canvas.xview_scroll(1, "units"))
+        self.canvas.bind("<Control-Button-4>", lambda e: self.zoom(1))
+        self.canvas.bind("<Control-Button-5>", lambda e: self.zoom(-1))
+    
+    @property
+    def header_px(self):
+        return max(self.cell_px, 24)
+    
+    def show(self, board, look, title, bg="white"):
+        """Points the view at a board. 'look(board, cell)' gives each cell's (bg, text)."""
+        self.board = board
+        self.look = look
+        for widget in (self, self.title_label, self.grid_frame, self.canvas):
+            widget.config(bg=bg)
+        for band in self.header_bands:
+            self.canvas.itemconfig(band, fill=bg)
+        self.title_label.config(text=title)
+        self.resize()
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+        self.layout(force=True)
+    
+    def resize(self):
+        """Sets the scroll region and requested size for the board at the current zoom."""
+        board, cell, header = self.board, self.cell_px, self.header_px
+        width = header + board.cols * cell
+        height = header + board.rows * cell
+        self.canvas.config(scrollregion=(0, 0, width, height), xscrollincrement=cell, yscrollincrement=cell,
+                           width=min(width, self.max_view_px), height=min(height, self.max_view_px))
+    
+    def zoom(self, step):
+        """Grows (step > 0) or shrinks the cells by a quarter, keeping the view's top-left corner."""
+        if self.board is None:
+            return
+        size = self.cell_px * 1.25 if step > 0 else self.cell_px / 1.25
+        size = min(self.max_cell_px, max(self.min_cell_px, round(size)))
+        if size == self.cell_px:
+            return
+        x, y = self.canvas.xview()[0], self.canvas.yview()[0]
+        self.cell_px = size
+        self.resize()
+        self.canvas.xview_moveto(x)
+        self.canvas.yview_moveto(y)
+        self.layout(force=True)
+    
+    def on_scroll(self, scrollbar, first, last):
+        """Scroll callback of the canvas: updates the scrollbar (hidden when everything fits)
+        and lays the item pool over the cells now in view."""
+        if float(first) <= 0 and float(last) >= 1:
+            scrollbar.grid_remove()
+        else:
+            scrollbar.grid()
+        scrollbar.set(first, last)
+        self.layout()
+    
+    def on_wheel(self, event, horizontal=False):
+        steps = -1 if event.delta > 0 else 1
+        if horizontal:
+            self.canvas.xview_scroll(steps, "units")
+        else:
+            self.canvas.yview_scroll(steps, "units")
+    
+    def on_press(self, event):
+        if self.board is None or self.on_click is None:
+            return
+        if event.x < self.header_px or event.y < self.header_px:
+            return  # On the sticky headers
+        col = int((self.canvas.canvasx(event.x) - self.header_px) // self.cell_px)
+        row = int((self.canvas.canvasy(event.y) - self.header_px) // self.cell_px)
+        if 0 <= row < self.board.rows and 0 <= col < self.board.cols:
+            self.on_click(row, col)
+    
+    def layout(self, force=False):
+        """Moves the slot items onto the cells in view, creating slots only when the viewport
+        holds more cells than ever before."""
+        board = self.board
+        if board is None:
+            return
+        canvas, cell, header = self.canvas, self.cell_px, self.header_px
+        left, top = canvas.canvasx(0), canvas.canvasy(0)
+        # Before the canvas is mapped its size is 1x1; use the requested size instead
+        width = canvas.winfo_width() if canvas.winfo_width() > 1 else int(float(canvas.cget("width")))
+        height = canvas.winfo_height() if canvas.winfo_height() > 1 else int(float(canvas.cget("height")))
+        c0 = max(0, int((left - header) // cell))
+        c1 = min(board.cols, int((left + width - header) // cell) + 1)
+        r0 = max(0, int((top - header) // cell))
+        r1 = min(board.rows, int((top + height - header) // cell) + 1)
+        view = (r0, r1, c0, c1, cell)
+        if view == self.view and not force:
+            return
+        self.view = view
+        
+        font = ('Arial', max(6, cell // 3))
+        columns = c1 - c0
+        count = columns * (r1 - r0)
+        while len(self.slots) < count:
+            self.slots.append((canvas.create_rectangle(0, 0, 0, 0, outline="#607080"),
+                               canvas.create_text(0, 0)))
+            self.slot_looks.append(None)
+        for i in range(count):
+            row, col = r0 + i // columns, c0 + i % columns
+            x, y = header + col * cell, header + row * cell
+            rect, text = self.slots[i]
+            canvas.coords(rect, x, y, x + cell, y + cell)
+            canvas.coords(text, x + cell / 2, y + cell / 2)
+            look = self.look(board, board.cell(row, col))
+            canvas.itemconfig(rect, fill=look[0], state=tk.NORMAL)
+            canvas.itemconfig(text, text=look[1], font=font, state=tk.NORMAL)
+            self.slot_looks[i] = look
+        for i in range(count, self.shown):
+            rect, text = self.slots[i]
+            canvas.itemconfig(rect, state=tk.HIDDEN)
+            canvas.itemconfig(text, state=tk.HIDDEN)
+        self.shown = count
+        
+        # Sticky headers over the top and left edges of the view
+        canvas.coords(self.header_bands[0], left, top, left + width, top + header)
+        canvas.coords(self.header_bands[1], left, top, left + header, top + height)
+        font = ('Arial', max(6, min(cell, header) // 3), 'bold')
+        self.place_headers("col", [(header + col * cell + cell / 2, top + header / 2, column_name(col))
+                                   for col in range(c0, c1)], font)
+        self.place_headers("row", [(left + header / 2, header + row * cell + cell / 2, str(row + 1))
+                                   for row in range(r0, r1)], font)
+        canvas.tag_raise("band")
+        canvas.tag_raise("header")
+    
+    def place_headers(self, kind, labels, font):
+        items = self.headers[kind]
+        while len(items) < len(labels):
+            items.append(self.canvas.create_text(0, 0, tags="header"))
+        for item, (x, y, text) in zip(items, labels):
+            self.canvas.coords(item, x, y)
+            self.canvas.itemconfig(item, text=text, font=font, state=tk.NORMAL)
+        for item in items[len(labels):]:
+            self.canvas.itemconfig(item, state=tk.HIDDEN)
+    
+    def update_cells(self, cells):
+        """Restyles the given cells if they are in view and their look changed."""
+        if self.view is None:
+            return
+        board = self.board
+        r0, r1, c0, c1, _ = self.view
+        columns = c1 - c0
+        for cell in cells:
+            row, col = divmod(cell, board.cols)
+            if r0 <= row < r1 and c0 <= col < c1:
+                i = (row - r0) * columns + col - c0
+                look = self.look(board, cell)
+                if self.slot_looks[i] != look:
+                    rect, text = self.slots[i]
+                    self.canvas.itemconfig(rect, fill=look[0])
+                    self.canvas.itemconfig(text, text=look[1])
+                    self.slot_looks[i] = look
+
 # --- Battleship GUI Frame ---
 class BattleshipGUI(tk.Frame):
+    quick_layouts = {"candidates": 4000, "simulated": 128, "trials": 2}  # The training of a layout book made here
+    
     def __init__(self, parent, controller):
         tk.Frame.__init__(self, parent, bg="#90EE90")
         self.controller = controller
         
         # Game State Variables
-        self.grid_size = 10
+        self.rows = 10
+        self.cols = 10
+        # Each player's own waters: their ships and the shots the opponent fired at them
         self.player_boards = {
-            1: [[' ' for _ in range(self.grid_size)] for _ in range(self.grid_size)],
-            2: [[' ' for _ in range(self.grid_size)] for _ in range(self.grid_size)]
-        }
-        self.player_shots = {
-            1: [[' ' for _ in range(self.grid_size)] for _ in range(self.grid_size)],
-            2: [[' ' for _ in range(self.grid_size)] for _ in range(self.grid_size)]
+            1: BattleshipBoard(self.rows, self.cols),
+            2: BattleshipBoard(self.rows, self.cols)
         }
         
-        self.player_hits = {1: 0, 2: 0}
-        self.total_ship_cells = 9  # 1 3-cell + 2 2-cell + 3 1-cell = 9 cells
         self.game_phase = "MODE_SELECTION"
         self.game_mode = "COMPUTER"
+        self.difficulty = tk.StringVar(value="Normal")  # Computer's targeting (BATTLESHIP_DIFFICULTIES)
         self.game_active = True
         self.current_player = 1
         self.placement_player = 1
         
         # Ship placement variables
-        self.ship_sizes = [3, 2, 2, 1, 1, 1]  # Flat list of 6 ship sizes
+        self.ship_sizes = [3, 2, 2, 1, 1, 1]  # Flat list of ship sizes, in placement order
+        self.total_ship_cells = sum(self.ship_sizes)
+        
+        # Board and fleet settings (read when a mode is started)
+        self.rows_var = tk.IntVar(value=self.rows)
+        self.cols_var = tk.IntVar(value=self.cols)
+        self.fleet_var = tk.StringVar(value=format_fleet(self.ship_sizes))
+        self.no_touch_var = tk.BooleanVar(value=False)
+        
+        # Network play: the connection and the rules of the exchange while a network game is on
+        self.address_var = tk.StringVar(value="127.0.0.1:5050")
+        self.link = None
+        self.net_game = None
         self.current_ship_idx = 0
         self.current_ship_size = 3
-        self.placement_board_buttons = {}
-        self.target_board_buttons = {}
-        self.own_board_buttons = {}
         
         # --- Widgets Setup ---
         tk.Label(self, text="=== Battleship ===", font=('Arial', 16, 'bold'), bg="#90EE90").pack(pady=10)
@@ -454,33 +2887,79 @@ class BattleshipGUI(tk.Frame):
         # Placement instructions (shown during placement)
         self.instruction_label = tk.Label(self, text="Ship placement goes here", font=('Arial', 10), bg="#90EE90")
         
-        # Main content frame
+        # Main content frame; every phase's widgets are built once and packed in and out of it
         self.content_frame = tk.Frame(self, bg="#90EE90")
         self.content_frame.pack(pady=10, fill=tk.BOTH, expand=True)
         
-        # Game log
-        self.log_text = tk.Text(self, height=6, width=40, state=tk.DISABLED)
-        self.log_text.pack(pady=5)
+        # Mode selection
+        self.mode_frame = tk.Frame(self.content_frame, bg="#90EE90")
+        tk.Label(self.mode_frame, text="Select Battleship Mode", font=('Arial', 14, 'bold'), bg="#90EE90").pack(pady=10)
+        tk.Label(self.mode_frame, text="Play against the computer or a second player", font=('Arial', 11), bg="#90EE90").pack(pady=5)
+        tk.Button(self.mode_frame, text="1 Player (vs Computer)", width=22, command=lambda: self.start_mode("COMPUTER")).pack(pady=8)
+        difficulty_frame = tk.Frame(self.mode_frame, bg="#90EE90")
+        difficulty_frame.pack()
+        tk.Label(difficulty_frame, text="Computer:", bg="#90EE90").pack(side=tk.LEFT)
+        for level in BATTLESHIP_DIFFICULTIES:
+            tk.Radiobutton(difficulty_frame, text=level, variable=self.difficulty, value=level, bg="#90EE90").pack(side=tk.LEFT)
+        tk.Button(self.mode_frame, text="2 Players (Hot Seat)", width=22, command=lambda: self.start_mode("TWOPLAYER")).pack(pady=8)
+        settings_frame = tk.Frame(self.mode_frame, bg="#90EE90")
+        settings_frame.pack(pady=5)
+        for text, var in (("Rows:", self.rows_var), ("Columns:", self.cols_var)):
+            tk.Label(settings_frame, text=text, bg="#90EE90").pack(side=tk.LEFT, padx=2)
+            tk.Spinbox(settings_frame, from_=1, to=BattleshipBoard.max_size, width=4, textvariable=var).pack(side=tk.LEFT, padx=2)
+        fleet_frame = tk.Frame(self.mode_frame, bg="#90EE90")
+        fleet_frame.pack(pady=2)
+        tk.Label(fleet_frame, text="Fleet (sizes, 2x3 = three 2s):", bg="#90EE90").pack(side=tk.LEFT, padx=2)
+        tk.Entry(fleet_frame, width=18, textvariable=self.fleet_var).pack(side=tk.LEFT, padx=2)
+        tk.Checkbutton(fleet_frame, text="Ships can't touch", variable=self.no_touch_var, bg="#90EE90").pack(side=tk.LEFT, padx=2)
+        network_frame = tk.Frame(self.mode_frame, bg="#90EE90")
+        network_frame.pack(pady=8)
+        tk.Label(network_frame, text="Network (host:port):", bg="#90EE90").pack(side=tk.LEFT, padx=2)
+        tk.Entry(network_frame, width=18, textvariable=self.address_var).pack(side=tk.LEFT, padx=2)
+        tk.Button(network_frame, text="Host Game", command=self.host_network_game).pack(side=tk.LEFT, padx=2)
+        tk.Button(network_frame, text="Join Game", command=self.join_network_game).pack(side=tk.LEFT, padx=2)
+        
+        # The two boards (only the left one while placing ships)
+        self.boards_frame = tk.Frame(self.content_frame, bg="#90EE90")
+        self.left_view = BattleshipBoardView(self.boards_frame, on_click=lambda row, col: self.board_clicked(self.left_view, row, col))
+        self.left_view.pack(side=tk.LEFT, padx=5, fill=tk.BOTH, expand=True)
+        self.right_view = BattleshipBoardView(self.boards_frame, on_click=lambda row, col: self.board_clicked(self.right_view, row, col))
         
-        # Frame for Input
-        self.input_frame = tk.Frame(self, bg="#90EE90")
+        # Placement buttons
+        self.placement_frame = tk.Frame(self.content_frame, bg="#90EE90")
+        tk.Button(self.placement_frame, text="Random Placement", command=self.random_placement).pack(side=tk.LEFT, padx=5)
+        self.continue_button = tk.Button(self.placement_frame, text="Start Game", command=self.start_game_from_placement)
+        self.continue_button.pack(side=tk.LEFT, padx=5)
         
-        # Letter entry
+        # Frame for Input
+        log_input_frame = tk.Frame(self.content_frame, bg="#90EE90")
+        log_input_frame.pack(side=tk.BOTTOM, padx=10, anchor=tk.E)
+        self.input_frame = tk.Frame(log_input_frame, bg="#90EE90")
+        tk.Label(self.input_frame, text="Fire at:", bg="#90EE90").pack(side=tk.LEFT, padx=5)
+        tk.Label(self.input_frame, text="Letter:", bg="#90EE90").pack(side=tk.LEFT, padx=2)
         self.letter_entry = tk.Entry(self.input_frame, width=3)
-        
-        # Number entry
+        self.letter_entry.pack(side=tk.LEFT, padx=2)
+        tk.Label(self.input_frame, text="Number:", bg="#90EE90").pack(side=tk.LEFT, padx=2)
         self.number_entry = tk.Entry(self.input_frame, width=3)
-        
-        # Fire button
+        self.number_entry.pack(side=tk.LEFT, padx=2)
         self.fire_button = tk.Button(self.input_frame, text="Fire!", command=self.player_fire)
+        self.fire_button.pack(side=tk.LEFT, padx=5)
+        
+        # Game log
+        self.log_text = tk.Text(self, height=6, width=40, state=tk.DISABLED)
+        self.log_text.pack(pady=5)
         
         # Control Buttons frame
         self.button_frame = tk.Frame(self, bg="#90EE90")
+        tk.Button(self.button_frame, text="New Game", command=self.reset_to_placement).pack(side=tk.LEFT, padx=10)
+        tk.Button(self.button_frame, text="Back to More Games", command=self.back_to_menu).pack(side=tk.RIGHT, padx=10)
         
         self.show_mode_selection()
     
     def show_mode_selection(self):
         """Show a simple mode selection screen before the game begins."""
+        self.controller.ai.cancel(self)  # A computer shot still in flight belongs to the old game
+        self.close_network()
         self.game_phase = "MODE_SELECTION"
         self.game_mode = "COMPUTER"
         self.game_active = True
@@ -491,39 +2970,177 @@ class BattleshipGUI(tk.Frame):
         self.instruction_label.pack_forget()
         self.input_frame.pack_forget()
         self.button_frame.pack_forget()
-        
-        self.content_frame.pack_forget()
-        self.content_frame.destroy()
-        self.content_frame = tk.Frame(self, bg="#90EE90")
-        self.content_frame.pack(pady=10, fill=tk.BOTH, expand=True)
-        
-        mode_frame = tk.Frame(self.content_frame, bg="#90EE90")
-        mode_frame.pack(expand=True)
-        
-        tk.Label(mode_frame, text="Select Battleship Mode", font=('Arial', 14, 'bold'), bg="#90EE90").pack(pady=10)
-        tk.Label(mode_frame, text="Play against the computer or a second player", font=('Arial', 11), bg="#90EE90").pack(pady=5)
-        tk.Button(mode_frame, text="1 Player (vs Computer)", width=22, command=lambda: self.start_mode("COMPUTER")).pack(pady=8)
-        tk.Button(mode_frame, text="2 Players (Hot Seat)", width=22, command=lambda: self.start_mode("TWOPLAYER")).pack(pady=8)
+        self.boards_frame.pack_forget()
+        self.placement_frame.pack_forget()
+        self.mode_frame.pack(expand=True)
+    
+    def read_settings(self):
+        """The board and fleet settings as (rows, cols, no_touch, sizes), or None after showing
+        what is wrong with them."""
+        try:
+            rows, cols = self.rows_var.get(), self.cols_var.get()
+            no_touch = self.no_touch_var.get()
+            ship_sizes = parse_fleet(self.fleet_var.get())
+            board = BattleshipBoard(rows, cols, no_touch)
+        except (ValueError, tk.TclError) as e:
+            messagebox.showerror("Invalid Settings", str(e))
+            return None
+        # A short look on the Tk thread that only turns away fleets that can't fit at all: the
+        # real placements report it when they can't find one
+        placed = place_fleet(board, ship_sizes, max_checks=2000)
+        if placed is False:
+            messagebox.showerror("Fleet Doesn't Fit", fleet_failure(ship_sizes, rows, cols, no_touch, placed))
+            return None
+        return rows, cols, no_touch, ship_sizes
+    
+    def start_mode(self, mode):
+        """Start a new game in the selected mode, on the board and fleet from the settings."""
+        settings = self.read_settings()
+        if settings is None:
+            return
+        rows, cols, no_touch, ship_sizes = settings
+        self.close_network()  # Stop waiting for a network player
+        self.begin_game(mode, ship_sizes, {1: BattleshipBoard(rows, cols, no_touch), 2: BattleshipBoard(rows, cols, no_touch)})
+        if mode == "COMPUTER" and self.difficulty.get() == "Hard":
+            self.prepare_layouts()
+        self.init_placement_phase()
+    
+    def begin_game(self, mode, ship_sizes, boards):
+        """Resets the game state for a new game on the given boards."""
+        self.rows, self.cols = boards[1].rows, boards[1].cols
+        self.ship_sizes = ship_sizes
+        self.total_ship_cells = sum(ship_sizes)
+        self.game_mode = mode
+        self.game_active = True
+        self.current_player = 1
+        self.placement_player = 1
+        self.player_boards = boards
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.delete('1.0', tk.END)
+        self.log_text.config(state=tk.DISABLED)
+    
+    def host_network_game(self):
+        """Waits for another player to join on the address's port; the game uses this side's settings."""
+        settings = self.read_settings()
+        if settings is None:
+            return
+        try:
+            _, port = parse_net_address(self.address_var.get())
+            self.open_network(hosting=True)
+            self.link.host(port, lambda: self.network_connected(settings))
+        except (ValueError, OSError) as e:
+            self.close_network()
+            messagebox.showerror("Network Game", f"Couldn't host a game: {e}")
+            return
+        self.status_label.config(text=f"Waiting for a player to join on port {port}...")
+    
+    def join_network_game(self):
+        """Connects to a hosting player; the game uses the host's settings."""
+        try:
+            host, port = parse_net_address(self.address_var.get())
+        except ValueError as e:
+            messagebox.showerror("Network Game", str(e))
+            return
+        self.open_network(hosting=False)
+        self.link.join(host, port, lambda: self.status_label.config(text="Connected. Waiting for the host's settings..."))
+        self.status_label.config(text=f"Connecting to {host}:{port}...")
+    
+    def open_network(self, hosting):
+        self.close_network()
+        self.link = BattleshipLink(self.controller.scheduler, self.network_message, self.network_closed)
+        self.net_game = BattleshipNetGame(hosting, self.link.send, self.network_event)
+    
+    def close_network(self):
+        """Ends the network game, if there is one, telling the other player we left."""
+        if self.link is None:
+            return
+        if self.net_game.own is not None and not self.net_game.over:
+            self.net_game.quit()
+        self.link.close()
+        self.link = self.net_game = None
+    
+    def network_connected(self, settings):
+        """Host: the other player joined, so send them the settings and start placing ships."""
+        self.net_game.configure(*settings)
+        self.begin_network_game()
+    
+    def network_message(self, kind, fields):
+        """Passes a message from the other player to the rules (a BattleshipProtocolError drops the connection)."""
+        self.net_game.receive(kind, fields)
+    
+    def network_closed(self, error):
+        """The connection ended without this side closing it."""
+        if self.net_game is not None and self.net_game.over:
+            self.close_network()  # The game was already decided
+            return
+        self.network_ended(f"Connection lost: {error}" if error else "The other player left.")
     
-    def start_mode(self, mode):
-        """Start a new game in the selected mode."""
-        self.game_mode = mode
-        self.game_active = True
-        self.current_player = 1
-        self.placement_player = 1
-        self.player_hits = {1: 0, 2: 0}
-        self.player_boards = {
-            1: [[' ' for _ in range(self.grid_size)] for _ in range(self.grid_size)],
-            2: [[' ' for _ in range(self.grid_size)] for _ in range(self.grid_size)]
-        }
-        self.player_shots = {
-            1: [[' ' for _ in range(self.grid_size)] for _ in range(self.grid_size)],
-            2: [[' ' for _ in range(self.grid_size)] for _ in range(self.grid_size)]
-        }
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete('1.0', tk.END)
-        self.log_text.config(state=tk.DISABLED)
+    def network_ended(self, text):
+        """Ends a network game the other side quit or lost the connection to."""
+        self.close_network()
+        if self.game_phase == "PLAYING":
+            self.log(f"🔌 {text}")
+            self.status_label.config(text=text)
+            self.game_active = False
+            self.end_game()
+        else:
+            self.show_mode_selection()
+            messagebox.showinfo("Network Game", text)
+    
+    def network_event(self, event, *args):
+        """Reacts to the network game: the host's settings, both fleets ready, and shot results."""
+        if event == "settings":
+            self.begin_network_game()
+        elif event == "start":
+            self.begin_playing()
+        elif event == "result":
+            self.network_shot_result(*args)
+        elif event == "shot":
+            cell, result = args
+            self.opponent_fired(*divmod(cell, self.cols), result)
+            if self.game_active:
+                self.status_label.config(text="Your turn")
+        elif event == "bye":
+            self.network_ended("The other player left the game.")
+    
+    def begin_network_game(self):
+        """Starts placing ships for a network game, on the board and fleet the host chose."""
+        game = self.net_game
+        self.begin_game("NETWORK", game.sizes, {1: game.own, 2: game.remote})
         self.init_placement_phase()
+        rule = ", ships can't touch" if game.own.no_touch else ""
+        self.log(f"Connected! {game.own.rows}x{game.own.cols} board, fleet {format_fleet(game.sizes)}{rule}.")
+    
+    def network_shot_result(self, cell, result):
+        """Shows the result of our shot that the opponent reported."""
+        board = self.player_boards[2]
+        coords = self.index_to_coordinates(*divmod(cell, self.cols))
+        if result == 'M':
+            self.log(f"❌ You missed at {coords}.")
+        else:
+            self.log(f"🎯 You hit at {coords}!")
+            if result == 'S':
+                self.log(f"🚢 You sank your opponent's {board.ship_at(cell).name}!")
+        if board.all_sunk():
+            self.log("🎉 You sank all your opponent's ships! You win!")
+            self.game_active = False
+            self.end_game()
+            return
+        self.update_all_boards()
+        self.update_score_display()
+        self.status_label.config(text="Opponent's turn")
+    
+    def prepare_layouts(self):
+        """Readies the trained fleet layouts the computer places its ships from on Hard: reads the
+        book file or, if there is none yet, trains a quick book on the AI worker while the player
+        places their ships."""
+        book = layout_book(self.rows, self.cols, self.ship_sizes, self.player_boards[2].no_touch)
+        if book.read(partial=True, **self.quick_layouts) is not None:
+            return
+        self.log("Training the computer's fleet layouts...")
+        train = functools.partial(book.load, deadline=time.perf_counter() + 10, **self.quick_layouts)
+        self.controller.ai.submit(self, lambda data: self.log(f"Computer's fleet layouts ready ({len(book)} layouts)."),
+                                  train, cancellable=True)
     
     def init_placement_phase(self):
         """Initialize the ship placement phase."""
@@ -539,56 +3156,54 @@ class BattleshipGUI(tk.Frame):
         else:
             self.status_label.config(text="Place your ships! Click on the board.")
         
-        self.instruction_label.config(text=f"Placing ship of size {self.current_ship_size} (ship 1 of 6)")
-        self.instruction_label.pack(pady=5)
+        self.instruction_label.config(text=f"Placing ship of size {self.current_ship_size} (ship 1 of {len(self.ship_sizes)})")
+        self.instruction_label.pack(pady=5, before=self.content_frame)
         self.score_label.pack_forget()
         
-        # Clear content frame efficiently
-        self.content_frame.pack_forget()
-        self.content_frame.destroy()
-        self.content_frame = tk.Frame(self, bg="#90EE90")
-        self.content_frame.pack(pady=10, fill=tk.BOTH, expand=True)
-        
-        # Create placement board
+        # Show the placement board on the left view
+        self.mode_frame.pack_forget()
+        self.right_view.pack_forget()
+        self.boards_frame.pack(padx=10, fill=tk.BOTH, expand=True)
+        self.placement_frame.pack(pady=10)
         placement_bg = "#E6F7FF" if self.placement_player == 1 else "#FFE6E6"
-        cell_bg = "lightblue" if self.placement_player == 1 else "lightpink"
-        board_frame = tk.Frame(self.content_frame, bg=placement_bg, relief=tk.SUNKEN, bd=2)
-        board_frame.pack(padx=10, fill=tk.BOTH, expand=True)
-        
         if self.game_mode == "TWOPLAYER":
             board_title = f"Player {self.placement_player} - Place Ships"
         else:
             board_title = "Your Board - Place Ships"
-        tk.Label(board_frame, text=board_title, font=('Arial', 10, 'bold'), bg=placement_bg).pack()
-        
-        grid_frame = tk.Frame(board_frame, bg=placement_bg)
-        grid_frame.pack(padx=5, pady=5)
-        
-        tk.Label(grid_frame, text="  ", bg=placement_bg, width=2).grid(row=0, column=0)
-        for col in range(self.grid_size):
-            tk.Label(grid_frame, text=chr(ord('A') + col), bg=placement_bg, width=2, font=('Arial', 8, 'bold')).grid(row=0, column=col + 1)
+        board = self.placement_board()
+        board.take_dirty()
+        self.left_view.show(board, self.placement_look, board_title, placement_bg)
         
-        self.placement_board_buttons = {}
-        for row in range(self.grid_size):
-            tk.Label(grid_frame, text=str(row + 1), bg=placement_bg, width=2, font=('Arial', 8, 'bold')).grid(row=row + 1, column=0)
-            for col in range(self.grid_size):
-                btn = tk.Label(grid_frame, text=" ", bg=cell_bg, width=2, height=1, font=('Arial', 8), relief=tk.RAISED, bd=1)
-                btn.grid(row=row + 1, column=col + 1)
-                btn.bind("<Button-1>", lambda e, r=row, c=col: self.place_ship_on_board(r, c))
-                self.placement_board_buttons[(row, col)] = btn
-        
-        # Placement buttons
-        placement_btn_frame = tk.Frame(self.content_frame, bg="#90EE90")
-        placement_btn_frame.pack(pady=10)
-        tk.Button(placement_btn_frame, text="Random Placement", command=self.random_placement).pack(side=tk.LEFT, padx=5)
         if self.game_mode == "TWOPLAYER" and self.placement_player == 1:
-            tk.Button(placement_btn_frame, text="Second Player", command=self.start_game_from_placement).pack(side=tk.LEFT, padx=5)
+            self.continue_button.config(text="Second Player")
         else:
-            tk.Button(placement_btn_frame, text="Start Game", command=self.start_game_from_placement).pack(side=tk.LEFT, padx=5)
+            self.continue_button.config(text="Start Game")
+    
+    def placement_board(self):
+        """The board of the player placing ships."""
+        return self.player_boards[self.placement_player if self.game_mode == "TWOPLAYER" else 1]
+    
+    def placement_look(self, board, cell):
+        """(bg, text) of a cell while placing ships, in the placing player's colors."""
+        if board.has_ship(cell):
+            return ("gray", " ")
+        return ("lightblue", " ") if self.placement_player == 1 else ("lightpink", " ")
+    
+    def board_clicked(self, view, row, col):
+        """Places a ship while placing, or fires at the cell when it's on the board being fired at."""
+        if self.game_phase == "PLACEMENT":
+            self.place_ship_on_board(row, col)
+        elif self.game_phase == "PLAYING" and self.game_active:
+            if view.board is not self.player_boards[self.target_player()]:
+                self.log("⚠️ Fire at your opponent's board!")
+                return
+            self.player_fire_at(row, col)
     
     def place_ship_on_board(self, row, col):
         """Try to place a ship at the given coordinates."""
-        board = self.player_boards[self.placement_player if self.game_mode == "TWOPLAYER" else 1]
+        if self.current_ship_idx >= len(self.ship_sizes):
+            return
+        board = self.placement_board()
         if not self.can_place_ship(board, row, col, self.current_ship_size, 'H'):
             if not self.can_place_ship(board, row, col, self.current_ship_size, 'V'):
                 self.instruction_label.config(text="Can't place there! Try another spot.")
@@ -598,17 +3213,12 @@ class BattleshipGUI(tk.Frame):
             direction = 'H'
         
         # Place the ship
-        for i in range(self.current_ship_size):
-            if direction == 'H':
-                board[row][col + i] = 'S'
-                self.placement_board_buttons[(row, col + i)].config(bg="gray")
-            else:
-                board[row + i][col] = 'S'
-                self.placement_board_buttons[(row + i, col)].config(bg="gray")
+        board.place(ship_mask(board.rows, board.cols, row, col, self.current_ship_size, direction))
+        self.left_view.update_cells(board.take_dirty())
         
         # Move to next ship
         self.current_ship_idx += 1
-        if self.current_ship_idx >= 6:  # 6 total ships
+        if self.current_ship_idx >= len(self.ship_sizes):
             if self.game_mode == "TWOPLAYER" and self.placement_player == 1:
                 self.instruction_label.config(text="Player 1 ships are ready. Click 'Second Player' to continue.")
             elif self.game_mode == "TWOPLAYER" and self.placement_player == 2:
@@ -618,28 +3228,30 @@ class BattleshipGUI(tk.Frame):
         else:
             self.current_ship_size = self.ship_sizes[self.current_ship_idx]
             ship_num = self.current_ship_idx + 1
-            self.instruction_label.config(text=f"Placing ship of size {self.current_ship_size} (ship {ship_num} of 6)")
+            self.instruction_label.config(text=f"Placing ship of size {self.current_ship_size} (ship {ship_num} of {len(self.ship_sizes)})")
+            if not any(board.can_place(mask) for mask in ship_placements(board.rows, board.cols, self.current_ship_size)):
+                self.instruction_label.config(text=f"No room left for a ship of size {self.current_ship_size}. Use 'Random Placement'.")
     
     def random_placement(self):
         """Randomly place all remaining ships."""
-        board = self.player_boards[self.placement_player if self.game_mode == "TWOPLAYER" else 1]
-        board[:] = [[' ' for _ in range(self.grid_size)] for _ in range(self.grid_size)]
-        self.place_ships(board)
-        
-        # Update display using the active player's placement colors
-        cell_bg = "lightblue" if self.placement_player == 1 else "lightpink"
-        for (row, col), btn in self.placement_board_buttons.items():
-            if board[row][col] == 'S':
-                btn.config(bg="gray")
-            else:
-                btn.config(bg=cell_bg)
+        board = self.placement_board()
+        board.clear_ships()
+        placed = self.place_ships(board)
+        self.left_view.update_cells(board.take_dirty())
+        if not placed:
+            self.current_ship_idx = 0
+            self.current_ship_size = self.ship_sizes[0]
+            self.instruction_label.config(text="Couldn't find a placement for the fleet this time. Try again!"
+                                          if placed is None else fleet_failure(self.ship_sizes, self.rows, self.cols,
+                                                                               board.no_touch, placed))
+            return
         
         self.instruction_label.config(text="Ships randomly placed! Click 'Start Game'")
-        self.current_ship_idx = 6
+        self.current_ship_idx = len(self.ship_sizes)
     
     def start_game_from_placement(self):
         """Transition from placement phase to game phase."""
-        if self.current_ship_idx < 6:
+        if self.current_ship_idx < len(self.ship_sizes):
             self.instruction_label.config(text="Place all ships first!")
             return
         
@@ -650,169 +3262,96 @@ class BattleshipGUI(tk.Frame):
             self.init_placement_phase()
             return
         
-        self.game_phase = "PLAYING"
+        if self.game_mode == "NETWORK":
+            self.game_phase = "WAITING"
+            self.placement_frame.pack_forget()
+            self.instruction_label.config(text="Waiting for the other player to place their ships...")
+            self.net_game.ready()  # Starts the game at once if they are ready already
+            return
+        
         if self.game_mode == "COMPUTER":
-            self.place_ships(self.player_boards[2])
+            self.place_computer_fleet()
+            return
+        self.begin_playing()
+    
+    def begin_playing(self):
+        """Leaves the placement phase for the game itself."""
+        self.game_phase = "PLAYING"
         self.instruction_label.config(text="")
         self.instruction_label.pack_forget()
-        self.score_label.pack(pady=5)
+        self.score_label.pack(pady=5, before=self.content_frame)
         self.init_game_phase()
     
     def init_game_phase(self):
         """Initialize the actual game phase with two boards."""
-        # Clear content frame efficiently
-        self.content_frame.pack_forget()
-        self.content_frame.destroy()
-        self.content_frame = tk.Frame(self, bg="#90EE90")
-        self.content_frame.pack(pady=10, fill=tk.BOTH, expand=True)
-        
-        # Main content frame with two boards
-        boards_frame = tk.Frame(self.content_frame, bg="#90EE90")
-        boards_frame.pack(padx=10, fill=tk.BOTH, expand=True)
+        self.placement_frame.pack_forget()
+        self.right_view.pack(side=tk.LEFT, padx=5, fill=tk.BOTH, expand=True)
         
         if self.game_mode == "COMPUTER":
             left_title = "Computer's Board"
             right_title = "Your Board"
+        elif self.game_mode == "NETWORK":
+            left_title = "Opponent's Board"
+            right_title = "Your Board"
         else:
             left_title = "Player 1's Board"
             right_title = "Player 2's Board"
-        
-        # LEFT BOARD: Opponent's Board (where player fires)
-        left_frame = tk.Frame(boards_frame, bg="white", relief=tk.SUNKEN, bd=2)
-        left_frame.pack(side=tk.LEFT, padx=5, fill=tk.BOTH, expand=True)
-        
-        tk.Label(left_frame, text=left_title, font=('Arial', 10, 'bold'), bg="white").pack()
-        
-        left_grid = tk.Frame(left_frame, bg="white")
-        left_grid.pack(padx=5, pady=5)
-        
-        tk.Label(left_grid, text="  ", bg="white", width=2).grid(row=0, column=0)
-        for col in range(self.grid_size):
-            tk.Label(left_grid, text=chr(ord('A') + col), bg="white", width=2, font=('Arial', 8, 'bold')).grid(row=0, column=col + 1)
-        
-        self.target_board_buttons = {}
-        for row in range(self.grid_size):
-            tk.Label(left_grid, text=str(row + 1), bg="white", width=2, font=('Arial', 8, 'bold')).grid(row=row + 1, column=0)
-            for col in range(self.grid_size):
-                btn = tk.Label(left_grid, text=" ", bg="lightblue", width=2, height=1, font=('Arial', 8), relief=tk.RAISED, bd=1)
-                btn.grid(row=row + 1, column=col + 1)
-                self.target_board_buttons[(row, col)] = btn
-        
-        # RIGHT BOARD: Current player's board (where opponent fires)
-        right_frame = tk.Frame(boards_frame, bg="white", relief=tk.SUNKEN, bd=2)
-        right_frame.pack(side=tk.LEFT, padx=5, fill=tk.BOTH, expand=True)
-        
-        tk.Label(right_frame, text=right_title, font=('Arial', 10, 'bold'), bg="white").pack()
-        
-        right_grid = tk.Frame(right_frame, bg="white")
-        right_grid.pack(padx=5, pady=5)
-        
-        tk.Label(right_grid, text="  ", bg="white", width=2).grid(row=0, column=0)
-        for col in range(self.grid_size):
-            tk.Label(right_grid, text=chr(ord('A') + col), bg="white", width=2, font=('Arial', 8, 'bold')).grid(row=0, column=col + 1)
-        
-        self.own_board_buttons = {}
-        for row in range(self.grid_size):
-            tk.Label(right_grid, text=str(row + 1), bg="white", width=2, font=('Arial', 8, 'bold')).grid(row=row + 1, column=0)
-            for col in range(self.grid_size):
-                btn = tk.Label(right_grid, text=" ", bg="lightgreen", width=2, height=1, font=('Arial', 8), relief=tk.RAISED, bd=1)
-                btn.grid(row=row + 1, column=col + 1)
-                self.own_board_buttons[(row, col)] = btn
-        
-        # Log and input frame
-        log_input_frame = tk.Frame(self.content_frame, bg="#90EE90")
-        log_input_frame.pack(side=tk.RIGHT, padx=10, fill=tk.BOTH)
+        target_board, own_board = self.shown_boards()
+        for board in (target_board, own_board):
+            board.take_dirty()
+        # LEFT BOARD: Opponent's Board (where player fires); RIGHT BOARD: the one the opponent fires at
+        self.left_view.show(target_board, self.target_look, left_title)
+        self.right_view.show(own_board, self.own_look, right_title)
         
         self.log_text.config(height=8, width=30, state=tk.DISABLED)
-        self.log_text.pack(pady=5)
-        
-        # Input frame
-        self.input_frame.destroy()
-        self.input_frame = tk.Frame(log_input_frame, bg="#90EE90")
+        for entry in (self.letter_entry, self.number_entry):
+            entry.config(state=tk.NORMAL)
+            entry.delete(0, tk.END)
+        self.fire_button.config(state=tk.NORMAL)
         self.input_frame.pack(pady=5)
-        
-        tk.Label(self.input_frame, text="Fire at:", bg="#90EE90").pack(side=tk.LEFT, padx=5)
-        tk.Label(self.input_frame, text="Letter:", bg="#90EE90").pack(side=tk.LEFT, padx=2)
-        self.letter_entry = tk.Entry(self.input_frame, width=3)
-        self.letter_entry.pack(side=tk.LEFT, padx=2)
-        tk.Label(self.input_frame, text="Number:", bg="#90EE90").pack(side=tk.LEFT, padx=2)
-        self.number_entry = tk.Entry(self.input_frame, width=3)
-        self.number_entry.pack(side=tk.LEFT, padx=2)
-        self.fire_button = tk.Button(self.input_frame, text="Fire!", command=self.player_fire)
-        self.fire_button.pack(side=tk.LEFT, padx=5)
-        
-        # Control buttons
-        self.button_frame.destroy()
-        self.button_frame = tk.Frame(self, bg="#90EE90")
         self.button_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=10)
-        tk.Button(self.button_frame, text="New Game", command=self.reset_to_placement).pack(side=tk.LEFT, padx=10)
-        tk.Button(self.button_frame, text="Back to More Games", command=self.back_to_menu).pack(side=tk.RIGHT, padx=10)
         
-        self.log(f"Game started! {'Computer' if self.game_mode == 'COMPUTER' else f'Player {self.current_player}'} to move.")
-        self.update_all_boards()
+        if self.game_mode == "NETWORK":
+            self.log(f"Game started! {'You fire' if self.net_game.my_turn else 'Your opponent fires'} first.")
+            self.status_label.config(text="Your turn" if self.net_game.my_turn else "Opponent's turn")
+        else:
+            self.log(f"Game started! {'Computer' if self.game_mode == 'COMPUTER' else f'Player {self.current_player}'} to move.")
         self.update_score_display()
     
-    def update_all_boards(self):
-        """Updates the fixed boards for both players without swapping them on each turn."""
-        if self.game_mode == "COMPUTER":
-            # Keep the single-player view unchanged.
-            for row in range(self.grid_size):
-                for col in range(self.grid_size):
-                    btn = self.target_board_buttons[(row, col)]
-                    shot = self.player_shots[2][row][col]
-                    if shot == 'H':
-                        btn.config(bg="red", text="H")
-                    elif shot == 'M':
-                        btn.config(bg="lightgray", text="M")
-                    else:
-                        btn.config(bg="lightblue", text=" ")
-            
-            for row in range(self.grid_size):
-                for col in range(self.grid_size):
-                    btn = self.own_board_buttons[(row, col)]
-                    shot = self.player_shots[1][row][col]
-                    if self.player_boards[1][row][col] == 'S':
-                        if shot == 'H':
-                            btn.config(bg="darkred", text="H")
-                        elif shot == 'M':
-                            btn.config(bg="lightgreen", text=" ")
-                        else:
-                            btn.config(bg="lightgreen", text=" ")
-                    else:
-                        if shot == 'M':
-                            btn.config(bg="lightgray", text="M")
-                        else:
-                            btn.config(bg="lightgreen", text=" ")
-            return
-
+    def shown_boards(self):
+        """(left, right) boards: the one being fired at with only shots showing, and the one with ships."""
+        if self.game_mode in ("COMPUTER", "NETWORK"):
+            # The opponent's waters on the left (only your shots show), yours on the right
+            return self.player_boards[2], self.player_boards[1]
         # Two-player mode: keep Player 1's board and Player 2's board fixed.
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                btn = self.target_board_buttons[(row, col)]
-                shot = self.player_shots[2][row][col]
-                if shot == 'H':
-                    btn.config(bg="red", text="H")
-                elif shot == 'M':
-                    btn.config(bg="lightgray", text="M")
-                else:
-                    btn.config(bg="lightblue", text=" ")
-
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                btn = self.own_board_buttons[(row, col)]
-                shot = self.player_shots[1][row][col]
-                if self.player_boards[2][row][col] == 'S':
-                    if shot == 'H':
-                        btn.config(bg="darkred", text="H")
-                    elif shot == 'M':
-                        btn.config(bg="lightgreen", text=" ")
-                    else:
-                        btn.config(bg="lightgreen", text=" ")
-                else:
-                    if shot == 'M':
-                        btn.config(bg="lightgray", text="M")
-                    else:
-                        btn.config(bg="lightgreen", text=" ")
+        return self.player_boards[1], self.player_boards[2]
+    
+    def update_all_boards(self):
+        """Updates the fixed boards for both players without swapping them on each turn.
+        
+        Only the cells the engine marked dirty are restyled, and only when in view and their
+        look changed, so a shot costs a canvas call or two whatever the grid size.
+        """
+        for view in (self.left_view, self.right_view):
+            view.update_cells(view.board.take_dirty())
+    
+    def target_look(self, board, cell):
+        """(bg, text) of a cell on the board being fired at: only the shots show."""
+        shot = board.state(cell)
+        if shot == 'H':
+            return ("red", "X" if board.sunk >> cell & 1 else "H")
+        if shot == 'M':
+            return ("lightgray", "M")
+        return ("lightblue", " ")
+    
+    def own_look(self, board, cell):
+        """(bg, text) of a cell on a board shown with its ships."""
+        shot = board.state(cell)
+        if board.has_ship(cell):
+            return ("darkred", "H") if shot == 'H' else ("gray", " ")
+        if shot == 'M':
+            return ("lightgray", "M")
+        return ("lightgreen", " ")
     
     def log(self, message):
         """Helper function to update the Text widget (Game Log)"""
@@ -822,44 +3361,38 @@ class BattleshipGUI(tk.Frame):
         self.log_text.config(state=tk.DISABLED)
     
     def place_ships(self, board):
-        """Places ships on the board randomly."""
-        # Ship configurations: [size, count]
-        ships = [(3, 1), (2, 2), (1, 3)]  # 1 3-length, 2 2-length, 3 1-length
-        
-        for size, count in ships:
-            for _ in range(count):
-                placed = False
-                while not placed:
-                    row = random.randint(0, self.grid_size - 1)
-                    col = random.randint(0, self.grid_size - 1)
-                    direction = random.choice(['H', 'V'])  # Horizontal or Vertical
-                    
-                    # Check if placement is valid
-                    if self.can_place_ship(board, row, col, size, direction):
-                        # Place the ship
-                        for i in range(size):
-                            if direction == 'H':
-                                board[row][col + i] = 'S'  # S for ship
-                            else:
-                                board[row + i][col] = 'S'
-                        placed = True
+        """Places the fleet on the board at random. Returns place_fleet's result."""
+        return place_fleet(board, self.ship_sizes)
+    
+    def place_computer_fleet(self):
+        """Places the computer's fleet on the AI worker, then starts the game: on Hard as a trained
+        layout once the book is ready, else at random."""
+        board = self.player_boards[2]
+        placer = place_fleet
+        if self.difficulty.get() == "Hard":
+            book = layout_book(board.rows, board.cols, self.ship_sizes, board.no_touch)
+            if book.read(partial=True, **self.quick_layouts) is not None:
+                placer = functools.partial(adversarial_placement, partial=True, **self.quick_layouts)
+            else:
+                self.controller.ai.cancel(self)  # Don't keep the computer's ships waiting on the training
+                self.log("The fleet layouts weren't trained yet, so the computer placed its ships at random.")
+        self.game_phase = "WAITING"
+        self.placement_frame.pack_forget()
+        self.instruction_label.config(text="The computer is placing its ships...")
+        self.controller.ai.submit(self, self.computer_fleet_placed, placer, board, self.ship_sizes)
+    
+    def computer_fleet_placed(self, placed):
+        if not placed:
+            board = self.player_boards[2]
+            reason = fleet_failure(self.ship_sizes, board.rows, board.cols, board.no_touch, placed)
+            messagebox.showerror("Fleet Doesn't Fit", f"The computer's ships: {reason} Try another board or fleet.")
+            self.show_mode_selection()
+            return
+        self.begin_playing()
     
     def can_place_ship(self, board, row, col, size, direction):
         """Checks if a ship can be placed at the given position."""
-        if direction == 'H':
-            if col + size > self.grid_size:
-                return False
-            for i in range(size):
-                if board[row][col + i] == 'S':
-                    return False
-        else:  # Vertical
-            if row + size > self.grid_size:
-                return False
-            for i in range(size):
-                if board[row + i][col] == 'S':
-                    return False
-        return True
-    
+        return board.can_place(ship_mask(board.rows, board.cols, row, col, size, direction))
     
     def reset_to_placement(self):
         """Go back to the placement phase."""
@@ -873,18 +3406,19 @@ class BattleshipGUI(tk.Frame):
     
     def update_score_display(self):
         """Updates the score display."""
-        if self.game_mode == "COMPUTER":
-            self.score_label.config(text=f"Your Hits: {self.player_hits[1]}/{self.total_ship_cells} | Computer Hits: {self.player_hits[2]}/{self.total_ship_cells}")
+        hits = {1: self.player_boards[2].hits.bit_count(), 2: self.player_boards[1].hits.bit_count()}
+        if self.game_mode in ("COMPUTER", "NETWORK"):
+            self.score_label.config(text=f"Your Hits: {hits[1]}/{self.total_ship_cells} | {self.player_name(2)} Hits: {hits[2]}/{self.total_ship_cells}")
         else:
-            self.score_label.config(text=f"Player 1 Hits: {self.player_hits[1]}/{self.total_ship_cells} | Player 2 Hits: {self.player_hits[2]}/{self.total_ship_cells}")
+            self.score_label.config(text=f"Player 1 Hits: {hits[1]}/{self.total_ship_cells} | Player 2 Hits: {hits[2]}/{self.total_ship_cells}")
     
     def coordinates_to_index(self, letter, number):
         """Converts letter and number to row and column indices."""
         try:
-            col = ord(letter.upper()) - ord('A')
+            col = column_index(letter)
             row = int(number) - 1
             
-            if col < 0 or col >= self.grid_size or row < 0 or row >= self.grid_size:
+            if col < 0 or col >= self.cols or row < 0 or row >= self.rows:
                 return None, None
             
             return row, col
@@ -893,7 +3427,7 @@ class BattleshipGUI(tk.Frame):
     
     def index_to_coordinates(self, row, col):
         """Converts row and column indices to letter and number."""
-        letter = chr(ord('A') + col)
+        letter = column_name(col)
         number = row + 1
         return f"{letter} {number}"
     
@@ -901,6 +3435,8 @@ class BattleshipGUI(tk.Frame):
         """Return a friendly name for each player."""
         if self.game_mode == "COMPUTER" and player_num == 2:
             return "Computer"
+        if self.game_mode == "NETWORK" and player_num == 2:
+            return "Opponent"
         return f"Player {player_num}"
     
     def player_fire(self):
@@ -916,30 +3452,53 @@ class BattleshipGUI(tk.Frame):
         if row is None or col is None:
             self.log("⚠️ Invalid coordinates! Use format: A 5")
             return
+        self.player_fire_at(row, col)
+    
+    def target_player(self):
+        """The player whose board the current player fires at."""
+        if self.game_mode in ("COMPUTER", "NETWORK"):
+            return 2
+        return 2 if self.current_player == 1 else 1
+    
+    def player_fire_at(self, row, col):
+        """Fires the current player's shot at (row, col) on the opponent's board."""
+        if self.game_mode == "NETWORK":
+            # The result arrives from the opponent (see network_shot_result)
+            game = self.net_game
+            if not game.fire(self.player_boards[2].cell(row, col)):
+                if game.my_turn and game.awaiting is None:
+                    self.log("⚠️ You already fired at that location!")
+                else:
+                    self.log("⏳ Wait for your opponent to fire.")
+            return
+        if self.controller.ai.busy(self):
+            self.log("⏳ Wait for the computer to fire.")
+            return
         
         current_player = self.current_player
-        target_player = 2 if current_player == 1 else 1
-        if self.game_mode == "COMPUTER":
-            target_player = 2
+        target_player = self.target_player()
         
-        if self.player_shots[current_player][row][col] != ' ':
+        # Fire at the target player's board
+        target_board = self.player_boards[target_player]
+        result = target_board.fire(target_board.cell(row, col))
+        if result is None:
             self.log("⚠️ You already fired at that location!")
             return
         
-        # Fire at the target player's board
-        if self.player_boards[target_player][row][col] == 'S':
-            self.player_shots[current_player][row][col] = 'H'  # Hit
-            self.player_hits[current_player] += 1
+        if result != 'M':
             coords = self.index_to_coordinates(row, col)
             self.log(f"🎯 {self.player_name(current_player)} hit at {coords}!")
+            if result == 'S':
+                ship = target_board.ship_at(target_board.cell(row, col))
+                owner = "the computer" if self.game_mode == "COMPUTER" else self.player_name(target_player)
+                self.log(f"🚢 {self.player_name(current_player)} sank {owner}'s {ship.name}!")
             
-            if self.player_hits[current_player] >= self.total_ship_cells:
+            if target_board.all_sunk():
                 self.log(f"🎉 {self.player_name(current_player)} sank all ships! {self.player_name(current_player)} wins!")
                 self.game_active = False
                 self.end_game()
                 return
         else:
-            self.player_shots[current_player][row][col] = 'M'  # Miss
             coords = self.index_to_coordinates(row, col)
             self.log(f"❌ {self.player_name(current_player)} missed at {coords}.")
         
@@ -962,42 +3521,55 @@ class BattleshipGUI(tk.Frame):
         self.update_score_display()
     
     def computer_fire(self):
-        """Handles computer's fire action (random for now)."""
-        row = random.randint(0, self.grid_size - 1)
-        col = random.randint(0, self.grid_size - 1)
-        
-        # Find an unfired location
-        attempts = 0
-        while self.player_shots[2][row][col] != ' ' and attempts < 100:
-            row = random.randint(0, self.grid_size - 1)
-            col = random.randint(0, self.grid_size - 1)
-            attempts += 1
-        
-        if self.player_shots[2][row][col] != ' ':
-            return  # No valid moves left (shouldn't happen)
+        """Starts the computer's turn; the shot is fired when the AI executor returns it."""
+        # The worker only sees a snapshot of what the computer knows: the shots, the ships
+        # announced sunk and the sizes still afloat
+        board = self.player_boards[1]
+        self.controller.ai.submit(self, self.computer_fire_at, self.choose_computer_target,
+                                  self.difficulty.get(), board.rows, board.cols, board.hits, board.misses,
+                                  board.remaining_fleet(), board.sunk, board.no_touch)
+    
+    def choose_computer_target(self, difficulty, rows, cols, hits, misses, fleet, sunk, no_touch):
+        """Picks the computer's target at the chosen difficulty. Runs on the AI worker thread."""
+        cell = battleship_target(difficulty, rows, cols, hits, misses, fleet, sunk, no_touch=no_touch)
+        return divmod(cell, cols) if cell is not None else None
+    
+    def computer_fire_at(self, target):
+        """Fires the computer's shot at the player's board."""
+        if target is None or not self.game_active or self.game_phase != "PLAYING":
+            return  # No valid moves left, or the game is already over
+        row, col = target
         
         # Fire at player's board
-        if self.player_boards[1][row][col] == 'S':
-            self.player_shots[2][row][col] = 'H'  # Hit
-            self.player_hits[2] += 1
+        board = self.player_boards[1]
+        self.opponent_fired(row, col, board.fire(board.cell(row, col)))
+    
+    def opponent_fired(self, row, col, result):
+        """Shows the computer's or the network opponent's shot at the player's board."""
+        board = self.player_boards[1]
+        name = self.player_name(2)
+        if result != 'M':
             coords = self.index_to_coordinates(row, col)
-            self.log(f"💥 Computer hit at {coords}!")
+            self.log(f"💥 {name} hit at {coords}!")
+            if result == 'S':
+                self.log(f"🚢 {name} sank your {board.ship_at(board.cell(row, col)).name}!")
             
-            if self.player_hits[2] >= self.total_ship_cells:
-                self.log("💻 Computer sank all your ships! You lose!")
+            if board.all_sunk():
+                self.log(f"💻 {name} sank all your ships! You lose!")
                 self.game_active = False
                 self.end_game()
                 return
         else:
-            self.player_shots[2][row][col] = 'M'  # Miss
             coords = self.index_to_coordinates(row, col)
-            self.log(f"💭 Computer fired at {coords} and missed.")
+            self.log(f"💭 {name} fired at {coords} and missed.")
         
         self.update_all_boards()
         self.update_score_display()
     
     def end_game(self):
-        """Disables input at the end of the game."""
+        """Draws the winning shot and disables input at the end of the game."""
+        self.update_all_boards()
+        self.update_score_display()
         self.fire_button.config(state=tk.DISABLED)
         self.letter_entry.config(state=tk.DISABLED)
         self.number_entry.config(state=tk.DISABLED)
@@ -1013,6 +3585,9 @@ class SlotMachineGUI(tk.Frame):
         self.symbols = ["🍒", "🍋", "🔔", "💎"]
         self.current_reels = ["🍒", "🍋", "🔔"]
         self.spinning = False
+        self.spin_call = None
+        self.spin_frames = 15  # Number of animation frames per spin
+        self.spin_frame_time = 0.1  # Seconds per animation frame
         
         # --- Widgets Setup ---
         tk.Label(self, text="=== Slot Machine ===", font=('Arial', 16, 'bold'), bg="#90EE90").pack(pady=10)
@@ -1093,20 +3668,25 @@ class SlotMachineGUI(tk.Frame):
         self.spin_button.config(state=tk.DISABLED)
         
         # Spin animation
-        self.animate_spin(bet, 0)
+        start = time.monotonic()
+        self.animate_spin(bet, start)
+        self.spin_call = self.controller.scheduler.call_every(self.spin_frame_time, self.animate_spin, bet, start, start=start)
     
-    def animate_spin(self, bet, frame):
-        """Animate spinning reels."""
-        if frame < 15:  # Spin for 15 frames
+    def animate_spin(self, bet, start):
+        """Animate spinning reels. Frames are derived from elapsed time, so slow ticks skip frames."""
+        frame = int((time.monotonic() - start) / self.spin_frame_time)
+        if frame < self.spin_frames:
             for i in range(3):
                 self.current_reels[i] = random.choice(self.symbols)
                 self.reel_labels[i].config(text=self.current_reels[i])
-            self.after(100, lambda: self.animate_spin(bet, frame + 1))
-        else:
-            # Spin complete, calculate result
-            self.calculate_result(bet)
-            self.spinning = False
-            self.spin_button.config(state=tk.NORMAL)
+            return True
+        
+        # Spin complete, calculate result
+        self.spin_call = None
+        self.calculate_result(bet)
+        self.spinning = False
+        self.spin_button.config(state=tk.NORMAL)
+        return False
     
     def calculate_result(self, bet):
         """Calculate win/loss and update balance."""
@@ -1142,6 +3722,8 @@ class SlotMachineGUI(tk.Frame):
     
     def reset_game(self):
         """Reset the game to initial state."""
+        self.controller.scheduler.cancel(self.spin_call)
+        self.spin_call = None
         self.balance = 100
         self.current_reels = ["🍒", "🍋", "🔔"]
         self.spinning = False
@@ -1152,8 +3734,976 @@ class SlotMachineGUI(tk.Frame):
         self.bet_entry.delete(0, tk.END)
         self.bet_entry.insert(0, "10")
         
-        for i, label in enumerate(self.reel_labels):
-            label.config(text=self.current_reels[i])
+        for i, label in enumerate(self.reel_labels):
+            label.config(text=self.current_reels[i])
+
+# --- Adventure Engine ---
+RESTART = -1  # Scene id of the special "@restart" target
+
+Scene = namedtuple("Scene", "id name title description redirects variants effects choices prompt ending")
+Choice = namedtuple("Choice", "text target condition effects commands")
+Prompt = namedtuple("Prompt", "title text answers success failure cancel")
+
+ALWAYS = ((0, 0),)  # Condition that holds for every flag mask
+NO_EFFECTS = (0, 0)
+
+def condition_holds(condition, flags):
+    """Checks a compiled condition: any of its (required, forbidden) terms matches the mask."""
+    for required, forbidden in condition:
+        if flags & required == required and not flags & forbidden:
+            return True
+    return False
+
+def apply_effects(effects, flags):
+    """Applies compiled (set, clear) effects to a flag mask."""
+    set_bits, clear_bits = effects
+    if flags & set_bits == set_bits and not flags & clear_bits:
+        return flags  # Nothing changes: keep the same object so snapshots can share it
+    return (flags | set_bits) & ~clear_bits
+
+class TrieNode:
+    """A node of the vocabulary trie."""
+    def __init__(self):
+        self.children = {}
+        self.term = None  # Canonical term if a word or phrase ends exactly here
+        self.unique = None  # Canonical term if every phrase below this node means the same thing
+
+class CommandParser:
+    """Turns typed commands such as "look at bookshelf" into canonical (verb, nouns) keys.
+    
+    Verbs and nouns (with their synonyms, which may be several words long) are stored in
+    character tries built once from the adventure's vocabulary. A word may be abbreviated
+    to any prefix that only one term starts with, and parsing walks each character of the
+    input a bounded number of times, however large the vocabulary is.
+    """
+    IGNORE = ""  # Canonical term of filler words such as "the" or "at"
+    
+    def __init__(self, vocabulary):
+        # Filler words only go in the noun trie so they never make a verb abbreviation ambiguous
+        self.verbs = self.build_trie(vocabulary.get("verbs", {}), [])
+        self.nouns = self.build_trie(vocabulary.get("nouns", {}), vocabulary.get("ignore", []))
+    
+    def build_trie(self, terms, ignore):
+        """Builds a trie mapping every term and synonym to its canonical term."""
+        root = TrieNode()
+        entries = [(word, self.IGNORE) for word in ignore]
+        for canonical, synonyms in terms.items():
+            canonical = sys.intern(canonical)
+            entries.append((canonical, canonical))
+            entries.extend((synonym, canonical) for synonym in synonyms)
+        
+        for phrase, canonical in entries:
+            node = root
+            for ch in self.normalize(phrase):
+                node = node.children.setdefault(ch, TrieNode())
+            node.term = canonical
+        
+        self.mark_unique(root)
+        return root
+    
+    def mark_unique(self, root):
+        """Sets 'unique' on every node whose phrases all share one canonical term."""
+        order = [root]
+        for node in order:
+            order.extend(node.children.values())
+        
+        ambiguous = object()
+        for node in reversed(order):
+            meanings = {node.term} if node.term is not None else set()
+            for child in node.children.values():
+                meanings.add(child.unique if child.unique is not None else ambiguous)
+            node.unique = meanings.pop() if len(meanings) == 1 else None
+            if node.unique is ambiguous:
+                node.unique = None
+    
+    def normalize(self, text):
+        """Lowercases text and collapses it to single-spaced words."""
+        return ' '.join(''.join(ch if ch.isalnum() else ' ' for ch in text.lower()).split())
+    
+    def longest_match(self, root, text, start):
+        """Finds the longest term (or unambiguous abbreviation) starting at 'start'.
+        
+        Returns (canonical term, end position), or None if no term matches.
+        """
+        node = root
+        best = None
+        position = start
+        while position < len(text):
+            node = node.children.get(text[position])
+            if node is None:
+                break
+            position += 1
+            if position == len(text) or text[position] == ' ':
+                term = node.term if node.term is not None else node.unique
+                if term is not None:
+                    best = (term, position)
+        return best
+    
+    def parse(self, text):
+        """Parses a command. Returns ((verb, nouns), None) or (None, error message)."""
+        text = self.normalize(text)
+        verb = None
+        nouns = []
+        position = 0
+        while position < len(text):
+            match = self.longest_match(self.verbs if verb is None else self.nouns, text, position)
+            if match is None:
+                word = text[position:].split(' ', 1)[0]
+                if verb is None:
+                    return None, f"I don't know how to '{word}'."
+                return None, f"I don't know what '{word}' is."
+            
+            term, position = match
+            position += 1  # Skip the space after the term
+            if term == self.IGNORE:
+                continue
+            if verb is None:
+                verb = term
+            elif term not in nouns:
+                nouns.append(term)
+        
+        if verb is None:
+            return None, "Type a command, like 'inspect door'."
+        return (verb, tuple(nouns)), None
+
+class Adventure:
+    """A compiled, read-only adventure loaded from a scene-graph file.
+    
+    Inventory flags become bits of an integer mask, scene names become integer ids, and
+    every condition and effect is compiled to bit masks, so running the adventure never
+    branches on scene names. Scenes are compiled into immutable Scene tuples the first
+    time they are reached, so large adventures only pay for the scenes that are visited.
+    
+    Conditions are written as a flag name ("has_key"), a negated flag ("!has_key"), a list
+    of those that must all hold, or {"any": [...]} of flags or lists. Effects are
+    "set"/"clear" lists of flag names.
+    """
+    max_redirects = 100  # Redirects followed on one scene entry before giving up
+    source = None  # File the adventure was loaded from, recorded in save files
+    
+    def __init__(self, data):
+        self.title = data.get("title", "Text Adventure")
+        
+        flags = data.get("flags", {})
+        self.flag_names = tuple(sys.intern(name) for name in flags)
+        self.flag_bits = {name: 1 << i for i, name in enumerate(self.flag_names)}
+        self.inventory_labels = tuple((self.flag_bits[name], spec["label"])
+                                      for name, spec in flags.items() if spec and spec.get("label"))
+        self.inventory_mask = sum(bit for bit, _ in self.inventory_labels)
+        self.parser = CommandParser(data.get("vocabulary", {}))
+        
+        self.raw_scenes = data["scenes"]
+        self.scene_names = tuple(sys.intern(name) for name in self.raw_scenes)
+        self.scene_ids = {name: i for i, name in enumerate(self.scene_names)}
+        self.scenes = [None] * len(self.scene_names)
+        self.start = self.resolve_target(data.get("start", self.scene_names[0]))
+    
+    def resolve_target(self, name):
+        """Converts a scene name (or "@restart") into its id."""
+        if name == "@restart":
+            return RESTART
+        if name not in self.scene_ids:
+            raise ValueError(f"Unknown scene '{name}'")
+        return self.scene_ids[name]
+    
+    def flag_mask(self, names):
+        """Converts a list of flag names into a bit mask."""
+        mask = 0
+        for name in names:
+            if name not in self.flag_bits:
+                raise ValueError(f"Unknown flag '{name}'")
+            mask |= self.flag_bits[name]
+        return mask
+    
+    def compile_term(self, condition):
+        """Compiles a flag, "!flag" or list of them into one (required, forbidden) term."""
+        if isinstance(condition, str):
+            condition = [condition]
+        required = self.flag_mask([name for name in condition if not name.startswith("!")])
+        forbidden = self.flag_mask([name[1:] for name in condition if name.startswith("!")])
+        return required, forbidden
+    
+    def compile_condition(self, condition):
+        """Compiles a declarative condition into a tuple of (required, forbidden) terms."""
+        if condition is None:
+            return ALWAYS
+        if isinstance(condition, dict):
+            return tuple(self.compile_term(term) for term in condition["any"])
+        return (self.compile_term(condition),)
+    
+    def compile_effects(self, spec):
+        """Compiles the "set" and "clear" lists of a scene, variant or choice."""
+        if "set" not in spec and "clear" not in spec:
+            return NO_EFFECTS
+        return self.flag_mask(spec.get("set", [])), self.flag_mask(spec.get("clear", []))
+    
+    def compile_commands(self, commands):
+        """Parses a choice's typed commands into canonical (verb, nouns) keys."""
+        keys = []
+        for command in commands:
+            key, error = self.parser.parse(command)
+            if key is None:
+                raise ValueError(f"Bad command '{command}': {error}")
+            keys.append(key)
+        return tuple(keys)
+    
+    def compile_scene(self, scene_id):
+        """Builds the immutable Scene for one entry of the scene graph."""
+        name = self.scene_names[scene_id]
+        raw = self.raw_scenes[name]
+        
+        redirects = tuple((self.compile_condition(r.get("if")), self.resolve_target(r["goto"]))
+                          for r in raw.get("redirect", []))
+        variants = tuple((self.compile_condition(v.get("if")), v.get("description"), self.compile_effects(v))
+                         for v in raw.get("variants", []))
+        choices = tuple(Choice(c["text"], self.resolve_target(c["goto"]),
+                               self.compile_condition(c.get("if")), self.compile_effects(c),
+                               self.compile_commands(c.get("commands", [])))
+                        for c in raw.get("choices", []))
+        
+        prompt = None
+        if "prompt" in raw:
+            p = raw["prompt"]
+            prompt = Prompt(p.get("title", "Enter Answer"), p["text"],
+                            frozenset(answer.strip().lower() for answer in p["answers"]),
+                            self.resolve_target(p["success"]), self.resolve_target(p["failure"]),
+                            self.resolve_target(p.get("cancel", name)))
+        
+        return Scene(scene_id, name, sys.intern(raw.get("title", "")), raw.get("description"),
+                     redirects, variants, self.compile_effects(raw), choices, prompt, raw.get("ending"))
+    
+    def is_scene(self, scene_id):
+        """Whether a scene id stands for a scene the adventure can actually contain."""
+        return True
+    
+    def scene(self, scene_id):
+        """Returns the compiled scene, compiling it on first use."""
+        scene = self.scenes[scene_id]
+        if scene is None:
+            scene = self.scenes[scene_id] = self.compile_scene(scene_id)
+        return scene
+    
+    def enter(self, scene_id, flags):
+        """Enters a scene: follows redirects, then applies its variant and effects.
+        
+        Returns (scene, flags, description) for the scene that is actually shown.
+        """
+        scene = self.scene(scene_id)
+        for _ in range(self.max_redirects + 1):
+            for condition, target in scene.redirects:
+                if condition_holds(condition, flags):
+                    scene = self.scene(target)
+                    break
+            else:
+                break
+        else:
+            raise ValueError(f"Redirect loop at scene '{scene.name}'")
+        
+        description = scene.description
+        effects = scene.effects
+        for condition, text, variant_effects in scene.variants:
+            if condition_holds(condition, flags):
+                if text is not None:
+                    description = text
+                effects = (effects[0] | variant_effects[0], effects[1] | variant_effects[1])
+                break
+        return scene, apply_effects(effects, flags), description
+    
+    def available_choices(self, scene, flags):
+        """The choices of a scene whose conditions hold."""
+        return [choice for choice in scene.choices if condition_holds(choice.condition, flags)]
+    
+    def choose(self, choice, flags):
+        """Applies a choice's effects and returns (target scene id, flags)."""
+        return choice.target, apply_effects(choice.effects, flags)
+    
+    def match_command(self, scene, flags, text):
+        """Finds the available choice a typed command refers to.
+        
+        Accepts a choice number ("2", "1a") or a command. A command matches a choice with the
+        same verb whose nouns it mentions; extra nouns ("... with silver key") are allowed.
+        Returns (choice, None) or (None, message).
+        """
+        choices = self.available_choices(scene, flags)
+        number = text.strip().rstrip('.').lower()
+        for choice in choices:
+            if choice.text.split('.', 1)[0].lower() == number:
+                return choice, None
+        
+        key, error = self.parser.parse(text)
+        if key is None:
+            return None, error
+        verb, nouns = key
+        for choice in choices:
+            if key in choice.commands:
+                return choice, None
+        for choice in choices:
+            for choice_verb, choice_nouns in choice.commands:
+                if choice_verb == verb and set(choice_nouns) <= set(nouns):
+                    return choice, None
+        return None, "You can't do that here."
+    
+    def answer_prompt(self, scene, answer):
+        """Returns the scene id a prompt answer leads to (None means cancelled)."""
+        if answer is None:
+            return scene.prompt.cancel
+        if answer.strip().lower() in scene.prompt.answers:
+            return scene.prompt.success
+        return scene.prompt.failure
+    
+    def inventory(self, flags):
+        """Labels of the inventory flags that are set."""
+        return [label for bit, label in self.inventory_labels if flags & bit]
+
+def load_adventure(filename="escape_room.json"):
+    """Loads and compiles an adventure (JSON or TOML) using the script's absolute path."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    full_path = os.path.join(script_dir, filename)
+    
+    if not os.path.exists(full_path):
+        print(f"Error: Adventure file not found at {full_path}")
+        return None
+    
+    try:
+        if full_path.endswith(".toml"):
+            import tomllib  # Python 3.11+
+            with open(full_path, 'rb') as f:
+                data = tomllib.load(f)
+        else:
+            with open(full_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        adventure = Adventure(data)
+        adventure.source = filename
+        return adventure
+    except Exception as e:
+        print(f"An error occurred while loading the adventure {filename}: {e}")
+        return None
+
+def open_adventure(source):
+    """Opens the adventure a save file refers to: a file name or "dungeon:<seed>:<rooms>".
+    Returns None if it can't be opened."""
+    if source.startswith("dungeon:"):
+        try:
+            _, seed, room_count = source.split(":")
+            seed, room_count = int(seed), int(room_count)
+        except ValueError:
+            print(f"Can't read the dungeon '{source}': use dungeon:SEED:ROOMS")
+            return None
+        if room_count < 1:
+            print(f"Can't read the dungeon '{source}': it needs at least one room")
+            return None
+        return DungeonAdventure(seed, room_count)
+    return load_adventure(source)
+
+def save_path(slot):
+    """Where an adventure save slot is stored, next to the script."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, f"adventure_save_{slot}.json")
+
+def save_game(session, slot):
+    """Writes the session's current position to a save slot. Returns True on success."""
+    try:
+        with open(save_path(slot), 'w', encoding='utf-8') as f:
+            json.dump(session.save_state(), f, separators=(',', ':'))
+        return True
+    except OSError as e:
+        print(f"An error occurred while saving slot {slot}: {e}")
+        return False
+
+def load_game(slot):
+    """Reads a save slot. Returns the saved state, or None if the slot is empty or unreadable."""
+    try:
+        with open(save_path(slot), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"An error occurred while loading slot {slot}: {e}")
+        return None
+
+Snapshot = namedtuple("Snapshot", "target entry_flags scene flags description steps previous")
+
+class AdventureSession:
+    """One playthrough of an adventure: the current scene and flags.
+    
+    Both the Tk frame and the terminal runner (text_adventure.py) drive the game through
+    a session, so choices, typed commands, prompts and restarts behave the same everywhere.
+    
+    Every scene entered is recorded as an immutable Snapshot that points at the one before
+    it. Snapshots share the scene, description and flag objects instead of copying them,
+    so each step costs one small tuple and undo just steps back along the chain. A prompt
+    isn't recorded: undo from a prompt returns to the scene it was asked from.
+    """
+    def __init__(self, adventure):
+        self.adventure = adventure
+        self.scene = None
+        self.flags = 0  # Inventory flags packed into a bit mask
+        self.description = None
+        self.steps = 0  # Choices followed since the last restart
+        self.history = None  # Newest Snapshot; older ones hang off .previous
+        self.entry = None  # (scene id, flags before entering) of the scene on screen, for saving
+    
+    def restart(self, keep_history=True):
+        """Starts over from the adventure's first scene.
+        
+        Restarting is recorded like any other step, so it can be undone unless 'keep_history' is False.
+        """
+        if not keep_history:
+            self.history = None
+        self.flags = 0
+        self.steps = 0
+        return self.go(self.adventure.start)
+    
+    def go(self, scene_id):
+        """Enters a scene and returns it. A prompt scene then waits for answer()."""
+        if scene_id == RESTART:
+            return self.restart()
+        entry_flags = self.flags
+        self.scene, self.flags, self.description = self.adventure.enter(scene_id, entry_flags)
+        self.entry = (scene_id, entry_flags)
+        if self.scene.prompt is None:
+            self.history = Snapshot(scene_id, entry_flags, self.scene, self.flags, self.description,
+                                    self.steps, self.history)
+        return self.scene
+    
+    def choices(self):
+        """The choices available in the current scene."""
+        return self.adventure.available_choices(self.scene, self.flags)
+    
+    def follow(self, choice):
+        """Applies a choice and enters its target scene."""
+        target, self.flags = self.adventure.choose(choice, self.flags)
+        self.steps += 1
+        return self.go(target)
+    
+    def command(self, text):
+        """Follows the choice a typed command refers to. Returns an error message or None."""
+        choice, error = self.adventure.match_command(self.scene, self.flags, text)
+        if choice is None:
+            return error
+        self.follow(choice)
+        return None
+    
+    def answer(self, text):
+        """Answers the current prompt scene (None cancels) and enters the scene it leads to."""
+        return self.go(self.adventure.answer_prompt(self.scene, text))
+    
+    def inventory(self):
+        """Labels of the items collected so far."""
+        return self.adventure.inventory(self.flags)
+    
+    def at_prompt(self):
+        return self.scene is not None and self.scene.prompt is not None
+    
+    def can_undo(self):
+        """Whether there is an earlier scene to go back to."""
+        if self.at_prompt():
+            return self.history is not None
+        return self.history is not None and self.history.previous is not None
+    
+    def undo(self):
+        """Goes back to the previous scene, or from a prompt to the scene it was asked from.
+        Returns False if there is nothing to undo."""
+        if not self.can_undo():
+            return False
+        if not self.at_prompt():
+            self.history = self.history.previous
+        snapshot = self.history
+        self.scene, self.flags, self.description, self.steps = (
+            snapshot.scene, snapshot.flags, snapshot.description, snapshot.steps)
+        self.entry = (snapshot.target, snapshot.entry_flags)
+        return True
+    
+    def save_state(self):
+        """The current position as a small JSON-ready dict, or None before the game has started.
+        
+        It records the scene that was entered and the flags before entering it, so loading
+        replays that one entry (redirects, variants and effects) and ends up in the same place,
+        a prompt included.
+        """
+        if self.entry is None:
+            return None
+        target, entry_flags = self.entry
+        return {"adventure": self.adventure.source, "scene": target,
+                "flags": format(entry_flags, 'x'), "steps": self.steps}
+    
+    def load_state(self, state):
+        """Continues from a saved position. Undo history starts over from there. Raises
+        ValueError, leaving the session as it was, if the state doesn't fit this adventure."""
+        try:
+            scene_id, flags, steps = state["scene"], int(state["flags"], 16), state.get("steps", 0)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise ValueError("the save is damaged") from None
+        if not (isinstance(scene_id, int) and 0 <= scene_id < len(self.adventure.scene_names)
+                and self.adventure.is_scene(scene_id)):
+            raise ValueError(f"the adventure has no scene {scene_id!r}")
+        if not (0 <= flags < 1 << len(self.adventure.flag_names) and isinstance(steps, int) and steps >= 0):
+            raise ValueError("the save is damaged")
+        self.history = None
+        self.flags = flags
+        self.steps = steps
+        return self.go(scene_id)
+
+# --- Procedural Dungeon ---
+DUNGEON_VOCABULARY = {
+    "verbs": {"go": ["walk", "move", "return"], "open": ["unlock", "use"], "enter": ["type", "input"],
+              "climb": ["escape", "exit"], "restart": ["play again", "replay"]},
+    "nouns": {"north": ["n"], "east": ["e"], "west": ["w"], "back": ["south", "s"],
+              "door": [], "code": ["keypad"], "hatch": [], "key": []},
+    "ignore": ["the", "a", "an", "to", "through", "with", "on", "in"],
+}
+
+class GeneratedNames(Sequence):
+    """The names of a generated adventure's scenes or flags, made on demand from their ids:
+    a read-only sequence (and, through ids, a name -> id mapping) without a list of them all."""
+    def __init__(self, count, name_of, id_of):
+        self.count = count
+        self.name_of = name_of  # id -> name
+        self.id_of = id_of  # name -> id, or None if it isn't one of the names
+        self.ids = GeneratedIds(self)
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("name index out of range")
+        return self.name_of(index)
+    
+    def __contains__(self, name):
+        return self.id_of(name) is not None
+    
+    def index(self, name, *args):
+        found = self.id_of(name)
+        if found is None:
+            raise ValueError(f"'{name}' is not a name here")
+        return found
+
+class GeneratedIds(Mapping):
+    """The name -> id mapping of GeneratedNames."""
+    def __init__(self, names):
+        self.names = names
+    
+    def __getitem__(self, name):
+        found = self.names.id_of(name)
+        if found is None:
+            raise KeyError(name)
+        return found
+    
+    def __iter__(self):
+        return iter(self.names)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def __contains__(self, name):
+        return name in self.names
+
+class DungeonAdventure(Adventure):
+    """A seeded, procedurally generated escape dungeon with keys, locked doors and code locks.
+    
+    Rooms form a tree laid out like a 3-ary heap (room k's exits lead to rooms 3k+1..3k+3),
+    so any room can be generated on its own from (seed, room number). A scene is only
+    materialized when the player first reaches it and is evicted again once it is far away
+    in the tree, so memory grows with what was explored, not with the dungeon size.
+    
+    Solvability comes from constraint-ordered placement: the key or code note for the door
+    into room k is always placed in one of the few rooms numbered just below k. Every room
+    numbered below k is outside k's subtree, and its own doors have lower numbers still, so
+    opening the doors in number order always works and the exit in the last room is reachable.
+    
+    Scene and flag names ("room_12", "keypad_12", "wrong_code_12", "exit"; "door_12" for the
+    key or code of the door into room 12) are generated from the ids, so analyze_adventure
+    works on a dungeon too, though only small ones can be explored in full.
+    """
+    exits = ("north", "east", "west")
+    key_spread = 8  # How many rooms before its door a key or code note can be placed
+    keep_radius = 4  # Rooms this far away (in doors) from the player may be evicted
+    cache_limit = 256  # Materialized scenes kept before an eviction sweep
+    inventory_shown = 5  # Newest keys and codes listed by name; the rest are counted
+    max_redirects = 0
+    
+    adjectives = ["Dusty", "Flooded", "Silent", "Crumbling", "Gilded", "Frozen", "Smoky", "Echoing",
+                  "Narrow", "Forgotten", "Mossy", "Candlelit"]
+    places = ["Archive", "Cellar", "Chapel", "Workshop", "Gallery", "Vault", "Library", "Kitchen",
+              "Armory", "Observatory", "Laboratory", "Crypt"]
+    metals = ["Brass", "Iron", "Silver", "Copper", "Bronze", "Golden", "Bone", "Glass"]
+    
+    def __init__(self, seed, room_count=100000):
+        self.seed = seed
+        self.room_count = room_count
+        self.title = f"Escape Dungeon #{seed} ({room_count:,} rooms)"
+        self.source = f"dungeon:{seed}:{room_count}"
+        self.start = 0
+        self.inventory_mask = -1  # Every flag is an inventory item (a key or a code)
+        self.parser = CommandParser(DUNGEON_VOCABULARY)
+        self.scenes = {}  # Materialized scenes by id, evicted when far from the player
+        self.materialized = 0  # Total scenes generated, for statistics
+        
+        # Scene id ranges: rooms, code prompts, wrong-code scenes, then the exit
+        self.prompt_base = room_count
+        self.wrong_code_base = 2 * room_count
+        self.exit_id = 3 * room_count
+        self.scene_names = GeneratedNames(self.exit_id + 1, self.scene_name, self.scene_id)
+        self.scene_ids = self.scene_names.ids
+        self.flag_names = GeneratedNames(room_count, lambda room: f"door_{room}",
+                                         functools.partial(self.numbered, "door_", room_count))
+    
+    def scene_name(self, scene_id):
+        """The name of a scene, as materialize() gives it."""
+        if scene_id == self.exit_id:
+            return "exit"
+        prefix = ("room_", "keypad_", "wrong_code_")[scene_id // self.room_count]
+        return f"{prefix}{scene_id % self.room_count}"
+    
+    def scene_id(self, name):
+        """The id of a scene name, or None if there is no such scene."""
+        if name == "exit":
+            return self.exit_id
+        for base, prefix in ((self.wrong_code_base, "wrong_code_"), (self.prompt_base, "keypad_"), (0, "room_")):
+            room = self.numbered(prefix, self.room_count, name)
+            if room is not None:
+                return base + room
+        return None
+    
+    def is_scene(self, scene_id):
+        """Keypads and their wrong-code scenes only exist for doors with a code lock."""
+        if self.prompt_base <= scene_id < self.exit_id:
+            return self.door(scene_id % self.room_count)[0] == "code"
+        return True
+    
+    @staticmethod
+    def numbered(prefix, count, name):
+        """n for a name "<prefix><n>" with 0 <= n < count, else None."""
+        if not isinstance(name, str) or not name.startswith(prefix):
+            return None
+        number = name[len(prefix):]
+        if not number.isdigit() or int(number) >= count or number != str(int(number)):
+            return None
+        return int(number)
+    
+    def room_random(self, room):
+        """The random generator that everything about one room is derived from."""
+        return random.Random(f"{self.seed}:{room}")
+    
+    def door(self, room):
+        """Describes the door leading into 'room': (lock, holder room, key metal, code).
+        
+        'lock' is None, "key" or "code"; the holder room contains the key or the code note.
+        """
+        rng = self.room_random(room)
+        roll = rng.random()
+        lock = None if room == 0 or roll < 0.5 else ("key" if roll < 0.8 else "code")
+        holder = room - 1 - rng.randrange(min(room, self.key_spread)) if room else 0
+        return lock, holder, rng.choice(self.metals), f"{rng.randrange(10000):04d}"
+    
+    def parent(self, room):
+        """The room on the way back towards the entrance."""
+        return (room - 1) // 3
+    
+    def children(self, room):
+        """The rooms behind this room's exits."""
+        first = 3 * room + 1
+        return range(first, min(first + 3, self.room_count))
+    
+    def depth(self, room):
+        """Number of doors between a room and the entrance."""
+        depth = 0
+        while room:
+            room = self.parent(room)
+            depth += 1
+        return depth
+    
+    def distance(self, a, b):
+        """Number of doors between two rooms."""
+        da, db = self.depth(a), self.depth(b)
+        steps = 0
+        while da > db:
+            a, da, steps = self.parent(a), da - 1, steps + 1
+        while db > da:
+            b, db, steps = self.parent(b), db - 1, steps + 1
+        while a != b:
+            a, b, steps = self.parent(a), self.parent(b), steps + 2
+        return steps
+    
+    def room_of(self, scene_id):
+        """The room a scene belongs to (prompts and wrong-code scenes belong to their door)."""
+        if scene_id >= self.exit_id:
+            return self.room_count - 1
+        return scene_id % self.room_count
+    
+    def scene(self, scene_id):
+        """Returns the scene, materializing it on first use."""
+        scene = self.scenes.get(scene_id)
+        if scene is None:
+            scene = self.scenes[scene_id] = self.materialize(scene_id)
+            self.materialized += 1
+        return scene
+    
+    def enter(self, scene_id, flags):
+        """Enters a scene and evicts materialized scenes that are now far away."""
+        result = Adventure.enter(self, scene_id, flags)
+        if len(self.scenes) > self.cache_limit:
+            here = self.room_of(result[0].id)
+            for far in [s for s in self.scenes if self.distance(self.room_of(s), here) > self.keep_radius]:
+                del self.scenes[far]
+        return result
+    
+    def room_name(self, room):
+        """A short display name such as 'Room 12: The Mossy Vault'."""
+        rng = random.Random(f"{self.seed}:{room}:name")
+        return f"Room {room + 1}: The {rng.choice(self.adjectives)} {rng.choice(self.places)}"
+    
+    def materialize(self, scene_id):
+        """Generates one scene from the seed."""
+        if scene_id == self.exit_id:
+            return Scene(scene_id, "exit", "🎉 FREEDOM!",
+                         "You climb through the hatch and out into the night air. You have escaped the dungeon!",
+                         (), (), NO_EFFECTS, (Choice("1. Play Again", RESTART, ALWAYS, NO_EFFECTS, (("restart", ()),)),),
+                         None, "escaped")
+        
+        if scene_id >= self.wrong_code_base:
+            room = scene_id - self.wrong_code_base
+            choices = (Choice("1. Try again", self.prompt_base + room, ALWAYS, NO_EFFECTS, (("enter", ("code",)),)),
+                       Choice("2. Step back", self.parent(room), ALWAYS, NO_EFFECTS, (("go", ("back",)),)))
+            return Scene(scene_id, f"wrong_code_{room}", "The Keypad Buzzes",
+                         "A red light flashes and the keypad resets. That was not the right code.",
+                         (), (), NO_EFFECTS, choices, None, None)
+        
+        if scene_id >= self.prompt_base:
+            room = scene_id - self.prompt_base
+            _, _, _, code = self.door(room)
+            prompt = Prompt("Enter Code", f"Enter the 4-digit code for the door to Room {room + 1}:",
+                            frozenset([code]), room, self.wrong_code_base + room, self.parent(room))
+            return Scene(scene_id, f"keypad_{room}", "A Keypad", None, (), (), NO_EFFECTS, (), prompt, None)
+        
+        return self.materialize_room(scene_id)
+    
+    def materialize_room(self, room):
+        """Generates a room: its description, the keys and notes in it, and its exits."""
+        lines = [f"You are in the {self.room_name(room).split(': The ', 1)[1].lower()}."]
+        found = 0
+        for door_room in range(room + 1, min(room + 1 + self.key_spread, self.room_count)):
+            lock, holder, metal, code = self.door(door_room)
+            if lock and holder == room:
+                found |= 1 << door_room
+                if lock == "key":
+                    lines.append(f"On a hook hangs a {metal.lower()} key tagged 'Room {door_room + 1}'.")
+                else:
+                    lines.append(f"A note scratched into the wall reads: 'Room {door_room + 1}: {code}'.")
+        
+        choices = []
+        if room:
+            choices.append(Choice(f"{len(choices) + 1}. Go back to {self.room_name(self.parent(room))}",
+                                  self.parent(room), ALWAYS, NO_EFFECTS, (("go", ("back",)),)))
+        for exit_name, child in zip(self.exits, self.children(room)):
+            lock, _, metal, _ = self.door(child)
+            number = len(choices) + 1
+            if lock is None:
+                lines.append(f"An open doorway leads {exit_name}.")
+                choices.append(Choice(f"{number}. Go {exit_name} to {self.room_name(child)}", child, ALWAYS,
+                                      NO_EFFECTS, (("go", (exit_name,)),)))
+            elif lock == "key":
+                lines.append(f"A door to the {exit_name} has a heavy {metal.lower()} lock.")
+                choices.append(Choice(f"{number}. Unlock the {exit_name} door with the {metal.lower()} key", child,
+                                      ((1 << child, 0),), NO_EFFECTS,
+                                      (("open", (exit_name,)), ("go", (exit_name,)))))
+            else:
+                lines.append(f"A steel door to the {exit_name} has a 4-digit keypad.")
+                choices.append(Choice(f"{number}. Enter the code for the {exit_name} door",
+                                      self.prompt_base + child, ALWAYS, NO_EFFECTS,
+                                      (("enter", ("code", exit_name)), ("open", (exit_name,)))))
+        
+        if room == self.room_count - 1:
+            lines.append("A rusty hatch in the ceiling lets in a breath of fresh air.")
+            choices.append(Choice(f"{len(choices) + 1}. Climb through the hatch", self.exit_id, ALWAYS,
+                                  NO_EFFECTS, (("climb", ("hatch",)),)))
+        
+        return Scene(room, f"room_{room}", self.room_name(room), "\n".join(lines), (), (),
+                     (found, 0), tuple(choices), None, None)
+    
+    def inventory(self, flags):
+        """Lists the newest keys and codes collected (those for the highest-numbered doors, the
+        ones still ahead) and counts the rest, so the list stays short however far the player got."""
+        items = []
+        older = flags.bit_count() - self.inventory_shown
+        while flags and len(items) < self.inventory_shown:
+            door_room = flags.bit_length() - 1
+            flags ^= 1 << door_room
+            lock, _, metal, code = self.door(door_room)
+            if lock == "key":
+                items.append(f"{metal} Key (Room {door_room + 1})")
+            else:
+                items.append(f"Code {code} (Room {door_room + 1})")
+        if older > 0:
+            items.append(f"+ {older:,} more")
+        return items
+
+# --- Adventure Analyzer ---
+def scene_links(adventure, scene):
+    """Flags a scene reads and the scene ids it can lead to (restarts excluded)."""
+    reads = 0
+    targets = set()
+    for condition, target in scene.redirects:
+        reads |= sum(required | forbidden for required, forbidden in condition)
+        targets.add(target)
+    for condition, _, _ in scene.variants:
+        reads |= sum(required | forbidden for required, forbidden in condition)
+    for choice in scene.choices:
+        reads |= sum(required | forbidden for required, forbidden in choice.condition)
+        targets.add(choice.target)
+    if scene.prompt is not None:
+        targets.update((scene.prompt.success, scene.prompt.failure, scene.prompt.cancel))
+    targets.discard(RESTART)
+    return reads, targets
+
+def relevant_flags(adventure):
+    """For each scene, the flags that it or any scene reachable from it can read.
+    
+    Flags outside this mask can never change what happens from that scene on, so the
+    analyzer drops them from its states. Computed as a fixpoint over the scene graph.
+    """
+    count = len(adventure.scene_names)
+    relevant = [0] * count
+    predecessors = [[] for _ in range(count)]
+    for scene_id in range(count):
+        reads, targets = scene_links(adventure, adventure.scene(scene_id))
+        relevant[scene_id] = reads
+        for target in targets:
+            predecessors[target].append(scene_id)
+    
+    pending = deque(range(count))
+    while pending:
+        scene_id = pending.popleft()
+        for source in predecessors[scene_id]:
+            merged = relevant[source] | relevant[scene_id]
+            if merged != relevant[source]:
+                relevant[source] = merged
+                pending.append(source)
+    return relevant
+
+def analyze_adventure(adventure, max_states=1000000):
+    """Explores every reachable (scene, inventory flags) state of an adventure.
+    
+    Returns a dict with the unreachable scenes, dead ends (no way on and not an ending),
+    soft-locks (states from which no ending can be reached without restarting) and the
+    shortest path to an ending.
+    """
+    relevant = relevant_flags(adventure)
+    reached = set()
+    
+    def enter(scene_id, flags):
+        reached.add(scene_id)
+        scene, flags, _ = adventure.enter(scene_id, flags)
+        reached.add(scene.id)
+        return scene.id, flags & relevant[scene.id]
+    
+    start = enter(adventure.start, 0)
+    index = {start: 0}
+    states = [start]
+    parents = [None]  # (parent state number, action label)
+    edges = [[]]
+    queue = deque([0])
+    truncated = False
+    
+    while queue:
+        number = queue.popleft()
+        scene_id, flags = states[number]
+        scene = adventure.scene(scene_id)
+        
+        moves = []
+        if scene.prompt is not None:
+            prompt = scene.prompt
+            moves.append((f"answer '{min(prompt.answers, key=len)}'", prompt.success, flags))
+            moves.append(("give a wrong answer", prompt.failure, flags))
+            moves.append(("cancel", prompt.cancel, flags))
+        else:
+            for choice in adventure.available_choices(scene, flags):
+                target, next_flags = adventure.choose(choice, flags)
+                moves.append((choice.text, target, next_flags))
+        
+        for label, target, next_flags in moves:
+            if target == RESTART:
+                continue
+            state = enter(target, next_flags)
+            if state not in index:
+                if len(states) >= max_states:
+                    truncated = True
+                    continue
+                index[state] = len(states)
+                states.append(state)
+                parents.append((number, label))
+                edges.append([])
+                queue.append(index[state])
+            edges[number].append(index[state])
+    
+    def path_to(number):
+        steps = []
+        while parents[number] is not None:
+            number, label = parents[number]
+            steps.append(label)
+        return steps[::-1]
+    
+    endings = [n for n, (scene_id, _) in enumerate(states) if adventure.scene(scene_id).ending]
+    
+    # Every state that can still reach an ending, found by walking the edges backwards
+    incoming = [[] for _ in states]
+    for number, targets in enumerate(edges):
+        for target in targets:
+            incoming[target].append(number)
+    can_finish = set(endings)
+    pending = deque(endings)
+    while pending:
+        for source in incoming[pending.popleft()]:
+            if source not in can_finish:
+                can_finish.add(source)
+                pending.append(source)
+    
+    dead_ends = {}
+    soft_locks = {}
+    for number, (scene_id, _) in enumerate(states):
+        scene = adventure.scene(scene_id)
+        if scene.ending:
+            continue
+        if not edges[number] and scene.name not in dead_ends:
+            dead_ends[scene.name] = path_to(number)
+        if number not in can_finish and scene.name not in soft_locks:
+            soft_locks[scene.name] = path_to(number)
+    
+    return {
+        "states": len(states),
+        "truncated": truncated,
+        "unreachable": [name for i, name in enumerate(adventure.scene_names)
+                        if i not in reached and adventure.is_scene(i)],
+        "dead_ends": dead_ends,
+        "soft_locks": soft_locks,
+        "shortest_win": path_to(endings[0]) if endings else None,
+        "win_scene": adventure.scene_names[states[endings[0]][0]] if endings else None,
+    }
+
+def format_adventure_report(report):
+    """Turns an analyze_adventure() result into readable text."""
+    lines = [f"States explored: {report['states']}" + (" (limit reached)" if report["truncated"] else "")]
+    
+    lines.append(f"Unreachable scenes: {', '.join(report['unreachable']) or 'none'}")
+    for title, key in (("Dead ends", "dead_ends"), ("Soft-locks", "soft_locks")):
+        if not report[key]:
+            lines.append(f"{title}: none")
+            continue
+        lines.append(f"{title}:")
+        for name, path in report[key].items():
+            lines.append(f"  {name}  (via: {' -> '.join(path) or 'start'})")
+    
+    if report["shortest_win"] is None:
+        lines.append("No ending can be reached!")
+    else:
+        lines.append(f"Shortest path to '{report['win_scene']}' ({len(report['shortest_win'])} steps):")
+        lines.extend(f"  {step}" for step in report["shortest_win"])
+    return "\n".join(lines)
 
 # --- Text Adventure (Escape Room) GUI Frame ---
 class TextAdventureGUI(tk.Frame):
@@ -1161,100 +4711,25 @@ class TextAdventureGUI(tk.Frame):
         tk.Frame.__init__(self, parent, bg="#2C3E50")
         self.controller = controller
         
-        # Game State Variables
-        self.current_scene = "main_room"
-        self.has_silver_key = False
-        self.has_iron_key = False
-        self.has_seen_code = False  # Code only appears after visiting desk
-        self.in_code_entry = False  # Flag to prevent recursion
-        
-        # Define all scenes and choices
-        self.scenes = {
-            "main_room": {
-                "title": "The Locked Study",
-                "description": "You wake up with a headache in a dimly lit, dusty study. You have no memory of how you got here. "
-                               "The only light comes from a flickering candle. The air is stale. You need to get out. "
-                               "You look around and see three things of interest: a heavy oak Door, a cluttered Desk, and a tall Bookshelf.\n\n"
-                               "What do you want to inspect?",
-                "choices": [
-                    ("1. Inspect the Door", "door_inspect"),
-                    ("2. Inspect the Desk", "desk_inspect"),
-                    ("3. Inspect the Bookshelf", "bookshelf_inspect"),
-                ]
-            },
-            "door_inspect": {
-                "title": "The Heavy Oak Door",
-                "description": None,  # Will be set dynamically
-                "choices": [
-                    ("1. Go back", "main_room"),
-                ]
-            },
-            "door_escape": {
-                "title": "🎉 FREEDOM!",
-                "description": "You slide the heavy Iron Key into the lock. It turns with a satisfying CLICK. "
-                               "You push the door open and cool, fresh air hits your face. You have escaped!",
-                "choices": [
-                    ("1. Play Again", "restart"),
-                ]
-            },
-            "desk_inspect": {
-                "title": "The Cluttered Desk",
-                "description": "You walk over to the desk. It is covered in dust. You find a torn piece of paper with the numbers "
-                               "'7-3-8-4' scribbled on it in red ink. You also notice a small drawer, but it is locked with a tiny silver padlock.",
-                "choices": [
-                    ("1. Try to force the drawer open", "desk_force_drawer"),
-                    ("2. Leave the desk", "main_room"),
-                ]
-            },
-            "desk_force_drawer": {
-                "title": "The Desk Drawer",
-                "description": None,  # Will be set dynamically
-                "choices": [
-                    ("1. Go back to the desk", "desk_inspect"),
-                    ("1a. Return to main room", "main_room"),
-                ]
-            },
-            "bookshelf_inspect": {
-                "title": "The Tall Bookshelf",
-                "description": "The bookshelf is filled with thick, ancient books. You notice one book looks completely different—"
-                               "it has no title and is made of metal. You pull it out and realize it's actually a lockbox! "
-                               "It requires a 4-digit passcode.",
-                "choices": [
-                    ("1. Enter a 4-digit code", "bookshelf_code_entry"),
-                    ("2. Put the box down and walk away", "main_room"),
-                ]
-            },
-            "bookshelf_code_entry": {
-                "title": "Metal Lockbox - Code Entry",
-                "description": "Enter the 4-digit code from the desk to open the lockbox...",  # Will be updated after code entry
-                "choices": [],  # Will be set dynamically
-            },
-            "bookshelf_code_correct": {
-                "title": "The Metal Lockbox Opens!",
-                "description": "A green light flashes, and the box pops open! Inside, resting on a velvet cushion, is a small Silver Key.",
-                "choices": [
-                    ("1. Take the Silver Key and return to main room", "main_room"),
-                ]
-            },
-            "bookshelf_already_open": {
-                "title": "The Bookshelf",
-                "description": "You look at the bookshelf. The metal lockbox is already open and empty. There is nothing else of interest here.",
-                "choices": [
-                    ("1. Return to main room", "main_room"),
-                ]
-            },
-            "restart": {
-                "title": "New Game",
-                "description": "Restarting...",
-                "choices": [
-                    ("1. Begin", "main_room"),
-                ]
-            }
-        }
+        # Game State Variables: the scene graph lives in escape_room.json
+        self.escape_room = load_adventure()
+        self.adventure = self.escape_room
+        self.session = AdventureSession(self.adventure) if self.adventure else None
+        
+        # What is currently on screen, so transitions only touch widgets that change
+        self.choice_buttons = []  # Pooled buttons, reused across scenes
+        self.shown_choices = []  # Choice behind each visible button
+        self.shown_title = None
+        self.shown_description = None
+        self.shown_inventory = None
+        self.save_slots = 3
+        
+        title = self.adventure.title if self.adventure else "Escape Room"
         
         # --- Widgets Setup ---
-        tk.Label(self, text="=== The Locked Study: Escape Room ===", font=('Arial', 16, 'bold'), 
-                bg="#2C3E50", fg="#ECF0F1").pack(pady=10)
+        self.header_label = tk.Label(self, text=f"=== {title} ===", font=('Arial', 16, 'bold'), 
+                                    bg="#2C3E50", fg="#ECF0F1")
+        self.header_label.pack(pady=10)
         
         # Scene title
         self.title_label = tk.Label(self, text="", font=('Arial', 14, 'bold'), 
@@ -1267,7 +4742,7 @@ class TextAdventureGUI(tk.Frame):
         self.description_text.pack(pady=15, padx=20, fill=tk.BOTH, expand=True)
         
         # Inventory display
-        self.inventory_label = tk.Label(self, text="Inventory: Code (7-3-8-4)", font=('Arial', 10, 'bold'), 
+        self.inventory_label = tk.Label(self, text="Inventory: Empty", font=('Arial', 10, 'bold'), 
                                        bg="#2C3E50", fg="#F39C12")
         self.inventory_label.pack(pady=5)
         
@@ -1275,135 +4750,216 @@ class TextAdventureGUI(tk.Frame):
         self.choices_frame = tk.Frame(self, bg="#2C3E50")
         self.choices_frame.pack(pady=15, fill=tk.BOTH, expand=True)
         
+        # Typed commands such as "look at bookshelf" or "open drawer with silver key"
+        command_frame = tk.Frame(self, bg="#2C3E50")
+        command_frame.pack(pady=5)
+        
+        tk.Label(command_frame, text="Command:", font=('Arial', 10, 'bold'), 
+                bg="#2C3E50", fg="#ECF0F1").pack(side=tk.LEFT, padx=5)
+        self.command_entry = tk.Entry(command_frame, width=40, font=('Arial', 11))
+        self.command_entry.pack(side=tk.LEFT, padx=5)
+        self.command_entry.bind("<Return>", lambda event: self.run_command())
+        self.command_entry.bind("<Control-z>", lambda event: self.undo())
+        tk.Button(command_frame, text="Do it", command=self.run_command, 
+                 bg="#3498DB", fg="white", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+        
+        self.command_feedback = tk.Label(self, text="", font=('Arial', 10, 'italic'), 
+                                        bg="#2C3E50", fg="#E67E22")
+        self.command_feedback.pack()
+        
         # Control Buttons
         button_frame = tk.Frame(self, bg="#2C3E50")
         button_frame.pack(pady=10)
         
         tk.Button(button_frame, text="Restart Game", command=self.restart_game, 
                  bg="#E74C3C", fg="white", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Undo", command=self.undo, 
+                 bg="#F39C12", fg="white", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Save", command=self.save_slot, 
+                 bg="#16A085", fg="white", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Load", command=self.load_slot, 
+                 bg="#16A085", fg="white", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Random Dungeon", command=self.new_dungeon, 
+                 bg="#8E44AD", fg="white", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Escape Room", command=lambda: self.switch_adventure(self.escape_room), 
+                 bg="#3498DB", fg="white", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back to Menu", 
                  command=lambda: [self.restart_game(), controller.winfo_toplevel().geometry("600x500"), controller.show_frame("MoreGamesMenu")],
                  bg="#27AE60", fg="white", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
         
         # Start the game
-        self.show_scene("main_room")
+        self.restart_game()
     
-    def show_scene(self, scene_key):
-        """Display a scene and its choices."""
-        if scene_key == "restart":
-            self.restart_game()
-            return
-        
-        if scene_key not in self.scenes:
-            scene_key = "main_room"
-        
-        self.current_scene = scene_key
-        scene = self.scenes[scene_key]
-        
-        # Dynamic scene content based on inventory
-        if scene_key == "door_inspect":
-            if self.has_iron_key:
-                self.show_scene("door_escape")
-                return
-            else:
-                description = "You pull on the brass handle, but it doesn't budge. There is a heavy, old-fashioned keyhole. " \
-                             "You need to find the right key to open this door."
-                scene["description"] = description
-        
-        elif scene_key == "desk_inspect":
-            self.has_seen_code = True  # Player finds the code here
-        
-        elif scene_key == "desk_force_drawer":
-            if self.has_silver_key:
-                description = "You use the small Silver Key on the tiny padlock. It pops open! Inside the drawer, " \
-                             "you find a heavy, rusty Iron Key."
-                self.has_iron_key = True
-                scene["description"] = description
-            else:
-                description = "You pull hard, but the wood is too sturdy. You need a key."
-                scene["description"] = description
-        
-        elif scene_key == "bookshelf_inspect":
-            if self.has_silver_key:
-                self.show_scene("bookshelf_already_open")
-                return
+    def show_scene(self, scene_id):
+        """Enter a scene and display it with its available choices."""
+        self.session.go(scene_id)
+        self.render_scene()
+    
+    def render_scene(self):
+        """Display the session's current scene, or ask for input if it is a prompt."""
+        scene = self.session.scene
         
-        elif scene_key == "bookshelf_code_entry" and not self.in_code_entry:
-            self.in_code_entry = True
-            self.prompt_code_entry()
-            self.in_code_entry = False
+        # Scenes with a prompt ask for input and move on to the scene the answer leads to
+        if scene.prompt is not None:
+            self.prompt_entry(scene)
             return
         
         # Update title
-        self.title_label.config(text=scene["title"])
+        if scene.title != self.shown_title:
+            self.title_label.config(text=scene.title)
+            self.shown_title = scene.title
         
         # Update description
-        self.description_text.config(state=tk.NORMAL)
-        self.description_text.delete(1.0, tk.END)
-        if scene["description"] is not None:
-            self.description_text.insert(tk.END, scene["description"])
-        self.description_text.config(state=tk.DISABLED)
-        
-        # Update inventory display
-        inv_items = []
-        if self.has_seen_code:
-            inv_items.append("Code (7-3-8-4)")
-        if self.has_silver_key:
-            inv_items.append("Silver Key")
-        if self.has_iron_key:
-            inv_items.append("Iron Key")
-        
-        if inv_items:
-            self.inventory_label.config(text="Inventory: " + ", ".join(inv_items))
-        else:
-            self.inventory_label.config(text="Inventory: Empty")
-        
-        # Clear previous choices
-        for widget in self.choices_frame.winfo_children():
-            widget.destroy()
-        
-        # Display choice buttons
-        if scene["choices"]:
-            for choice_text, next_scene in scene["choices"]:
-                btn = tk.Button(self.choices_frame, text=choice_text, width=60, 
-                               command=lambda s=next_scene: self.show_scene(s),
-                               bg="#3498DB", fg="white", font=('Arial', 11),
-                               relief=tk.RAISED, bd=2, activebackground="#2980B9")
-                btn.pack(pady=5)
-    
-    def prompt_code_entry(self):
-        """Prompt player to enter the 4-digit code."""
-        result = simpledialog.askstring("Enter Code", "Enter the 4-digit code from the desk:", parent=self)
+        description = self.session.description
+        if description != self.shown_description:
+            self.description_text.config(state=tk.NORMAL)
+            self.description_text.delete(1.0, tk.END)
+            if description is not None:
+                self.description_text.insert(tk.END, description)
+            self.description_text.config(state=tk.DISABLED)
+            self.shown_description = description
+        
+        # Update inventory display (only when an inventory flag changed)
+        inventory = self.session.flags & self.adventure.inventory_mask
+        if inventory != self.shown_inventory:
+            inv_items = self.session.inventory()
+            if inv_items:
+                self.inventory_label.config(text="Inventory: " + ", ".join(inv_items))
+            else:
+                self.inventory_label.config(text="Inventory: Empty")
+            self.shown_inventory = inventory
         
-        if result is None:  # User cancelled
-            self.show_scene("bookshelf_inspect")
-            return
+        self.show_choices(self.session.choices())
+    
+    def show_choices(self, choices):
+        """Reconfigure the pooled choice buttons in place, creating buttons only when the pool is too small."""
+        while len(self.choice_buttons) < len(choices):
+            slot = len(self.choice_buttons)
+            btn = tk.Button(self.choices_frame, text="", width=60, 
+                           command=lambda i=slot: self.make_choice(i),
+                           bg="#3498DB", fg="white", font=('Arial', 11),
+                           relief=tk.RAISED, bd=2, activebackground="#2980B9")
+            self.choice_buttons.append(btn)
+        
+        visible = len(self.shown_choices)
+        for slot, choice in enumerate(choices):
+            btn = self.choice_buttons[slot]
+            if slot >= visible:
+                btn.config(text=choice.text)
+                btn.pack(pady=5)
+            elif choice.text != self.shown_choices[slot].text:
+                btn.config(text=choice.text)
         
-        result = result.strip()
+        # Hide the buttons this scene doesn't need
+        for slot in range(len(choices), visible):
+            self.choice_buttons[slot].pack_forget()
         
-        if result == "7384" or result == "7-3-8-4":
-            self.has_silver_key = True
-            self.scenes["bookshelf_code_entry"]["description"] = \
-                "A green light flashes, and the box pops open! Inside, resting on a velvet cushion, is a small Silver Key."
-            self.scenes["bookshelf_code_entry"]["choices"] = \
-                [("1. Take the Silver Key and return to main room", "main_room")]
-        else:
-            self.scenes["bookshelf_code_entry"]["description"] = \
-                "The box beeps angrily and flashes a red light. The code is incorrect. " \
-                "You hear the lockbox reset with a mechanical click."
-            self.scenes["bookshelf_code_entry"]["choices"] = \
-                [("1. Try again", "bookshelf_code_entry"), ("2. Give up and return", "main_room")]
+        self.shown_choices = choices
+    
+    def make_choice(self, slot):
+        """Follow the choice shown on a pooled button to its target scene."""
+        self.follow_choice(self.shown_choices[slot])
+    
+    def follow_choice(self, choice):
+        """Apply a choice and move to its target scene."""
+        self.session.follow(choice)
+        self.render_scene()
+    
+    def run_command(self):
+        """Parse the typed command and follow the choice it refers to."""
+        text = self.command_entry.get()
+        self.command_entry.delete(0, tk.END)
+        if self.session is None or self.session.scene is None:
+            return
         
-        self.show_scene("bookshelf_code_entry")
+        error = self.session.command(text)
+        self.command_feedback.config(text=error or "")
+        if error is None:
+            self.render_scene()
+    
+    def prompt_entry(self, scene):
+        """Ask the player for the answer to a prompt scene (e.g. the lockbox code)."""
+        prompt = scene.prompt
+        result = simpledialog.askstring(prompt.title, prompt.text, parent=self)
+        self.session.answer(result)
+        self.render_scene()
     
     def restart_game(self):
         """Reset the game to the start."""
-        self.current_scene = "main_room"
-        self.has_silver_key = False
-        self.has_iron_key = False
-        self.has_seen_code = False
-        self.in_code_entry = False
-        self.show_scene("main_room")
+        if self.session is None:
+            self.title_label.config(text="ERROR: Could not load escape_room.json!")
+            return
+        self.session.restart()
+        self.render_scene()
+    
+    def undo(self):
+        """Go back one scene."""
+        if self.session is None or not self.session.undo():
+            self.command_feedback.config(text="Nothing to undo.")
+            return
+        self.command_feedback.config(text="")
+        self.render_scene()
+    
+    def save_slot(self):
+        """Save the current position to a numbered slot."""
+        if self.session is None or self.session.entry is None:
+            return
+        slot = simpledialog.askinteger("Save Game", f"Save to slot (1-{self.save_slots}):", 
+                                       minvalue=1, maxvalue=self.save_slots, parent=self)
+        if slot is None:
+            return
+        if save_game(self.session, slot):
+            self.command_feedback.config(text=f"Saved to slot {slot}.")
+        else:
+            messagebox.showerror("Save Game", f"Could not save to slot {slot}.")
+    
+    def load_slot(self):
+        """Continue from a numbered save slot, switching adventures if needed."""
+        slot = simpledialog.askinteger("Load Game", f"Load slot (1-{self.save_slots}):", 
+                                       minvalue=1, maxvalue=self.save_slots, parent=self)
+        if slot is None:
+            return
+        state = load_game(slot)
+        if state is None:
+            messagebox.showinfo("Load Game", f"Slot {slot} is empty.")
+            return
+        
+        source = state.get("adventure") if isinstance(state, dict) else None
+        if not isinstance(source, str):
+            messagebox.showerror("Load Game", f"Slot {slot} doesn't say which adventure it is from.")
+            return
+        adventure = self.adventure
+        if adventure is None or source != adventure.source:
+            adventure = self.escape_room if self.escape_room and source == self.escape_room.source else open_adventure(source)
+            if adventure is None:
+                messagebox.showerror("Load Game", f"Could not open the adventure '{source}'.")
+                return
+        session = AdventureSession(adventure)
+        try:
+            session.load_state(state)  # Checked before anything on screen changes
+        except ValueError as e:
+            messagebox.showerror("Load Game", f"Could not load slot {slot}: {e}.")
+            return
+        if adventure is not self.adventure:
+            self.switch_adventure(adventure, restart=False)
+        self.session = session
+        self.command_feedback.config(text=f"Loaded slot {slot}.")
+        self.render_scene()
+    
+    def new_dungeon(self):
+        """Start a freshly generated 100,000-room dungeon with a random seed."""
+        self.switch_adventure(DungeonAdventure(random.randrange(1000000)))
+    
+    def switch_adventure(self, adventure, restart=True):
+        """Play a different adventure, forgetting what the old one put on screen."""
+        self.adventure = adventure
+        self.session = AdventureSession(adventure) if adventure else None
+        self.shown_title = self.shown_description = self.shown_inventory = None
+        self.command_feedback.config(text="")
+        title = adventure.title if adventure else "Escape Room"
+        self.header_label.config(text=f"=== {title} ===")
+        if restart:
+            self.restart_game()
 
 # --- Game WIP Screen ---
 class GameWIP(tk.Frame):
@@ -2085,7 +5641,7 @@ class QuizGameGUI(tk.Frame):
         
         # Move to the next question after a brief delay so the user can see the feedback
         self.current_question_index += 1
-        self.after(1000, self.show_next_question)
+        self.controller.scheduler.call_later(1.0, self.show_next_question)
 
     def end_game(self):
         """Displays final score."""
@@ -2095,6 +5651,741 @@ class QuizGameGUI(tk.Frame):
         self.submit_button.config(state=tk.DISABLED)
         self.answer_entry.config(state=tk.DISABLED)
 
+# --- Tic-Tac-Toe Engine ---
+TTT_LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6))
+TTT_FULL = 0x1FF  # All 9 cells; cell r*3+c is bit r*3+c
+
+def ttt_symmetries():
+    """The 8 rotations and reflections of the 3x3 board, as cell permutations."""
+    permutations = []
+    for flip in (False, True):
+        for turns in range(4):
+            permutation = []
+            for cell in range(9):
+                row, col = divmod(cell, 3)
+                if flip:
+                    col = 2 - col
+                for _ in range(turns):
+                    row, col = col, 2 - row
+                permutation.append(row * 3 + col)
+            permutations.append(permutation)
+    return permutations
+
+class TicTacToeEngine:
+    """Perfect-play 3x3 Tic-Tac-Toe: negamax with alpha-beta pruning and a transposition table.
+    
+    A position is two 9-bit masks, the side to move's stones and the opponent's. The table
+    is keyed by the smallest encoding of the position under the 8 board symmetries, so
+    rotated and mirrored positions are searched once. Wins are only looked for on the lines
+    through the move just made. Values are from the side to move's point of view: a win is
+    worth 1 + the empty cells left (so faster wins score higher), a draw 0, a loss negative.
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2  # What a stored value means for the true value
+    move_order = (4, 0, 2, 6, 8, 1, 3, 5, 7)  # Center, corners, then edges
+    
+    def __init__(self):
+        line_masks = [sum(1 << cell for cell in line) for line in TTT_LINES]
+        self.lines_through = [[mask for mask in line_masks if mask >> cell & 1] for cell in range(9)]
+        self.symmetry_tables = [self.build_symmetry_table(p) for p in ttt_symmetries()]
+        self.table = {}  # canonical position -> (value, EXACT/LOWER/UPPER)
+        self.nodes = 0  # Positions searched, for measuring
+    
+    def build_symmetry_table(self, permutation):
+        """Maps every 9-bit mask to its image under one symmetry."""
+        table = []
+        for mask in range(TTT_FULL + 1):
+            image = 0
+            for cell in range(9):
+                if mask >> cell & 1:
+                    image |= 1 << permutation[cell]
+            table.append(image)
+        return table
+    
+    def canonical(self, mine, theirs):
+        """The smallest 18-bit encoding of the position over all 8 symmetries."""
+        return min(table[mine] | table[theirs] << 9 for table in self.symmetry_tables)
+    
+    def wins_with(self, stones, cell):
+        """Whether 'stones' complete a line through 'cell'."""
+        for mask in self.lines_through[cell]:
+            if stones & mask == mask:
+                return True
+        return False
+    
+    def move_value(self, mine, theirs, cell, alpha=-10, beta=10):
+        """Value of playing 'cell' for the side to move."""
+        stones = mine | 1 << cell
+        if self.wins_with(stones, cell):
+            return (TTT_FULL & ~(stones | theirs)).bit_count() + 1
+        return -self.negamax(theirs, stones, -beta, -alpha)
+    
+    def negamax(self, mine, theirs, alpha, beta):
+        """Value of the position for the side to move ('mine'), searched within (alpha, beta)."""
+        self.nodes += 1
+        empty = TTT_FULL & ~(mine | theirs)
+        if not empty:
+            return 0
+        
+        key = self.canonical(mine, theirs)
+        entry = self.table.get(key)
+        if entry is not None:
+            value, kind = entry
+            if kind == self.EXACT:
+                return value
+            if kind == self.LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+        
+        original_alpha = alpha
+        best = -10
+        for cell in self.move_order:
+            if empty >> cell & 1:
+                value = self.move_value(mine, theirs, cell, alpha, beta)
+                if value > best:
+                    best = value
+                    if value > alpha:
+                        alpha = value
+                        if alpha >= beta:
+                            break
+        
+        if best <= original_alpha:
+            kind = self.UPPER
+        elif best >= beta:
+            kind = self.LOWER
+        else:
+            kind = self.EXACT
+        self.table[key] = (best, kind)
+        return best
+    
+    def best_moves(self, mine, theirs):
+        """Returns (value, cells) with every move that keeps the best possible result."""
+        values = {cell: self.move_value(mine, theirs, cell)
+                  for cell in self.move_order if not (mine | theirs) >> cell & 1}
+        if not values:
+            return 0, []
+        best = max(values.values())
+        return best, [cell for cell, value in values.items() if value == best]
+
+class TicTacToePlayTable:
+    """Perfect play for every legal 3x3 position, precomputed into a memory-mapped file.
+    
+    The file holds one 16-bit little-endian entry per base-3 board index (X = 1, O = 2 per
+    cell, 3^9 entries, about 39 KB). An entry packs the mask of best moves (bits 0-8), the
+    side to move's value + 16 (bits 9-13) and a legal-position marker (bit 15); the 5,478
+    legal positions are filled in and the rest stay zero. Looking up a move is one index
+    calculation and two byte reads.
+    """
+    size = 3 ** 9
+    legal_bit = 1 << 15
+    file_name = "tictactoe_table.bin"
+    
+    # Base-3 value of each 9-bit mask, and the cells of each mask
+    ternary = [sum(3 ** cell for cell in range(9) if mask >> cell & 1) for mask in range(TTT_FULL + 1)]
+    cells = [tuple(cell for cell in range(9) if mask >> cell & 1) for mask in range(TTT_FULL + 1)]
+    
+    def __init__(self, cache_dir=None):
+        self.path = os.path.join(cache_dir, self.file_name) if cache_dir else None
+        self.data = None
+    
+    def index(self, x_bits, o_bits):
+        """Position index of a board given as X's and O's cell masks."""
+        return self.ternary[x_bits] + 2 * self.ternary[o_bits]
+    
+    @classmethod
+    def build(cls):
+        """Solves every legal position with TicTacToeEngine. Returns (table bytes, positions)."""
+        engine = TicTacToeEngine()
+        data = bytearray(2 * cls.size)
+        seen = set()
+        pending = [(0, 0)]
+        while pending:
+            x_bits, o_bits = pending.pop()
+            index = cls.ternary[x_bits] + 2 * cls.ternary[o_bits]
+            if index in seen:
+                continue
+            seen.add(index)
+            
+            x_to_move = x_bits.bit_count() == o_bits.bit_count()
+            mine, theirs = (x_bits, o_bits) if x_to_move else (o_bits, x_bits)
+            empty = TTT_FULL & ~(x_bits | o_bits)
+            last_won = any(engine.wins_with(theirs, cell) for cell in cls.cells[theirs])
+            if last_won:
+                value, moves = -(empty.bit_count() + 1), []  # Lost, as fast as a win is valued
+            else:
+                value, moves = engine.best_moves(mine, theirs)
+            
+            entry = cls.legal_bit | (value + 16) << 9 | sum(1 << cell for cell in moves)
+            data[2 * index:2 * index + 2] = entry.to_bytes(2, 'little')
+            
+            if not last_won:
+                for cell in cls.cells[empty]:
+                    if x_to_move:
+                        pending.append((x_bits | 1 << cell, o_bits))
+                    else:
+                        pending.append((x_bits, o_bits | 1 << cell))
+        return data, len(seen)
+    
+    def load(self):
+        """Memory-maps the table file, building and writing it first if it is missing."""
+        if self.data is not None:
+            return self.data
+        
+        if self.path and os.path.exists(self.path) and os.path.getsize(self.path) == 2 * self.size:
+            try:
+                with open(self.path, 'rb') as f:
+                    self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                return self.data
+            except (OSError, ValueError) as e:
+                print(f"Could not map the Tic-Tac-Toe table: {e}")
+        
+        self.data, _ = self.build()
+        if self.path:
+            try:
+                with open(self.path, 'wb') as f:
+                    f.write(self.data)
+            except OSError as e:
+                print(f"Could not write the Tic-Tac-Toe table: {e}")
+        return self.data
+    
+    def entry(self, x_bits, o_bits):
+        """The raw 16-bit entry of a position."""
+        data = self.data if self.data is not None else self.load()
+        index = 2 * (self.ternary[x_bits] + 2 * self.ternary[o_bits])
+        return data[index] | data[index + 1] << 8
+    
+    def value(self, x_bits, o_bits):
+        """Value of a legal position for the side to move: positive wins, 0 draws, negative loses.
+        
+        A finished game counts as lost for the side to move, unless it was drawn.
+        """
+        return (self.entry(x_bits, o_bits) >> 9 & 0x1F) - 16
+    
+    def best_moves(self, x_bits, o_bits):
+        """Every perfect move in a position, as cell numbers (empty once the game is over)."""
+        return self.cells[self.entry(x_bits, o_bits) & TTT_FULL]
+    
+    def choose_move(self, x_bits, o_bits, rng=random):
+        """A random perfect move, or None once the game is over."""
+        moves = self.cells[self.entry(x_bits, o_bits) & TTT_FULL]
+        return rng.choice(moves) if moves else None
+
+def tictactoe_self_play(games, cache_dir=None, seed=None):
+    """Plays perfect-vs-perfect games from the play table. Returns (results, seconds).
+    
+    'results' counts X wins, O wins and draws; perfect play should only ever draw.
+    """
+    table = TicTacToePlayTable(cache_dir)
+    table.load()
+    rng = random.Random(seed)
+    choice = rng.choice
+    entry = table.entry
+    cells = table.cells
+    results = {"X": 0, "O": 0, "draw": 0}
+    
+    start = time.perf_counter()
+    for _ in range(games):
+        x_bits = o_bits = 0
+        while True:
+            moves = cells[entry(x_bits, o_bits) & TTT_FULL]
+            if not moves:
+                break
+            if x_bits.bit_count() == o_bits.bit_count():
+                x_bits |= 1 << choice(moves)
+            else:
+                o_bits |= 1 << choice(moves)
+        if table.value(x_bits, o_bits) == 0:
+            results["draw"] += 1
+        else:
+            results["X" if x_bits.bit_count() > o_bits.bit_count() else "O"] += 1  # The last mover won
+    return results, time.perf_counter() - start
+
+# --- m,n,k Game Engine ---
+class MNKBoard:
+    """An m x n board where k stones in a row win: (3, 3, 3) is Tic-Tac-Toe, (15, 15, 5) Gomoku.
+    
+    Cells are numbered row * cols + col and hold 0 (empty), 1 (X, who moves first) or 2 (O).
+    Every line segment of k cells that could still be won is a "window", and the board
+    keeps each player's stone count per window. Placing a stone only touches the windows
+    through that cell, so win detection and the heuristic score are both incremental.
+    """
+    max_size = 15
+    
+    def __init__(self, rows=3, cols=3, k=3):
+        if not (3 <= rows <= self.max_size and 3 <= cols <= self.max_size):
+            raise ValueError(f"Board size must be between 3x3 and {self.max_size}x{self.max_size}")
+        if not 3 <= k <= max(rows, cols):
+            raise ValueError(f"Stones in a row must be between 3 and {max(rows, cols)}")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        
+        self.windows = []
+        for row in range(rows):
+            for col in range(cols):
+                for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row, end_col = row + d_row * (k - 1), col + d_col * (k - 1)
+                    if 0 <= end_row < rows and 0 <= end_col < cols:
+                        self.windows.append(tuple((row + d_row * i) * cols + col + d_col * i for i in range(k)))
+        self.windows_through = [[] for _ in range(self.size)]
+        for window, cells in enumerate(self.windows):
+            for cell in cells:
+                self.windows_through[cell].append(window)
+        
+        # Cells within two steps of each cell, where replies to a stone are looked for
+        self.neighbours = []
+        for cell in range(self.size):
+            row, col = divmod(cell, cols)
+            self.neighbours.append([r * cols + c for r in range(max(row - 2, 0), min(row + 3, rows))
+                                    for c in range(max(col - 2, 0), min(col + 3, cols))])
+        
+        # Heuristic worth of a window holding c stones of one player and none of the other
+        self.weights = [0] + [8 ** c for c in range(1, k)] + [0]
+        self.reset()
+    
+    def reset(self):
+        """Clears the board."""
+        self.cells = [0] * self.size
+        self.counts = [None, [0] * len(self.windows), [0] * len(self.windows)]
+        self.potential = [0, 0, 0]  # Sum of window weights per player
+        self.moves = []  # Cells played, in order
+        self.near = [0] * self.size  # Stones within two steps of each cell
+        self.winner = 0
+        self.winning_window = None
+    
+    def copy(self):
+        """An independent copy, e.g. for searching on another thread."""
+        board = MNKBoard.__new__(MNKBoard)
+        board.__dict__.update(self.__dict__)
+        board.cells = self.cells[:]
+        board.counts = [None, self.counts[1][:], self.counts[2][:]]
+        board.potential = self.potential[:]
+        board.moves = self.moves[:]
+        board.near = self.near[:]
+        return board
+    
+    def to_move(self):
+        """The player whose turn it is (1 or 2)."""
+        return 1 + (len(self.moves) & 1)
+    
+    def is_full(self):
+        return len(self.moves) == self.size
+    
+    def is_over(self):
+        return self.winner != 0 or len(self.moves) == self.size
+    
+    def play(self, cell):
+        """Places the side to move's stone on an empty cell."""
+        player = self.to_move()
+        opponent = 3 - player
+        mine, theirs = self.counts[player], self.counts[opponent]
+        weights = self.weights
+        gained = lost = 0
+        for window in self.windows_through[cell]:
+            count = mine[window]
+            if theirs[window] == 0:
+                gained += weights[count + 1] - weights[count]
+                if count + 1 == self.k:
+                    self.winner = player
+                    self.winning_window = window
+            elif count == 0:
+                lost += weights[theirs[window]]  # The opponent can no longer complete this window
+            mine[window] = count + 1
+        self.potential[player] += gained
+        self.potential[opponent] -= lost
+        self.cells[cell] = player
+        near = self.near
+        for neighbour in self.neighbours[cell]:
+            near[neighbour] += 1
+        self.moves.append((cell, gained, lost))
+    
+    def undo(self):
+        """Takes back the last move."""
+        cell, gained, lost = self.moves.pop()
+        player = self.cells[cell]
+        mine = self.counts[player]
+        for window in self.windows_through[cell]:
+            mine[window] -= 1
+        self.potential[player] -= gained
+        self.potential[3 - player] += lost
+        self.cells[cell] = 0
+        near = self.near
+        for neighbour in self.neighbours[cell]:
+            near[neighbour] -= 1
+        self.winner = 0
+        self.winning_window = None
+    
+    def evaluate(self):
+        """Heuristic value for the side to move."""
+        player = self.to_move()
+        return self.potential[player] - self.potential[3 - player]
+    
+    def bits(self, player):
+        """The cells 'player' holds, as a bit mask."""
+        bits = 0
+        for cell, owner in enumerate(self.cells):
+            if owner == player:
+                bits |= 1 << cell
+        return bits
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget runs out."""
+
+class MNKEngine:
+    """Iterative-deepening alpha-beta search for m,n,k games under a time budget.
+    
+    Only empty cells near existing stones are considered, ordered by how much they build
+    the mover's windows and block the opponent's; on big boards only the best few are
+    searched. Threats are handled before searching: an immediate win is played, and if
+    the opponent threatens to win the search is limited to the blocking cells. Depths
+    1, 2, 3, ... are searched until the budget is spent, and the best move of the deepest
+    finished search is played (the previous best is tried first at each new depth).
+    """
+    win_score = 1 << 40
+    
+    def __init__(self, budget_ms=1000, max_candidates=12):
+        self.budget_ms = budget_ms
+        self.max_candidates = max_candidates
+        self.nodes = 0
+        self.depth_reached = 0
+        self.stop = None  # threading.Event that ends the current search early
+    
+    def candidates(self, board):
+        """Empty cells within two steps of a stone (the center on an empty board)."""
+        if not board.moves:
+            return [(board.rows // 2) * board.cols + board.cols // 2]
+        cells, near = board.cells, board.near
+        return [cell for cell in range(board.size) if near[cell] and not cells[cell]]
+    
+    def ordered_moves(self, board):
+        """Returns (moves, winning) with moves best-first and threats resolved.
+        
+        'winning' is True when the first move wins on the spot.
+        """
+        player = board.to_move()
+        mine, theirs = board.counts[player], board.counts[3 - player]
+        weights, k = board.weights, board.k
+        scored = []
+        blocks = []
+        for cell in self.candidates(board):
+            attack = defend = 0
+            threat = False
+            for window in board.windows_through[cell]:
+                m, t = mine[window], theirs[window]
+                if t == 0:
+                    if m == k - 1:
+                        return [cell], True
+                    attack += weights[m + 1]
+                elif m == 0:
+                    defend += weights[t + 1]
+                    if t == k - 1:
+                        threat = True
+            if threat:
+                blocks.append(cell)
+            scored.append((attack + defend, cell))
+        if blocks:
+            return blocks, False
+        scored.sort(reverse=True)
+        return [cell for _, cell in scored[:self.max_candidates]], False
+    
+    def negamax(self, board, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 63 == 0 and (time.perf_counter() > self.deadline or self.stop is not None and self.stop.is_set()):
+            raise SearchTimeout()
+        if board.is_full():
+            return 0
+        moves, winning = self.ordered_moves(board)
+        if winning:
+            return self.win_score - ply
+        if depth == 0:
+            return board.evaluate()
+        
+        best = -self.win_score
+        for cell in moves:
+            board.play(cell)
+            try:
+                value = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.undo()
+            if value > best:
+                best = value
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        return best
+    
+    def choose_move(self, board, budget_ms=None, stop=None):
+        """The best move found within the time budget (milliseconds) or until 'stop' is set."""
+        budget = self.budget_ms if budget_ms is None else budget_ms
+        self.deadline = time.perf_counter() + budget / 1000
+        self.stop = stop
+        self.nodes = 0
+        self.depth_reached = 0
+        
+        moves, winning = self.ordered_moves(board)
+        if winning or len(moves) == 1:
+            return moves[0]
+        best_move = moves[0]
+        empty = board.size - len(board.moves)
+        for depth in range(1, empty + 1):
+            try:
+                alpha = -self.win_score - 1
+                best_here = None
+                for cell in moves:
+                    board.play(cell)
+                    try:
+                        value = -self.negamax(board, depth - 1, -self.win_score - 1, -alpha, 1)
+                    finally:
+                        board.undo()
+                    if value > alpha:
+                        alpha, best_here = value, cell
+            except SearchTimeout:
+                break
+            best_move = best_here
+            self.depth_reached = depth
+            if abs(alpha) >= self.win_score - board.size:
+                break  # A forced win or loss was found; searching deeper changes nothing
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+        return best_move
+
+# --- Ultimate Tic-Tac-Toe Engine ---
+UTTT_WINS = [any(mask & line == line for line in (sum(1 << c for c in cells) for cells in TTT_LINES))
+             for mask in range(TTT_FULL + 1)]  # Whether a 9-bit mask holds a line
+UTTT_CELLS = [tuple(cell for cell in range(9) if mask >> cell & 1) for mask in range(TTT_FULL + 1)]
+UTTT_DRAW = 3
+
+class UltimateState:
+    """A position of Ultimate Tic-Tac-Toe: a 3x3 grid of 3x3 boards.
+    
+    Each player's stones are nine 9-bit masks (one per small board) and the won boards are
+    one 9-bit mask per player, so a move and its win checks are a few bit operations and
+    table lookups. A move is board * 9 + cell; it sends the opponent to board 'cell',
+    unless that board is already won or full (then any open board may be played).
+    """
+    __slots__ = ("stones", "won", "closed", "forced", "player", "winner")
+    
+    def __init__(self):
+        self.stones = [None, [0] * 9, [0] * 9]  # stones[player][board]
+        self.won = [None, 0, 0]  # Small boards won by each player
+        self.closed = 0  # Small boards that are won or full
+        self.forced = -1  # Board the next move must be played on, or -1 for any
+        self.player = 1  # 1 is X (moves first), 2 is O
+        self.winner = 0  # 0 while playing, 1 or 2 for a win, UTTT_DRAW for a draw
+    
+    def copy(self):
+        state = UltimateState.__new__(UltimateState)
+        state.stones = [None, self.stones[1][:], self.stones[2][:]]
+        state.won = self.won[:]
+        state.closed, state.forced, state.player, state.winner = self.closed, self.forced, self.player, self.winner
+        return state
+    
+    def to_tuple(self):
+        """A compact, picklable form for sending to worker processes."""
+        return (tuple(self.stones[1]), tuple(self.stones[2]), self.won[1], self.won[2],
+                self.closed, self.forced, self.player, self.winner)
+    
+    @classmethod
+    def from_tuple(cls, data):
+        state = cls.__new__(cls)
+        x, o, won_x, won_o, state.closed, state.forced, state.player, state.winner = data
+        state.stones = [None, list(x), list(o)]
+        state.won = [None, won_x, won_o]
+        return state
+    
+    def open_boards(self):
+        """Boards the side to move may play on."""
+        if self.forced >= 0 and not self.closed >> self.forced & 1:
+            return (self.forced,)
+        return UTTT_CELLS[TTT_FULL & ~self.closed]
+    
+    def legal_moves(self):
+        if self.winner:
+            return []
+        x, o = self.stones[1], self.stones[2]
+        return [board * 9 + cell for board in self.open_boards()
+                for cell in UTTT_CELLS[TTT_FULL & ~(x[board] | o[board])]]
+    
+    def play(self, move):
+        """Plays a move for the side to move."""
+        board, cell = divmod(move, 9)
+        player = self.player
+        stones = self.stones[player]
+        stones[board] |= 1 << cell
+        if UTTT_WINS[stones[board]]:
+            self.won[player] |= 1 << board
+            self.closed |= 1 << board
+            if UTTT_WINS[self.won[player]]:
+                self.winner = player
+        elif stones[board] | self.stones[3 - player][board] == TTT_FULL:
+            self.closed |= 1 << board
+        if not self.winner and self.closed == TTT_FULL:
+            self.winner = UTTT_DRAW
+        self.forced = cell
+        self.player = 3 - player
+
+def ultimate_playout(state, rng):
+    """Plays random moves on a copy of 'state' until the game ends. Returns the winner."""
+    x, o = state.stones[1][:], state.stones[2][:]
+    stones = (None, x, o)
+    won = [0, state.won[1], state.won[2]]
+    closed, forced, player, winner = state.closed, state.forced, state.player, state.winner
+    wins, cells, randrange = UTTT_WINS, UTTT_CELLS, rng.randrange
+    while not winner:
+        if forced < 0 or closed >> forced & 1:
+            open_boards = cells[TTT_FULL & ~closed]
+            forced = open_boards[randrange(len(open_boards))]
+        board = forced
+        empty = cells[TTT_FULL & ~(x[board] | o[board])]
+        cell = empty[randrange(len(empty))]
+        mine = stones[player]
+        mine[board] |= 1 << cell
+        if wins[mine[board]]:
+            won[player] |= 1 << board
+            closed |= 1 << board
+            if wins[won[player]]:
+                return player
+        elif mine[board] | stones[3 - player][board] == TTT_FULL:
+            closed |= 1 << board
+        if closed == TTT_FULL:
+            return UTTT_DRAW
+        forced = cell
+        player = 3 - player
+    return winner
+
+class UltimateNode:
+    """A node of the search tree. 'wins' are scored for the player who moved into it."""
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "mover")
+    
+    def __init__(self, state, move=None, parent=None):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = state.legal_moves()
+        self.visits = 0
+        self.wins = 0.0
+        self.mover = 3 - state.player
+
+ultimate_stop = None  # In a worker process, the pool's Event that ends the searches early
+
+def ultimate_worker_init(stop):
+    """Process pool initializer: keeps the pool's stop Event, which can only reach a worker process
+    when it starts."""
+    global ultimate_stop
+    ultimate_stop = stop
+
+def ultimate_mcts(data, seconds, seed, exploration=1.4):
+    """Runs UCT Monte Carlo Tree Search from a position for 'seconds', or until the
+    worker's stop Event is set.
+    
+    Takes and returns plain data so it can run in a worker process. Returns
+    ({move: visits}, playouts).
+    """
+    root_state = UltimateState.from_tuple(data)
+    root = UltimateNode(root_state)
+    rng = random.Random(seed)
+    log, sqrt = math.log, math.sqrt
+    deadline = time.perf_counter() + seconds
+    stop = ultimate_stop
+    playouts = 0
+    
+    while True:
+        if playouts & 15 == 0 and (time.perf_counter() > deadline or stop is not None and stop.is_set()):
+            break
+        node, state = root, root_state.copy()
+        
+        # Selection: follow the best UCT child while the node is fully expanded
+        while not node.untried and node.children:
+            scale = exploration * sqrt(log(node.visits))
+            node = max(node.children, key=lambda child: child.wins / child.visits + scale / sqrt(child.visits))
+            state.play(node.move)
+        
+        # Expansion: add one untried move
+        if node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            state.play(move)
+            child = UltimateNode(state, move, node)
+            node.children.append(child)
+            node = child
+        
+        # Simulation and backpropagation
+        winner = ultimate_playout(state, rng) if not state.winner else state.winner
+        playouts += 1
+        while node is not None:
+            node.visits += 1
+            if winner == node.mover:
+                node.wins += 1.0
+            elif winner == UTTT_DRAW:
+                node.wins += 0.5
+            node = node.parent
+    
+    return {child.move: child.visits for child in root.children}, playouts
+
+class UltimateMCTS:
+    """Root-parallel MCTS: every worker process searches the same position with its own
+    random seed, and the visit counts of the root moves are added up.
+    
+    The process pool is created on first use and sized to the machine's cores, with spawned
+    workers (see process_map). Its workers share a stop Event, so a cancelled search ends
+    within a few playouts instead of running out its thinking time ahead of the next one.
+    """
+    def __init__(self, think_ms=1000, workers=None):
+        self.think_ms = think_ms
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.stop_workers = None
+        self.started = time.perf_counter()
+        self.playouts = 0
+        self.playouts_per_second = 0.0
+    
+    def start(self, state):
+        """Starts a search of 'state' in the pool. Returns the futures for finish()."""
+        if self.pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            context = multiprocessing.get_context("spawn")
+            self.stop_workers = context.Event()
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                            initializer=ultimate_worker_init, initargs=(self.stop_workers,))
+        self.stop_workers.clear()
+        data = state.to_tuple()
+        self.started = time.perf_counter()
+        return [self.pool.submit(ultimate_mcts, data, self.think_ms / 1000, random.randrange(1 << 30))
+                for _ in range(self.workers)]
+    
+    def finish(self, futures):
+        """Combines the workers' results into the most visited move."""
+        visits = {}
+        playouts = 0
+        for future in futures:
+            counts, done = future.result()
+            playouts += done
+            for move, count in counts.items():
+                visits[move] = visits.get(move, 0) + count
+        self.playouts = playouts
+        self.playouts_per_second = playouts / max(time.perf_counter() - self.started, 1e-9)
+        return max(visits, key=visits.get) if visits else None
+    
+    def choose_move(self, state, stop=None):
+        """Searches 'state' and waits for the answer. Returns None if 'stop' is set first."""
+        futures = self.start(state)
+        while wait(futures, timeout=0.05).not_done:
+            if stop is not None and stop.is_set():
+                self.stop_workers.set()
+                wait(futures)  # A few playouts; the pool is then free for the next search
+                return None
+        return self.finish(futures)
+    
+    def shutdown(self):
+        """Ends any search and stops the worker processes; the next search starts new ones."""
+        if self.pool is not None:
+            self.stop_workers.set()
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
 # --- Tic-Tac-Toe Selection GUI Frame ---
 class TicTacToeSelectionGUI(tk.Frame):
     """Screen to select 1 player or 2 player mode."""
@@ -2109,6 +6400,7 @@ class TicTacToeSelectionGUI(tk.Frame):
         
         tk.Button(self, text="1 Player (vs Computer)", width=30, font=('Arial', 12), command=self.start_one_player).pack(pady=10)
         tk.Button(self, text="2 Players (Local)", width=30, font=('Arial', 12), command=self.start_two_player).pack(pady=10)
+        tk.Button(self, text="Ultimate Tic-Tac-Toe (vs Computer)", width=30, font=('Arial', 12), command=self.start_ultimate).pack(pady=10)
         
         tk.Button(self, text="Back to Menu", width=30, command=lambda: controller.show_frame("MainMenu")).pack(pady=20)
     
@@ -2123,6 +6415,12 @@ class TicTacToeSelectionGUI(tk.Frame):
         tictactoe_frame = self.controller.frames["TicTacToeGUI"]
         tictactoe_frame.set_game_mode(one_player=False)
         self.controller.show_frame("TicTacToeGUI")
+    
+    def start_ultimate(self):
+        """Starts an Ultimate Tic-Tac-Toe game against the computer."""
+        self.controller.frames["UltimateTicTacToeGUI"].reset_game()
+        self.controller.winfo_toplevel().geometry("650x650")
+        self.controller.show_frame("UltimateTicTacToeGUI")
 
 # --- Tic-Tac-Toe GUI Frame ---
 class TicTacToeGUI(tk.Frame):
@@ -2131,182 +6429,139 @@ class TicTacToeGUI(tk.Frame):
         self.controller = controller
         
         # Game State Variables
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
+        self.board = MNKBoard(3, 3, 3)  # Rows, columns and stones in a row to win
         self.current_player = "X"
-        self.buttons = {}  # Dictionary to hold the 9 button objects
+        self.buttons = {}  # Dictionary to hold the grid's button objects
         self.game_active = True
         self.one_player = False  # Whether it's 1 player (vs computer) or 2 player
         self.ai_thinking = False  # Flag to prevent clicks while computer is thinking
+        self.play_table = TicTacToePlayTable(os.path.dirname(os.path.abspath(__file__)))
+        self.engine = MNKEngine(budget_ms=1000)  # Used for every board except classic 3x3
+        self.move_call = None  # Pending delayed computer move
 
         # --- Widgets Setup ---
         self.title_label = tk.Label(self, text="=== Tic-Tac-Toe (2-Player) ===", font=('Arial', 16, 'bold'), bg="#90EE90")
         self.title_label.pack(pady=10)
         
+        # Board settings: rows, columns, how many in a row win, and the computer's thinking time
+        settings_frame = tk.Frame(self, bg="#90EE90")
+        settings_frame.pack(pady=5)
+        
+        self.rows_var = tk.IntVar(value=3)
+        self.cols_var = tk.IntVar(value=3)
+        self.k_var = tk.IntVar(value=3)
+        self.budget_var = tk.IntVar(value=1000)
+        for text, var, low, high, step in (("Rows:", self.rows_var, 3, MNKBoard.max_size, 1),
+                                           ("Columns:", self.cols_var, 3, MNKBoard.max_size, 1),
+                                           ("In a row:", self.k_var, 3, MNKBoard.max_size, 1),
+                                           ("Think (ms):", self.budget_var, 100, 10000, 100)):
+            tk.Label(settings_frame, text=text, bg="#90EE90").pack(side=tk.LEFT, padx=2)
+            tk.Spinbox(settings_frame, from_=low, to=high, increment=step, textvariable=var, 
+                      width=5 if step > 1 else 3).pack(side=tk.LEFT, padx=2)
+        tk.Button(settings_frame, text="Apply", command=self.apply_settings).pack(side=tk.LEFT, padx=5)
+        
         # Label to display current status
         self.status_label = tk.Label(self, text="Player X's turn", bg="#90EE90", font=('Arial', 14))
         self.status_label.pack(pady=10)
 
-        # Frame for the 3x3 Game Board Grid
-        grid_frame = tk.Frame(self, bg="#90EE90")
-        grid_frame.pack(pady=20)
+        # Frame for the Game Board Grid
+        self.grid_frame = tk.Frame(self, bg="#90EE90")
+        self.grid_frame.pack(pady=10)
+        self.build_grid()
+
+        # Control Buttons
+        tk.Button(self, text="New Game", command=self.reset_game).pack(side=tk.LEFT, padx=10, pady=10)
+        tk.Button(self, text="Back to Selection", command=lambda: [self.reset_game(), controller.winfo_toplevel().geometry("600x500"), controller.show_frame("TicTacToeSelectionGUI")]).pack(side=tk.RIGHT, padx=10, pady=10)
+
+    def build_grid(self):
+        """Creates one button per cell, smaller on bigger boards."""
+        for button in self.buttons.values():
+            button.destroy()
+        self.buttons = {}
         
-        # Create 9 buttons in a 3x3 grid
-        for row in range(3):
-            for col in range(3):
+        large = max(self.board.rows, self.board.cols) > 5
+        for row in range(self.board.rows):
+            for col in range(self.board.cols):
                 # We use a lambda to pass the row and col arguments to the button_click function
                 button = tk.Button(
-                    grid_frame, 
+                    self.grid_frame, 
                     text=" ", 
-                    font=('Arial', 24, 'bold'), 
-                    width=4, 
-                    height=2,
+                    font=('Arial', 10 if large else 24, 'bold'), 
+                    width=2 if large else 4, 
+                    height=1 if large else 2,
                     command=lambda r=row, c=col: self.button_click(r, c)
                 )
-                button.grid(row=row, column=col, padx=2, pady=2)
+                button.grid(row=row, column=col, padx=1 if large else 2, pady=1 if large else 2)
                 self.buttons[(row, col)] = button # Store button reference by (row, col)
-
-        # Control Buttons
-        tk.Button(self, text="New Game", command=self.reset_game).pack(side=tk.LEFT, padx=10, pady=10)
-        tk.Button(self, text="Back to Selection", command=lambda: [self.reset_game(), controller.show_frame("TicTacToeSelectionGUI")]).pack(side=tk.RIGHT, padx=10, pady=10)
+        self.default_bg = button.cget("bg")
+    
+    def fit_window(self):
+        """Makes room for big boards."""
+        largest = max(self.board.rows, self.board.cols)
+        geometry = "600x500" if largest == 3 else "700x650" if largest <= 5 else "800x800"
+        self.controller.winfo_toplevel().geometry(geometry)
+    
+    def apply_settings(self):
+        """Starts a new game on a board with the chosen size and win length."""
+        try:
+            board = MNKBoard(self.rows_var.get(), self.cols_var.get(), self.k_var.get())
+            budget = self.budget_var.get()
+        except (ValueError, tk.TclError) as e:
+            messagebox.showerror("Invalid Settings", str(e))
+            return
+        self.engine.budget_ms = max(budget, 1)
+        if (board.rows, board.cols, board.k) != (self.board.rows, self.board.cols, self.board.k):
+            self.board = board
+            self.build_grid()
+            self.fit_window()
+        self.reset_game()
 
     def set_game_mode(self, one_player):
         """Sets whether it's 1 player or 2 player mode."""
         self.one_player = one_player
         mode_text = "1 Player (vs Computer)" if one_player else "2 Player (Local)"
         self.title_label.config(text=f"=== Tic-Tac-Toe: {mode_text} ===")
+        self.fit_window()
         self.reset_game()
     
-    def get_available_moves(self):
-        """Returns a list of available board positions."""
-        moves = []
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == ' ':
-                    moves.append((i, j))
-        return moves
-    
-    def evaluate_board(self):
-        """Simple board evaluation: +10 for X win, -10 for O win, 0 otherwise."""
-        winner = self.check_winner()
-        if winner == 'X':
-            return 10
-        elif winner == 'O':
-            return -10
-        else:
-            return 0
-    
-    def minimax(self, depth, is_maximizing):
-        """Minimax algorithm for AI (simple depth-limited search)."""
-        score = self.evaluate_board()
-        
-        # Terminal states
-        if score == 10:
-            return score - depth
-        if score == -10:
-            return score + depth
-        
-        available_moves = self.get_available_moves()
-        if not available_moves:
-            return 0
-        
-        # Limit depth to avoid long thinking time
-        if depth >= 6:
-            return 0
-        
-        if is_maximizing:
-            max_score = -float('inf')
-            for row, col in available_moves:
-                self.board[row][col] = 'X'
-                score = self.minimax(depth + 1, False)
-                self.board[row][col] = ' '
-                max_score = max(score, max_score)
-            return max_score
+    def get_best_move(self, board, stop=None):
+        """Picks the AI's move on 'board': a perfect table lookup on 3x3, a timed search otherwise.
+        
+        Runs on the AI executor's worker thread, so it only looks at the board copy it is given.
+        """
+        if (board.rows, board.cols, board.k) == (3, 3, 3):
+            cell = self.play_table.choose_move(board.bits(1), board.bits(2))
+        elif board.is_over():
+            cell = None
         else:
-            min_score = float('inf')
-            for row, col in available_moves:
-                self.board[row][col] = 'O'
-                score = self.minimax(depth + 1, True)
-                self.board[row][col] = ' '
-                min_score = min(score, min_score)
-            return min_score
-    
-    def get_best_move(self):
-        """Gets the best move for the AI using minimax algorithm."""
-        best_score = -float('inf')
-        best_move = None
-        
-        for row, col in self.get_available_moves():
-            self.board[row][col] = 'O'
-            score = self.minimax(0, False)
-            self.board[row][col] = ' '
-            
-            if score > best_score:
-                best_score = score
-                best_move = (row, col)
-        
-        return best_move
+            cell = self.engine.choose_move(board, stop=stop)
+        if cell is None:
+            return None
+        return divmod(cell, board.cols)
     
     def computer_move(self):
-        """Makes the computer's move."""
+        """Starts the computer's search; the move is played when the result comes back."""
+        self.move_call = None
         self.ai_thinking = True
         self.status_label.config(text="Computer is thinking...")
-        self.update()
-        
-        move = self.get_best_move()
-        if move:
-            row, col = move
-            self.board[row][col] = 'O'
-            self.buttons[(row, col)].config(text='O', state=tk.DISABLED)
-            
-            winner = self.check_winner()
-            if winner:
-                self.status_label.config(text=f"🎉 Player {winner} wins!")
-                self.game_active = False
-                self.disable_all_buttons()
-            elif not self.get_available_moves():
-                self.status_label.config(text="🤝 It's a tie!")
-                self.game_active = False
-            else:
-                self.current_player = "X"
-                self.status_label.config(text="Player X's turn")
-        
+        self.controller.ai.submit(self, self.apply_computer_move, self.get_best_move, self.board.copy(), 
+                                  cancellable=True)
+    
+    def apply_computer_move(self, move):
+        """Plays the move the computer's search found."""
         self.ai_thinking = False
+        if move and self.game_active:
+            self.place(*move)
 
     def check_winner(self):
-        """Checks the 3x3 board for a winner."""
-        # Check rows, columns, and diagonals using the board array
-        
-        # Check rows
-        for i in range(3):
-            if self.board[i][0] == self.board[i][1] == self.board[i][2] != ' ':
-                return self.board[i][0]
-        
-        # Check columns
-        for j in range(3):
-            if self.board[0][j] == self.board[1][j] == self.board[2][j] != ' ':
-                return self.board[0][j]
-        
-        # Check diagonals
-        if self.board[0][0] == self.board[1][1] == self.board[2][2] != ' ':
-            return self.board[0][0]
-        if self.board[0][2] == self.board[1][1] == self.board[2][0] != ' ':
-            return self.board[0][2]
-        
-        return None
-
-    def button_click(self, row, col):
-        """Handles the logic when a grid button is pressed."""
-        if not self.game_active or self.board[row][col] != ' ' or self.ai_thinking:
-            return
-
-        # Only allow clicks on X's turn in 1 player mode
-        if self.one_player and self.current_player != 'X':
-            return
+        """Returns the winning player's mark, if the last move completed a line."""
+        return " XO"[self.board.winner] if self.board.winner else None
 
-        # 1. Update the board state
-        self.board[row][col] = self.current_player
+    def place(self, row, col):
+        """Plays the current player's mark and moves the game on."""
+        self.board.play(row * self.board.cols + col)
         
-        # 2. Update the button text and disable it
+        # Update the button text and disable it
         button = self.buttons[(row, col)]
         button.config(text=self.current_player, state=tk.DISABLED)
         
@@ -2316,22 +6571,35 @@ class TicTacToeGUI(tk.Frame):
             self.status_label.config(text=f"🎉 Player {winner} wins!")
             self.game_active = False
             self.disable_all_buttons()
+            for cell in self.board.windows[self.board.winning_window]:
+                self.buttons[divmod(cell, self.board.cols)].config(bg="#F4D03F")
         
         # Check for a tie
-        elif all(self.board[i][j] != ' ' for i in range(3) for j in range(3)):
+        elif self.board.is_full():
             self.status_label.config(text="🤝 It's a tie!")
             self.game_active = False
 
         else:
-            # 3. Switch player and update status label
+            # Switch player and update status label
             self.current_player = "O" if self.current_player == "X" else "X"
             
             # If 1 player mode and it's now computer's turn, make the computer move
             if self.one_player and self.current_player == "O":
-                self.after(500, self.computer_move)  # Delay 500ms for better UX
+                self.move_call = self.controller.scheduler.call_later(0.5, self.computer_move)  # Delay 500ms for better UX
             else:
                 self.status_label.config(text=f"Player {self.current_player}'s turn")
 
+    def button_click(self, row, col):
+        """Handles the logic when a grid button is pressed."""
+        if not self.game_active or self.board.cells[row * self.board.cols + col] or self.ai_thinking:
+            return
+
+        # Only allow clicks on X's turn in 1 player mode
+        if self.one_player and self.current_player != 'X':
+            return
+
+        self.place(row, col)
+
     def disable_all_buttons(self):
         """Disables all buttons at the end of the game."""
         for button in self.buttons.values():
@@ -2339,8 +6607,11 @@ class TicTacToeGUI(tk.Frame):
                 button.config(state=tk.DISABLED)
                 
     def reset_game(self):
-        """Resets the board and game state."""
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
+        """Resets the board and game state, abandoning any computer move in progress."""
+        self.controller.scheduler.cancel(self.move_call)
+        self.move_call = None
+        self.controller.ai.cancel(self)
+        self.board.reset()
         self.current_player = "X"
         self.game_active = True
         self.ai_thinking = False
@@ -2348,9 +6619,256 @@ class TicTacToeGUI(tk.Frame):
         
         # Reset all button appearances and state
         for button in self.buttons.values():
-            button.config(text=" ", state=tk.NORMAL)
+            button.config(text=" ", state=tk.NORMAL, bg=self.default_bg)
+
+# --- Ultimate Tic-Tac-Toe GUI Frame ---
+class UltimateTicTacToeGUI(tk.Frame):
+    """Ultimate Tic-Tac-Toe against a Monte Carlo Tree Search opponent."""
+    colors = {"active": "#FFF9C4", 1: "#AED6F1", 2: "#F5B7B1", UTTT_DRAW: "#D5D8DC"}
+    
+    def __init__(self, parent, controller):
+        bg = "#90EE90"
+        tk.Frame.__init__(self, parent, bg=bg)
+        self.controller = controller
+        
+        # Game State Variables
+        self.state = UltimateState()
+        self.mcts = UltimateMCTS(think_ms=1000)
+        self.buttons = {}  # move (board * 9 + cell) -> button
+        
+        # --- Widgets Setup ---
+        tk.Label(self, text="=== Ultimate Tic-Tac-Toe ===", font=('Arial', 16, 'bold'), bg=bg).pack(pady=5)
+        tk.Label(self, text="Win three small boards in a row. Your move picks the board the computer plays next.", 
+                bg=bg, wraplength=550).pack()
+        
+        settings_frame = tk.Frame(self, bg=bg)
+        settings_frame.pack(pady=5)
+        tk.Label(settings_frame, text="Computer think time (ms):", bg=bg).pack(side=tk.LEFT, padx=2)
+        self.think_var = tk.IntVar(value=1000)
+        tk.Spinbox(settings_frame, from_=100, to=30000, increment=100, textvariable=self.think_var, 
+                  width=6).pack(side=tk.LEFT, padx=2)
+        tk.Label(settings_frame, text=f"({self.mcts.workers} core{'s' if self.mcts.workers > 1 else ''})", 
+                bg=bg).pack(side=tk.LEFT, padx=2)
+        
+        self.status_label = tk.Label(self, text="Player X's turn", bg=bg, font=('Arial', 14))
+        self.status_label.pack(pady=5)
+        
+        # 3x3 grid of small boards, each a 3x3 grid of buttons
+        grid_frame = tk.Frame(self, bg="#2C3E50")
+        grid_frame.pack(pady=5)
+        for board in range(9):
+            board_frame = tk.Frame(grid_frame, bg="#2C3E50")
+            board_frame.grid(row=board // 3, column=board % 3, padx=3, pady=3)
+            for cell in range(9):
+                move = board * 9 + cell
+                button = tk.Button(board_frame, text=" ", font=('Arial', 12, 'bold'), width=2, height=1, 
+                                   command=lambda m=move: self.button_click(m))
+                button.grid(row=cell // 3, column=cell % 3, padx=1, pady=1)
+                self.buttons[move] = button
+        self.default_bg = button.cget("bg")
+        
+        self.stats_label = tk.Label(self, text="", bg=bg, font=('Arial', 10, 'italic'))
+        self.stats_label.pack(pady=5)
+        
+        tk.Button(self, text="New Game", command=self.reset_game).pack(side=tk.LEFT, padx=10, pady=10)
+        tk.Button(self, text="Back to Selection", 
+                 command=lambda: [self.leave(), controller.winfo_toplevel().geometry("600x500"), controller.show_frame("TicTacToeSelectionGUI")]).pack(side=tk.RIGHT, padx=10, pady=10)
+        
+        self.render()
+    
+    def render(self):
+        """Updates every cell: marks, won boards and the boards that may be played."""
+        state = self.state
+        playable = set(state.open_boards()) if not state.winner and state.player == 1 else set()
+        for move, button in self.buttons.items():
+            board, cell = divmod(move, 9)
+            if state.stones[1][board] >> cell & 1:
+                text = "X"
+            elif state.stones[2][board] >> cell & 1:
+                text = "O"
+            else:
+                text = " "
+            if state.won[1] >> board & 1:
+                bg = self.colors[1]
+            elif state.won[2] >> board & 1:
+                bg = self.colors[2]
+            elif state.closed >> board & 1:
+                bg = self.colors[UTTT_DRAW]
+            elif board in playable:
+                bg = self.colors["active"]
+            else:
+                bg = self.default_bg
+            button.config(text=text, bg=bg)
+    
+    def button_click(self, move):
+        """Plays the player's move if it is legal, then lets the computer think."""
+        if self.state.player != 1 or move not in self.state.legal_moves():
+            return
+        self.play(move)
+        if not self.state.winner:
+            self.start_search()
+    
+    def play(self, move):
+        """Plays a move for the side to move and updates the display."""
+        self.state.play(move)
+        self.render()
+        winner = self.state.winner
+        if winner == UTTT_DRAW:
+            self.status_label.config(text="🤝 It's a tie!")
+        elif winner:
+            self.status_label.config(text=f"🎉 Player {' XO'[winner]} wins!")
+        else:
+            self.status_label.config(text=f"Player {' XO'[self.state.player]}'s turn")
+    
+    def start_search(self):
+        """Starts the computer's search; the move is played when the result comes back."""
+        try:
+            self.mcts.think_ms = max(self.think_var.get(), 1)
+        except tk.TclError:
+            pass
+        self.status_label.config(text="Computer is thinking...")
+        self.controller.ai.submit(self, self.apply_search, self.mcts.choose_move, self.state.copy(), 
+                                  cancellable=True)
+    
+    def apply_search(self, move):
+        """Plays the move the computer's search found."""
+        self.stats_label.config(text=f"Computer searched {self.mcts.playouts:,} playouts "
+                                     f"({self.mcts.playouts_per_second:,.0f}/s on {self.mcts.workers} "
+                                     f"core{'s' if self.mcts.workers > 1 else ''})")
+        if move is not None:
+            self.play(move)
+    
+    def reset_game(self):
+        """Abandons any search in progress and starts a new game."""
+        self.controller.ai.cancel(self)
+        self.state = UltimateState()
+        self.status_label.config(text="Player X's turn")
+        self.stats_label.config(text="")
+        self.render()
+    
+    def leave(self):
+        """Abandons the game and frees the search's worker processes. The shutdown runs on the AI
+        worker, after a search still winding down, so it can't race one starting the pool."""
+        self.reset_game()
+        self.controller.ai.submit(self, lambda result: None, self.mcts.shutdown)
 
 # --- Execution ---
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # A frozen Windows .exe starts its worker processes through here
+    parser = argparse.ArgumentParser(description="Python GUI Games Collection")
+    parser.add_argument("--analyze", metavar="ADVENTURE",
+                        help="check an Escape Room adventure file (or dungeon:SEED:ROOMS) for problems instead of starting the games")
+    parser.add_argument("--build-tictactoe-table", action="store_true",
+                        help="solve every Tic-Tac-Toe position and write the perfect-play table file")
+    parser.add_argument("--tictactoe-selfplay", type=int, metavar="GAMES",
+                        help="benchmark perfect-vs-perfect Tic-Tac-Toe games using the play table")
+    parser.add_argument("--ultimate-benchmark", type=int, metavar="MS",
+                        help="measure Ultimate Tic-Tac-Toe MCTS playouts per second for 1 up to all cores")
+    parser.add_argument("--battleship-tournament", type=int, metavar="GAMES",
+                        help="play GAMES headless Battleship games between every pair of players")
+    parser.add_argument("--build-battleship-layouts", action="store_true",
+                        help="train the Hard placement's fleet layouts for --board, --fleet and --no-touch")
+    parser.add_argument("--battleship-host", type=int, metavar="PORT",
+                        help="host a networked Battleship game without a window, on --board and --fleet")
+    parser.add_argument("--battleship-join", metavar="HOST:PORT",
+                        help="join a networked Battleship game without a window")
+    parser.add_argument("--targeting", default="Hard", choices=BATTLESHIP_DIFFICULTIES,
+                        help="how the windowless network player picks its shots (default: %(default)s)")
+    parser.add_argument("--players", default=",".join(f"Random/{level}" for level in BATTLESHIP_DIFFICULTIES),
+                        help="tournament players as Placer/Targeting, comma-separated (default: %(default)s)")
+    parser.add_argument("--board", default="10x10", metavar="ROWSxCOLS", help="Battleship board size (default: %(default)s)")
+    parser.add_argument("--fleet", default="3, 2x2, 1x3", help="Battleship fleet (default: %(default)s)")
+    parser.add_argument("--no-touch", action="store_true", help="Battleship ships may not touch")
+    parser.add_argument("--workers", type=int, help="tournament and layout training worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, help="seed for a reproducible tournament or layout training")
+    args = parser.parse_args()
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    if args.build_tictactoe_table:
+        table = TicTacToePlayTable(script_dir)
+        start = time.perf_counter()
+        data, positions = table.build()
+        with open(table.path, 'wb') as f:
+            f.write(data)
+        print(f"Solved {positions:,} positions in {time.perf_counter() - start:.2f}s, "
+              f"wrote {len(data):,} bytes to {table.path}")
+        sys.exit(0)
+    
+    if args.tictactoe_selfplay:
+        results, seconds = tictactoe_self_play(args.tictactoe_selfplay, script_dir)
+        print(f"{args.tictactoe_selfplay:,} games in {seconds:.2f}s "
+              f"({args.tictactoe_selfplay / seconds:,.0f} games/s): "
+              f"X wins {results['X']:,}, O wins {results['O']:,}, draws {results['draw']:,}")
+        sys.exit(0 if results['draw'] == args.tictactoe_selfplay else 1)
+    
+    if args.ultimate_benchmark:
+        cores = os.cpu_count() or 1
+        for workers in sorted({min(1 << n, cores) for n in range(cores.bit_length() + 1)}):
+            mcts = UltimateMCTS(think_ms=args.ultimate_benchmark, workers=workers)
+            mcts.choose_move(UltimateState())  # Warm up the worker processes
+            move = mcts.choose_move(UltimateState())
+            mcts.shutdown()
+            print(f"{workers:>3} worker(s): {mcts.playouts:,} playouts, {mcts.playouts_per_second:,.0f}/s, "
+                  f"opening move {divmod(move, 9)}")
+        sys.exit(0)
+    
+    if args.build_battleship_layouts:
+        try:
+            rows, _, cols = args.board.lower().partition("x")
+            book = BattleshipLayoutBook(script_dir, int(rows), int(cols), parse_fleet(args.fleet), args.no_touch)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(2)
+        start = time.perf_counter()
+        data, training = book.build(seed=args.seed, workers=args.workers or os.cpu_count() or 1)
+        if not data:
+            print(f"Couldn't find a placement for a fleet of {format_fleet(book.sizes)} on a {rows}x{cols} board",
+                  file=sys.stderr)
+            sys.exit(2)
+        book.save(data, training)
+        print(f"Trained {len(data) // (2 * len(book.sizes)):,} layouts in {time.perf_counter() - start:.2f}s, "
+              f"wrote {len(data):,} bytes to {book.path}")
+        sys.exit(0)
+    
+    if args.battleship_host or args.battleship_join:
+        try:
+            if args.battleship_join:
+                host, port = parse_net_address(args.battleship_join)
+                print(f"Joining {host}:{port}...")
+                settings = {}
+            else:
+                host, port = None, args.battleship_host
+                rows, _, cols = args.board.lower().partition("x")
+                settings = {"rows": int(rows), "cols": int(cols), "sizes": parse_fleet(args.fleet), "no_touch": args.no_touch}
+                print(f"Waiting for a player on port {port}...")
+            won, shots = asyncio.run(play_battleship_online(host, port, not args.battleship_join, args.targeting,
+                                                            seed=args.seed, **settings))
+        except (ValueError, OSError, BattleshipProtocolError, asyncio.IncompleteReadError) as e:
+            print(f"Network game failed: {e or 'the other player left'}", file=sys.stderr)
+            sys.exit(2)
+        print(f"{'Won' if won else 'Lost'} after firing {shots} shots")
+        sys.exit(0)
+    
+    if args.battleship_tournament:
+        try:
+            rows, _, cols = args.board.lower().partition("x")
+            report = battleship_tournament([parse_battleship_player(player) for player in args.players.split(",")],
+                                           args.battleship_tournament, int(rows), int(cols), parse_fleet(args.fleet),
+                                           args.no_touch, args.workers, args.seed)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(2)
+        print(format_battleship_tournament(report))
+        sys.exit(0)
+    
+    if args.analyze:
+        adventure = open_adventure(args.analyze if args.analyze.startswith("dungeon:") else os.path.abspath(args.analyze))
+        if adventure is None:
+            sys.exit(2)
+        report = analyze_adventure(adventure)
+        print(format_adventure_report(report))
+        problems = report["unreachable"] or report["dead_ends"] or report["soft_locks"] or report["shortest_win"] is None
+        sys.exit(1 if problems else 0)
+    
     app = GameApp()
     app.mainloop()
\ No newline at end of file